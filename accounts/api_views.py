@@ -10,7 +10,7 @@ from .serializers import (
 )
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
 from django.urls import reverse
@@ -23,8 +23,22 @@ from django.core.exceptions import ObjectDoesNotExist
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 from rest_framework.response import Response
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from .authentication import invalidate_cached_user
+from .outbox import queue_email
 
 
+def queue_verification_email(request, user):
+    """Queue the email verification link for the outbox worker"""
+    token = RefreshToken.for_user(user).access_token
+
+    current_site = get_current_site(request).domain
+    relative_link = reverse("verify-email")
+    verification_url = f"http://{current_site}{relative_link}?token={str(token)}"
+
+    subject = "Verify your email"
+    message = f"Hi {user.username}, please use this link to verify your email: \n{verification_url}"
+    queue_email(subject, message, [user.email], settings.EMAIL_HOST_USER)
+
 
 @extend_schema(
     tags=["User"],
@@ -65,7 +79,9 @@ class RegisterView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        with transaction.atomic():
+            user = serializer.save()
+            queue_verification_email(request, user)
 
         return Response(
             {
@@ -153,17 +169,7 @@ class ResendVerificationEmailView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        token = RefreshToken.for_user(user).access_token
-
-        current_site = get_current_site(request).domain
-        relative_link = reverse("verify-email")
-        verification_url = f"http://{current_site}{relative_link}?token={str(token)}"
-
-        subject = "Verify your email"
-        message = f"Hi {user.username}, please use this link to verify your email: \n{verification_url}"
-        from_email = settings.EMAIL_HOST_USER
-        recipient_list = [user.email]
-        send_mail(subject, message, from_email, recipient_list)
+        queue_verification_email(request, user)
 
         return Response(
             {
@@ -212,9 +218,7 @@ class PasswordResetRequestView(generics.GenericAPIView):
 
         subject = "Password Reset Request"
         message = f"Hi {user.first_name}, use the link below to reset your password:\n{reset_url}"
-        from_email = settings.EMAIL_HOST_USER
-        recipient_list = [user.email]
-        send_mail(subject, message, from_email, recipient_list)
+        queue_email(subject, message, [user.email], settings.EMAIL_HOST_USER)
 
         return Response(
             {"message": "Password reset email sent."}, status=status.HTTP_200_OK
@@ -423,6 +427,7 @@ class LogoutView(APIView):
                 pass
 
         request.session.flush()  # clears entire session
+        invalidate_cached_user(request.user.pk)
 
         return Response(
             {"detail": "Logged out successfully"},
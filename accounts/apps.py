@@ -6,5 +6,5 @@ class AccountsConfig(AppConfig):
     name = 'accounts'
 
     def ready(self):
-        # import accounts.signals  # noqa
-        pass
+        import accounts.signals  # noqa
+        import accounts.schema  # noqa
@@ -1,7 +1,89 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from mobilepoint.caching import is_shared_cache
+
+
+USER_CACHE_TIMEOUT = 5 * 60
+# On a per-process cache other workers never see the version bump, so a
+# deactivation or staff revocation reaches them only when the entry expires
+USER_LOCAL_CACHE_TIMEOUT = getattr(settings, 'AUTH_USER_LOCAL_CACHE_TIMEOUT', 10)
+# Relations most authenticated endpoints read (curated products, profile)
+USER_PREFETCH = ['favorite_categories', 'favorite_brands']
+
+
+def user_version_key(user_id):
+    return f'accounts:auth_user:version:{user_id}'
+
+
+def get_user_version(user_id):
+    key = user_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id):
+    """Invalidate the cached authentication user"""
+    try:
+        cache.incr(user_version_key(user_id))
+    except ValueError:
+        cache.add(user_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def invalidate_cached_user(user_id):
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from the cache
+
+    The user is cached with USER_PREFETCH already loaded, under a key made of
+    the user id and a per-user version. Saving the user, changing its
+    favourites or logging out bumps the version (accounts/signals.py), so a
+    stale copy is never served for longer than it takes the change to commit.
+
+    On a per-process backend (the default LocMemCache) the bump only reaches
+    the worker that handled the change, so there entries live for
+    USER_LOCAL_CACHE_TIMEOUT seconds instead, bounding how long other workers
+    keep serving a deactivated or demoted user. Set AUTH_USER_LOCAL_CACHE_TIMEOUT
+    to 0 to read the user from the database on every request, or configure a
+    shared CACHE_BACKEND to get the full USER_CACHE_TIMEOUT.
+    """
+
+    def get_user(self, validated_token):
+        timeout = USER_CACHE_TIMEOUT if is_shared_cache() else USER_LOCAL_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        key = f'accounts:auth_user:{user_id}:{get_user_version(user_id)}'
+        user = cache.get(key)
+        if user is None:
+            # Runs the user lookup plus the active / revoked-token checks
+            user = super().get_user(validated_token)
+            prefetch_related_objects([user], *USER_PREFETCH)
+            cache.set(key, user, timeout)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
 
-class CookieJWTAuthentication(JWTAuthentication):
+class CookieJWTAuthentication(CachedJWTAuthentication):
     def authenticate(self, request):
         raw_token = request.COOKIES.get('access_token')
         if raw_token is None:
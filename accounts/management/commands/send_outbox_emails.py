@@ -0,0 +1,69 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import drain_outbox, outbox_depth, prune_outbox
+
+logger = logging.getLogger(__name__)
+
+# How often a --loop worker deletes old sent/failed emails
+PRUNE_INTERVAL_SECONDS = 60 * 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Send queued transactional emails from the outbox and delete old sent and failed ones. '
+        'Use --loop to run as a long-lived worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails per batch / SMTP connection (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches per pass (default: drain the queue)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new emails instead of exiting once the queue is empty')
+        parser.add_argument('--sleep', type=float, default=5, help='Seconds between polls in --loop mode (default: 5)')
+        parser.add_argument('--status', action='store_true', help='Print the queue depth and exit')
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='Delete sent and failed emails older than this (default: OUTBOX_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            depth = outbox_depth()
+            self.stdout.write(
+                f"due={depth['due']} deferred={depth['deferred']} failed={depth['failed']} "
+                f"oldest_due={depth['oldest_due_seconds']}s"
+            )
+            return
+
+        pruned_at = None
+        while True:
+            started = time.monotonic()
+            try:
+                stats = drain_outbox(batch_size=options['batch_size'], max_batches=options['max_batches'])
+            except Exception:
+                # e.g. the SMTP server is unreachable; the claimed batch is retried once its lease expires
+                if not options['loop']:
+                    raise
+                logger.exception('Outbox pass failed')
+                stats = None
+
+            if stats and stats['batches']:
+                elapsed = time.monotonic() - started
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {stats['sent']} email(s) in {stats['batches']} batch(es) in {elapsed:.1f}s "
+                    f"({stats['failed']} failed)"
+                ))
+            if pruned_at is None or time.monotonic() - pruned_at >= PRUNE_INTERVAL_SECONDS:
+                pruned_at = time.monotonic()
+                try:
+                    deleted = prune_outbox(options['retention_days'])
+                except Exception:
+                    if not options['loop']:
+                        raise
+                    logger.exception('Outbox prune failed')
+                else:
+                    if deleted:
+                        self.stdout.write(f'Pruned {deleted} old email(s)')
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
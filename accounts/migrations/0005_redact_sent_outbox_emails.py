@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def redact_sent_emails(apps, schema_editor):
+    OutboxEmail = apps.get_model('accounts', 'OutboxEmail')
+    OutboxEmail.objects.filter(status='sent').update(body='', html_body='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(redact_sent_emails, migrations.RunPython.noop),
+    ]
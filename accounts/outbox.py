@@ -0,0 +1,189 @@
+"""
+Email outbox - Transactional email queued in the database and sent by a worker
+
+Views call queue_email() inside their transaction, so the email is stored only
+if the request commits, and the request never waits on SMTP. The
+send_outbox_emails command drains the queue in batches. Each batch is claimed
+with a short lease (SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it), so several workers can run side by side, and all messages in a
+batch share one connection from the configured EMAIL_BACKEND. Failed messages
+are retried with exponential backoff until OUTBOX_MAX_ATTEMPTS is reached.
+
+Bodies carry verification and password-reset links, so they are blanked as
+soon as a message is sent, and prune_outbox() deletes sent and failed rows
+after OUTBOX_RETENTION_DAYS.
+
+The worker only uses get_connection(), so the locmem and file email backends
+work the same way as SMTP for local testing.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = getattr(settings, 'OUTBOX_BATCH_SIZE', 50)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+OUTBOX_RETRY_BASE_SECONDS = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 60)
+OUTBOX_RETENTION_DAYS = getattr(settings, 'OUTBOX_RETENTION_DAYS', 7)
+# How long a claimed batch stays invisible to other workers
+OUTBOX_LEASE_SECONDS = 5 * 60
+
+
+def queue_email(subject, body, to, from_email=None, html_body=''):
+    """
+    Store an email for the outbox worker
+
+    Args:
+        subject: Subject line
+        body: Plain-text body
+        to: Recipient address or list of addresses
+        from_email: Sender (default: EMAIL_HOST_USER, then DEFAULT_FROM_EMAIL)
+        html_body: Optional HTML alternative
+
+    Returns:
+        OutboxEmail instance
+    """
+    if isinstance(to, str):
+        to = [to]
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        to=list(to),
+        from_email=from_email or settings.EMAIL_HOST_USER or '',
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: base, 2x base, 4x base, ..."""
+    return timedelta(seconds=OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+def claim_batch(batch_size=None):
+    """Lock a batch of due emails and push their next_attempt_at past the lease"""
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboxEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size or OUTBOX_BATCH_SIZE]
+        )
+        if batch:
+            OutboxEmail.objects.filter(id__in=[email.id for email in batch]).update(
+                next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            )
+    return batch
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email or None, email.to, connection=connection
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def send_batch(batch):
+    """
+    Send claimed emails over one connection and record the outcome of each
+
+    Returns:
+        tuple of (sent, failed) counts
+    """
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in batch:
+            email.attempts += 1
+            try:
+                build_message(email, connection).send()
+            except Exception as exc:
+                failed += 1
+                email.last_error = f'{type(exc).__name__}: {exc}'
+                if email.attempts >= OUTBOX_MAX_ATTEMPTS:
+                    email.status = OutboxEmail.STATUS_FAILED
+                    logger.error('Outbox email #%s failed permanently: %s', email.pk, email.last_error)
+                else:
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                    logger.warning('Outbox email #%s failed (attempt %s): %s', email.pk, email.attempts, email.last_error)
+            else:
+                sent += 1
+                email.status = OutboxEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                # Delivered; don't keep the links it carried
+                email.body = email.html_body = ''
+    finally:
+        connection.close()
+
+    OutboxEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at', 'body', 'html_body']
+    )
+    return sent, failed
+
+
+def drain_outbox(batch_size=None, max_batches=None):
+    """
+    Send due emails batch by batch until none are left
+
+    Returns:
+        dict with keys: batches, sent, failed
+    """
+    stats = {'batches': 0, 'sent': 0, 'failed': 0}
+    while max_batches is None or stats['batches'] < max_batches:
+        batch = claim_batch(batch_size)
+        if not batch:
+            break
+        sent, failed = send_batch(batch)
+        stats['batches'] += 1
+        stats['sent'] += sent
+        stats['failed'] += failed
+    return stats
+
+
+def prune_outbox(retention_days=None):
+    """
+    Delete sent and permanently failed emails older than the retention period
+
+    Args:
+        retention_days: Age in days (default: OUTBOX_RETENTION_DAYS)
+
+    Returns:
+        Number of emails deleted
+    """
+    cutoff = timezone.now() - timedelta(days=OUTBOX_RETENTION_DAYS if retention_days is None else retention_days)
+    deleted, _ = OutboxEmail.objects.filter(
+        status__in=[OutboxEmail.STATUS_SENT, OutboxEmail.STATUS_FAILED], created_at__lt=cutoff
+    ).delete()
+    return deleted
+
+
+def outbox_depth():
+    """
+    Current queue depth
+
+    Returns:
+        dict with keys: due (ready to send now), deferred (waiting for a retry
+        or leased by a worker), failed (gave up), oldest_due_seconds
+    """
+    now = timezone.now()
+    pending = OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING)
+    counts = pending.aggregate(
+        due=Count('id', filter=Q(next_attempt_at__lte=now)),
+        deferred=Count('id', filter=Q(next_attempt_at__gt=now)),
+    )
+    counts['failed'] = OutboxEmail.objects.filter(status=OutboxEmail.STATUS_FAILED).count()
+    oldest = pending.filter(next_attempt_at__lte=now).order_by('created_at').values_list('created_at', flat=True).first()
+    counts['oldest_due_seconds'] = int((now - oldest).total_seconds()) if oldest else 0
+    return counts
@@ -1,29 +1,27 @@
-from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from django.urls import reverse
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.sites.models import Site   # Import Site model
+
+from .authentication import invalidate_cached_user
 from .models import User
 
-@receiver(post_save, sender=User)
-def send_verification_email(sender, instance, created, **kwargs):
-    if created and not instance.is_verified and not instance.is_superuser:
-        # Generate a token for email verification
-        token = RefreshToken.for_user(instance).access_token
 
-        # Get the current site domain dynamically
-        current_site = Site.objects.get_current()
-        domain = current_site.domain
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_on_change(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
 
-        # Build the verification URL
-        relative_link = reverse("verify-email")
-        verification_url = f"http://{domain}{relative_link}?token={str(token)}"
 
-        # Send the verification email
-        subject = "Verify your email"
-        message = f"Hi {instance.first_name}, please use this link to verify your email:\n{verification_url}"
-        from_email = settings.EMAIL_HOST_USER
-        recipient_list = [instance.email]
-        send_mail(subject, message, from_email, recipient_list)
+@receiver(m2m_changed, sender=User.favorite_categories.through)
+@receiver(m2m_changed, sender=User.favorite_brands.through)
+def invalidate_user_on_favorites_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_cached_user(instance.pk)
+        return
+    # Changed from the category/brand side: affected users are pk_set, or everyone linked before a clear
+    if action == 'pre_clear':
+        pk_set = instance.favorited_by_users.values_list('pk', flat=True)
+    elif not action.startswith('post_') or action == 'post_clear':
+        return
+    for user_id in pk_set or ():
+        invalidate_cached_user(user_id)
@@ -0,0 +1,165 @@
+"""
+HTTP load benchmark - Throughput and latency percentiles for the read endpoints
+
+Runs a fixed number of concurrent clients against a running server for a
+fixed duration, and reports requests/second plus p50/p95/p99 latency per
+path. Uses only the standard library, so it runs anywhere the server is
+reachable.
+
+Compare WSGI and ASGI with the same concurrency and duration:
+
+    SERVER_MODE=wsgi ./serve.sh &   # then:
+    python benchmarks/http_load.py --base-url http://127.0.0.1:8001 --label wsgi --json wsgi.json
+
+    SERVER_MODE=asgi ./serve.sh &   # then:
+    python benchmarks/http_load.py --base-url http://127.0.0.1:8001 --label asgi --json asgi.json
+
+    python benchmarks/http_load.py --compare wsgi.json asgi.json
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    '/api/products/',
+    '/api/products/?ordering=price&page=2',
+    '/api/deals/live/',
+    '/api/home/',
+    '/api/menus/by_location/?location=header',
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def worker(base, paths, deadline, results, errors, lock, offset, headers):
+    split = urlsplit(base)
+    connection_class = http.client.HTTPSConnection if split.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(split.hostname, split.port, timeout=30)
+    local = {path: [] for path in paths}
+    local_errors = 0
+    i = offset
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                local_errors += 1
+                continue
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            connection.close()
+            connection = connection_class(split.hostname, split.port, timeout=30)
+            continue
+        local[path].append(time.perf_counter() - started)
+    connection.close()
+    with lock:
+        for path, latencies in local.items():
+            results[path].extend(latencies)
+        errors[0] += local_errors
+
+
+def run(base, paths, concurrency, duration, warmup, headers):
+    if warmup:
+        run(base, paths, concurrency, warmup, 0, headers)
+    results = {path: [] for path in paths}
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(base, paths, deadline, results, errors, lock, n, headers))
+        for n in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    all_latencies = [latency for latencies in results.values() for latency in latencies]
+    summary = {
+        'concurrency': concurrency,
+        'duration': round(elapsed, 2),
+        'requests': len(all_latencies),
+        'errors': errors[0],
+        'rps': round(len(all_latencies) / elapsed, 1),
+        'p50_ms': round(percentile(all_latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(all_latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(all_latencies, 99) * 1000, 1),
+        'paths': {},
+    }
+    for path, latencies in results.items():
+        summary['paths'][path] = {
+            'requests': len(latencies),
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        }
+    return summary
+
+
+def print_summary(label, summary):
+    print(f"[{label}] {summary['requests']} requests in {summary['duration']}s "
+          f"at concurrency {summary['concurrency']}: {summary['rps']} req/s, "
+          f"p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, "
+          f"{summary['errors']} errors")
+    for path, stats in summary['paths'].items():
+        print(f"    {path:<45} {stats['requests']:>7} req  mean {stats['mean_ms']:>7} ms  p99 {stats['p99_ms']:>7} ms")
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print_summary(before['label'], before)
+    print_summary(after['label'], after)
+    if before['concurrency'] != after['concurrency']:
+        print('warning: runs used different concurrency; the comparison is not like for like')
+    print(f"throughput: {after['rps'] / before['rps']:.2f}x" if before['rps'] else 'throughput: n/a')
+    print(f"p99 latency: {after['p99_ms'] / before['p99_ms']:.2f}x" if before['p99_ms'] else 'p99 latency: n/a')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable; default: the hot read endpoints)')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to measure')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds of unmeasured warm-up traffic')
+    parser.add_argument('--token', help='JWT access token to send as a Bearer header')
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--json', help='Write the summary to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Compare two --json summaries and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    headers = {'Accept': 'application/json'}
+    if args.token:
+        headers['Authorization'] = f'Bearer {args.token}'
+    summary = run(args.base_url.rstrip('/'), args.paths or DEFAULT_PATHS, args.concurrency, args.duration, args.warmup, headers)
+    summary['label'] = args.label
+    print_summary(args.label, summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
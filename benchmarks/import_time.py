@@ -0,0 +1,127 @@
+"""
+Import-time breakdown - Where a worker's startup time goes before it can serve
+
+Starts a fresh interpreter under `python -X importtime`, loads the project the
+way a worker does (django.setup(), then the URLconf, which imports every view,
+serializer and filter), and reports
+- the time spent importing each top-level package (own time of all its modules)
+- the slowest imports by cumulative time, i.e. what is worth deferring
+
+Uses only the standard library:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --top 40 --json import-before.json
+    python benchmarks/import_time.py --compare import-before.json import-after.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP = (
+    "import os, django; "
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mobilepoint.settings'); "
+    "django.setup(); "
+    "import mobilepoint.urls"
+)
+
+# import time:       350 |        350 |     _io
+LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$')
+
+
+def measure():
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if process.returncode != 0:
+        sys.exit(f'Loading the project failed:\n{process.stderr[-2000:]}')
+
+    modules = []
+    for line in process.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'depth': (len(indent) - 1) // 2,
+                'own_ms': int(own) / 1000,
+                'cumulative_ms': int(cumulative) / 1000,
+            })
+    return wall, modules
+
+
+def summarize(wall, modules, top):
+    packages = {}
+    for module in modules:
+        package = module['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + module['own_ms']
+    slowest = sorted(modules, key=lambda module: module['cumulative_ms'], reverse=True)
+    return {
+        'wall_ms': round(wall * 1000, 1),
+        'import_ms': round(sum(module['own_ms'] for module in modules), 1),
+        'modules': len(modules),
+        'packages_ms': {
+            package: round(ms, 1) for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        'slowest_imports': [
+            {'module': module['module'], 'cumulative_ms': round(module['cumulative_ms'], 1), 'own_ms': round(module['own_ms'], 1)}
+            for module in slowest[:top]
+        ],
+    }
+
+
+def print_summary(label, summary):
+    print(f"[{label}] {summary['modules']} modules imported in {summary['import_ms']} ms "
+          f"(process wall time {summary['wall_ms']} ms)")
+    print('  by package (own time):')
+    for package, ms in summary['packages_ms'].items():
+        print(f'    {package:<40} {ms:>9} ms')
+    print('  slowest imports (cumulative):')
+    for row in summary['slowest_imports']:
+        print(f"    {row['module']:<60} {row['cumulative_ms']:>9} ms")
+
+
+def compare(before_path, after_path):
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"import time: {before['import_ms']} -> {after['import_ms']} ms; "
+          f"wall time: {before['wall_ms']} -> {after['wall_ms']} ms")
+    for package in sorted(set(before['packages_ms']) | set(after['packages_ms'])):
+        old = before['packages_ms'].get(package)
+        new = after['packages_ms'].get(package)
+        if old != new:
+            print(f"    {package:<40} {old if old is not None else '-':>9} -> {new if new is not None else '-'} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=25, help='Packages and imports to list (default: 25)')
+    parser.add_argument('--label', default='run')
+    parser.add_argument('--json', help='Write the summary to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Compare two --json summaries and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    summary = summarize(*measure(), args.top)
+    summary['label'] = args.label
+    print_summary(args.label, summary)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
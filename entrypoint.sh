@@ -4,19 +4,27 @@ set -e
 export DJANGO_SETTINGS_MODULE=${DJANGO_SETTINGS_MODULE:-mobilepoint.settings}
 echo "Using Django settings: $DJANGO_SETTINGS_MODULE"
 
-# Run migrations only for backend service
-if [ "$(id -u)" = "0" ]; then
+# Run migrations only for backend service (the email workers set SKIP_SETUP=1)
+if [ "${SKIP_SETUP:-0}" = "1" ]; then
+    echo "Skipping migrations and static files"
+elif [ "$(id -u)" = "0" ]; then
     echo "Running migrations as app user..."
     su -s /bin/bash app -c "python manage.py migrate --noinput"
 
     echo "Collecting static files..."
     su -s /bin/bash app -c "python manage.py collectstatic --noinput"
+
+    echo "Building OpenAPI schema..."
+    su -s /bin/bash app -c "python manage.py build_openapi_schema"
 else
     echo "Running migrations as current user..."
     python manage.py migrate --noinput
 
     echo "Collecting static files..."
     python manage.py collectstatic --noinput
+
+    echo "Building OpenAPI schema..."
+    python manage.py build_openapi_schema
 fi
 
 echo "Starting service..."
@@ -24,4 +32,4 @@ if [ "$(id -u)" = "0" ]; then
     exec su -s /bin/bash app -c "exec $*"
 else
     exec "$@"
-fi
\ No newline at end of file
+fi
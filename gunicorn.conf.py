@@ -0,0 +1,28 @@
+"""
+Gunicorn settings used by serve.sh
+
+Every worker is warmed up (mobilepoint/startup.py) right after it has loaded
+the application. post_worker_init runs in the worker before its accept loop
+starts, so the worker takes no connections until the warm-up is done, while
+already-running workers keep serving. The master does not wait for it; this
+only delays when the new worker starts accepting. Startup timings are logged
+per worker.
+"""
+import time
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    from mobilepoint.startup import warm_up
+
+    loaded = time.monotonic()
+    warm_up()
+    worker.log.info(
+        'Worker %s ready: app loaded in %.0f ms, warmed up in %.0f ms',
+        worker.pid,
+        (loaded - worker.forked_at) * 1000,
+        (time.monotonic() - loaded) * 1000,
+    )
@@ -3,10 +3,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAdminUser, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Count, F, Q
 from drf_spectacular.utils import extend_schema, extend_schema_field, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 from menu.models import Menu, MenuItem, Page
+from menu.tree import MenuTree, batch, get_location_menus, invalidate_menu_cache
 from .serializers import (
     MenuSerializer,
     MenuListSerializer,
@@ -79,9 +81,7 @@ class MenuViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        menus = Menu.objects.filter(location=location, is_active=True)
-        serializer = MenuSerializer(menus, many=True)
-        return Response(serializer.data)
+        return Response(get_location_menus(location))
     
     @extend_schema(
         operation_id='menus_toggle_active',
@@ -116,8 +116,8 @@ class MenuViewSet(viewsets.ModelViewSet):
         GET /api/menus/{id}/items_tree/
         """
         menu = self.get_object()
-        top_level_items = menu.items.filter(parent=None, is_active=True)
-        serializer = MenuItemSerializer(top_level_items, many=True)
+        tree = MenuTree([menu.id])
+        serializer = MenuItemSerializer(tree.roots(menu.id), many=True, context={'menu_tree': tree})
         return Response(serializer.data)
     
     @extend_schema(
@@ -223,7 +223,7 @@ class MenuItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        items = MenuItem.objects.filter(menu_id=menu_id, is_active=True)
+        items = self.get_queryset().filter(menu_id=menu_id, is_active=True)
         serializer = MenuItemListSerializer(items, many=True)
         return Response(serializer.data)
     
@@ -253,7 +253,9 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         if menu_id:
             queryset = queryset.filter(menu_id=menu_id)
         
-        serializer = MenuItemSerializer(queryset, many=True)
+        items = list(queryset)
+        tree = MenuTree({item.menu_id for item in items})
+        serializer = MenuItemSerializer(items, many=True, context={'menu_tree': tree})
         return Response(serializer.data)
     
     @extend_schema(
@@ -268,8 +270,8 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         GET /api/menu-items/{id}/children/
         """
         menu_item = self.get_object()
-        children = menu_item.children.filter(is_active=True)
-        serializer = MenuItemSerializer(children, many=True)
+        tree = MenuTree([menu_item.menu_id])
+        serializer = MenuItemSerializer(tree.children(menu_item), many=True, context={'menu_tree': tree})
         return Response(serializer.data)
     
     @extend_schema(
@@ -321,14 +323,28 @@ class MenuItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        updated_count = 0
+        orders = {}
         for item_data in items_data:
             item_id = item_data.get('id')
             order = item_data.get('order')
             
             if item_id is not None and order is not None:
-                MenuItem.objects.filter(id=item_id).update(order=order)
-                updated_count += 1
+                try:
+                    orders[int(item_id)] = int(order)
+                except (TypeError, ValueError):
+                    return Response(
+                        {'error': 'id and order must be integers'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+        
+        # One UPDATE for all items, then a single cache version bump
+        items = list(MenuItem.objects.filter(id__in=orders).only('id', 'order'))
+        for item in items:
+            item.order = orders[item.id]
+        with batch():
+            MenuItem.objects.bulk_update(items, ['order'])
+            invalidate_menu_cache()
+        updated_count = len(items)
         
         return Response({
             'message': f'{updated_count} menu items reordered successfully',
@@ -349,19 +365,28 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         """
         original = self.get_object()
         
-        # Create duplicate
-        duplicate = MenuItem.objects.create(
-            menu=original.menu,
-            parent=original.parent,
-            label_en=f"{original.label_en} (Copy)",
-            label_np=original.label_np,
-            url=original.url,
-            order=original.order + 1,
-            icon=original.icon,
-            is_external=original.is_external,
-            open_new_tab=original.open_new_tab,
-            is_active=False  # Set inactive by default
-        )
+        with transaction.atomic(), batch():
+            # Make room right after the original with one UPDATE over its later siblings
+            MenuItem.objects.filter(
+                menu_id=original.menu_id,
+                parent_id=original.parent_id,
+                order__gt=original.order,
+            ).update(order=F('order') + 1)
+            invalidate_menu_cache()
+
+            # Create duplicate
+            duplicate = MenuItem.objects.create(
+                menu=original.menu,
+                parent=original.parent,
+                label_en=f"{original.label_en} (Copy)",
+                label_np=original.label_np,
+                url=original.url,
+                order=original.order + 1,
+                icon=original.icon,
+                is_external=original.is_external,
+                open_new_tab=original.open_new_tab,
+                is_active=False  # Set inactive by default
+            )
         
         serializer = MenuItemSerializer(duplicate)
         return Response({
@@ -397,7 +422,9 @@ class MenuItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        deleted_count, _ = MenuItem.objects.filter(id__in=ids).delete()
+        # Cascaded child deletes fire one signal each; batch() folds them into one version bump
+        with batch():
+            deleted_count, _ = MenuItem.objects.filter(id__in=ids).delete()
         
         return Response({
             'message': f'{deleted_count} menu items deleted successfully',
@@ -0,0 +1,16 @@
+"""
+Async menu views - ASGI version of the menus-by-location endpoint
+"""
+from mobilepoint.async_api import api_response, prepare_request
+from .tree import aget_location_menus
+
+
+async def menus_by_location(request):
+    """GET /api/menus/by_location/?location=header - same payload as MenuViewSet.by_location"""
+    error = await prepare_request(request)
+    if error:
+        return error
+    location = request.GET.get('location')
+    if not location:
+        return api_response({'error': 'Location parameter is required'}, status=400)
+    return api_response(await aget_location_menus(location))
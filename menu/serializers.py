@@ -3,6 +3,14 @@ from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
 from drf_spectacular.types import OpenApiTypes
 from menu.models import Menu, MenuItem, Page
+from menu.tree import MenuTree
+
+
+def get_menu_tree(context):
+    """Menu tree shared by every serializer rendered from the same root"""
+    if 'menu_tree' not in context:
+        context['menu_tree'] = MenuTree()
+    return context['menu_tree']
 
 
 class MenuItemSerializer(serializers.ModelSerializer):
@@ -40,12 +48,9 @@ class MenuItemSerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.ListField(child=serializers.DictField()))
     def get_children(self, obj) -> list[dict]:
         """Get child menu items recursively"""
-        if obj.children.exists():
-            return MenuItemSerializer(
-                obj.children.filter(is_active=True),
-                many=True,
-                context=self.context
-            ).data
+        children = get_menu_tree(self.context).children(obj)
+        if children:
+            return MenuItemSerializer(children, many=True, context=self.context).data
         return []
 
 
@@ -158,11 +163,13 @@ class MenuSerializer(serializers.ModelSerializer):
     
     def get_items(self, obj) -> list[dict]:
         """Get only top-level menu items (parent=None) with their children"""
-        top_level_items = obj.items.filter(parent=None, is_active=True)
+        top_level_items = get_menu_tree(self.context).roots(obj.id)
         return MenuItemSerializer(top_level_items, many=True, context=self.context).data
     
     def get_items_count(self, obj) -> int:
         """Get total count of menu items"""
+        if hasattr(obj, 'items_total'):
+            return obj.items_total
         return obj.items.count()
 
 
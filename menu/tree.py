@@ -0,0 +1,129 @@
+"""
+Menu tree - Single-query menu hierarchy and the per-location render cache
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+from mobilepoint.async_api import run_sync
+from .models import Menu, MenuItem
+
+
+VERSION_CACHE_KEY = 'menu:tree:version'
+TREE_CACHE_TIMEOUT = 60 * 60
+
+_batch = threading.local()
+
+
+class MenuTree:
+    """
+    Active menu items grouped by parent, loaded with one query per menu
+
+    Serializers share one instance through their context, so rendering a
+    three-level menu costs a single MenuItem query instead of one per node.
+    """
+
+    def __init__(self, menu_ids=()):
+        self._roots = defaultdict(list)
+        self._children = defaultdict(list)
+        self._loaded = set()
+        self.load(menu_ids)
+
+    def load(self, menu_ids):
+        menu_ids = set(menu_ids) - self._loaded
+        if not menu_ids:
+            return
+        items = MenuItem.objects.filter(menu_id__in=menu_ids, is_active=True).order_by('order', 'id')
+        for item in items:
+            if item.parent_id is None:
+                self._roots[item.menu_id].append(item)
+            else:
+                self._children[item.parent_id].append(item)
+        self._loaded |= menu_ids
+
+    def roots(self, menu_id):
+        """Active top-level items of a menu"""
+        self.load([menu_id])
+        return self._roots[menu_id]
+
+    def children(self, item):
+        """Active direct children of a menu item"""
+        self.load([item.menu_id])
+        return self._children[item.id]
+
+
+def get_cache_version():
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_cache_version():
+    """Invalidate every cached menu tree at once"""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_menu_cache():
+    """Bump the version after commit, or once at the end of a batch()"""
+    if getattr(_batch, 'depth', 0):
+        _batch.dirty = True
+        return
+    transaction.on_commit(bump_cache_version)
+
+
+@contextmanager
+def batch():
+    """Group many item writes so the cache version is bumped only once"""
+    _batch.depth = getattr(_batch, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        if not _batch.depth and getattr(_batch, 'dirty', False):
+            _batch.dirty = False
+            transaction.on_commit(bump_cache_version)
+
+
+def get_location_menus(location):
+    """
+    Rendered active menus for a location, served from cache
+
+    Args:
+        location: Menu location (header, footer, sidebar)
+
+    Returns:
+        list of serialized menus with nested items
+    """
+    from .serializers import MenuSerializer
+
+    key = f'menu:tree:{get_cache_version()}:{location}'
+    data = cache.get(key)
+    if data is None:
+        menus = list(
+            Menu.objects.filter(location=location, is_active=True)
+            .annotate(items_total=Count('items'))
+        )
+        tree = MenuTree(menu.id for menu in menus)
+        data = MenuSerializer(menus, many=True, context={'menu_tree': tree}).data
+        cache.set(key, data, TREE_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_location_menus(location):
+    """Async get_location_menus(): served straight from the cache, built in a worker thread on a miss"""
+    version = await cache.aget(VERSION_CACHE_KEY)
+    if version is not None:
+        data = await cache.aget(f'menu:tree:{version}:{location}')
+        if data is not None:
+            return data
+    return await run_sync(get_location_menus, location)
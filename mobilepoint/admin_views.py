@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
 from django.shortcuts import render
 from django.db.models import Sum, Count, Avg, Q, F
 from django.db.models.functions import TruncDate, TruncMonth
@@ -195,4 +197,62 @@ def calculate_percentage_change(current, previous):
     
     
 def custompage(request):
-    return render(request, 'admin/custompage.html')
\ No newline at end of file
+    return render(request, 'admin/custompage.html')
+
+
+@staff_member_required
+def sql_profile(request):
+    """Worst recent requests seen by SQLInstrumentationMiddleware in this worker process"""
+    from .sql_instrumentation import SQL_N_PLUS_ONE_THRESHOLD, worst_requests
+
+    sort = request.GET.get('sort', 'db_ms')
+    if sort not in ('db_ms', 'queries', 'total_ms', 'at'):
+        sort = 'db_ms'
+    reports = sorted(worst_requests, key=lambda report: report[sort], reverse=True)
+    return render(request, 'admin/sql_profile.html', {
+        'title': 'SQL profile',
+        'reports': reports,
+        'sort': sort,
+        'threshold': SQL_N_PLUS_ONE_THRESHOLD,
+    })
+
+
+@staff_member_required
+def profile_list(request):
+    """Request profiles recorded by ProfilingMiddleware (?_profile=1)"""
+    from .profiling import PROFILE_STORE_MAX, list_profiles
+
+    return render(request, 'admin/profiles.html', {
+        'title': 'Request profiles',
+        'profiles': list_profiles(),
+        'store_max': PROFILE_STORE_MAX,
+        'enabled': getattr(settings, 'PROFILING_ENABLED', False),
+    })
+
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    from .profiling import load_profile
+
+    try:
+        profile = load_profile(profile_id)
+    except (ValueError, OSError):
+        raise Http404('Profile not found')
+    return render(request, 'admin/profile_detail.html', {
+        'title': f'Profile {profile_id}',
+        'profile': profile,
+    })
+
+
+@staff_member_required
+def profile_download(request, profile_id):
+    from .profiling import profile_path
+
+    try:
+        return FileResponse(
+            open(profile_path(profile_id, 'pstats'), 'rb'),
+            as_attachment=True,
+            filename=f'{profile_id}.pstats',
+        )
+    except (ValueError, OSError):
+        raise Http404('Profile not found')
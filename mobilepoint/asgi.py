@@ -8,9 +8,20 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
 
 import os
+import threading
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mobilepoint.settings')
 
 application = get_asgi_application()
+
+# uvicorn imports the app inside the running event loop, where the warm-up's
+# database queries are not allowed. Run it in a thread and wait for it: the
+# worker starts serving only after this module returns, so no request races
+# the warm-up.
+from mobilepoint.startup import warm_up  # noqa: E402
+
+warm_up_thread = threading.Thread(target=warm_up, name='worker-warm-up')
+warm_up_thread.start()
+warm_up_thread.join()
@@ -0,0 +1,66 @@
+"""
+Async API helpers - Shared plumbing for the async read views served in ASGI mode
+
+DRF views are synchronous, so the async endpoints are plain Django async views.
+They authenticate and throttle with the same classes DRF uses, and hand their
+ORM work to run_sync() in one call per request. That runs it thread-sensitively,
+on the request's sync thread and its database connection, the way Django runs
+a sync view under ASGI: a page's COUNT and its rows are read on one connection,
+and connections are closed by Django at the end of the request (CONN_MAX_AGE)
+rather than after every call.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from accounts.authentication import CachedJWTAuthentication
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run blocking ORM/serializer code on the request's sync thread and connection"""
+    return await sync_to_async(func)(*args, **kwargs)
+
+
+def api_response(data, status=200, headers=None):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder, headers=headers)
+
+
+def _authenticate_and_throttle(request):
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken) as exc:
+        # Same body DRF's exception handler produces
+        return api_response(exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}, status=401)
+    if result is not None:
+        request.user = result[0]
+    elif not hasattr(request, 'user') or not request.user.is_authenticated:
+        # Also resolves AuthenticationMiddleware's lazy session user here, off the event loop
+        request.user = AnonymousUser()
+
+    waits = []
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            waits.append(throttle.wait())
+    waits = [wait for wait in waits if wait is not None]
+    if waits:
+        seconds = int(max(waits)) + 1
+        return api_response(
+            {'detail': f'Request was throttled. Expected available in {seconds} seconds.'},
+            status=429,
+            headers={'Retry-After': str(seconds)},
+        )
+    return None
+
+
+async def prepare_request(request):
+    """
+    Authenticate and throttle the way DRF's APIView would
+
+    Returns:
+        An error JsonResponse (401/429), or None with request.user set
+    """
+    return await sync_to_async(_authenticate_and_throttle)(request)
@@ -0,0 +1,20 @@
+"""
+Cache helpers - Whether the cache is shared between worker processes
+
+LocMemCache lives in one process. With several gunicorn/uvicorn workers, an
+invalidation made in one worker (or in a management command) never reaches
+the others. Caches that must be invalidated across processes check
+is_shared_cache() and are skipped, or kept only briefly, on a per-process
+backend.
+"""
+from django.conf import settings
+
+PER_PROCESS_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def is_shared_cache(alias='default'):
+    """True when every worker process reads and writes the same cache entries"""
+    return settings.CACHES[alias]['BACKEND'] not in PER_PROCESS_BACKENDS
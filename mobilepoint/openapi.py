@@ -0,0 +1,138 @@
+"""
+OpenAPI schema - Precomputed document served from disk
+
+drf_spectacular builds the schema by introspecting every viewset and
+serializer. That is slow enough that we do it once, with
+`manage.py build_openapi_schema`, and commit the result to
+OPENAPI_SCHEMA_FILE (one file per API version). `build_openapi_schema --check`
+fails when the committed file no longer matches the code. entrypoint.sh
+rebuilds it next to collectstatic, so a container serves the schema of the
+code it runs without generating it in any worker.
+
+Each worker reads the file once. It is served
+- at /api/schema/ with an ETag and a short max-age, and
+- at /api/schema/<etag>.json as an immutable, year-long cacheable copy,
+  which Swagger UI and ReDoc load.
+
+If the file is missing (e.g. a fresh checkout in development), the schema is
+generated once per process instead of on every hit, and a warning is logged.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
+logger = logging.getLogger(__name__)
+
+OPENAPI_SCHEMA_FILE = getattr(settings, 'OPENAPI_SCHEMA_FILE', os.path.join(
+    settings.BASE_DIR, 'openapi', f"schema-{settings.SPECTACULAR_SETTINGS.get('VERSION', '1.0.0')}.json",
+))
+OPENAPI_SCHEMA_MAX_AGE = getattr(settings, 'OPENAPI_SCHEMA_MAX_AGE', 300)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+CONTENT_TYPE = 'application/vnd.oai.openapi+json'
+
+_lock = threading.Lock()
+_document = None
+
+
+class SchemaDocument:
+    def __init__(self, content):
+        self.content = content
+        self.etag = hashlib.sha256(content).hexdigest()[:16]
+
+    def response(self, request, max_age, immutable=False):
+        quoted = f'"{self.etag}"'
+        if quoted in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(self.content, content_type=CONTENT_TYPE)
+        response['ETag'] = quoted
+        patch_cache_control(response, public=True, max_age=max_age, immutable=immutable)
+        return response
+
+
+def generate_schema():
+    """Render the OpenAPI document for the current code as JSON bytes"""
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={'indent': 2}) + b'\n'
+
+
+def read_schema_file():
+    with open(OPENAPI_SCHEMA_FILE, 'rb') as f:
+        return f.read()
+
+
+def get_schema_document():
+    """The schema for this process, loaded from disk on first use"""
+    global _document
+    if _document is None:
+        with _lock:
+            if _document is None:
+                try:
+                    content = read_schema_file()
+                except FileNotFoundError:
+                    logger.warning(
+                        'OpenAPI schema file %s is missing; generating it in-process. '
+                        'Run "manage.py build_openapi_schema" and commit the result.', OPENAPI_SCHEMA_FILE
+                    )
+                    content = generate_schema()
+                _document = SchemaDocument(content)
+    return _document
+
+
+@require_safe
+def schema_view(request):
+    return get_schema_document().response(request, OPENAPI_SCHEMA_MAX_AGE)
+
+
+@require_safe
+def versioned_schema_view(request, etag):
+    document = get_schema_document()
+    if etag != document.etag:
+        # An old link from before a deploy; send it to the current version
+        return redirect('schema-versioned', etag=document.etag)
+    return document.response(request, IMMUTABLE_MAX_AGE, immutable=True)
+
+
+class PrecomputedSchemaUIMixin:
+    """Point the UI at the content-addressed schema URL, so browsers cache it until it changes"""
+
+    def get(self, request, *args, **kwargs):
+        self.url = reverse('schema-versioned', kwargs={'etag': get_schema_document().etag})
+        return super().get(request, *args, **kwargs)
+
+
+UI_BASE_VIEWS = {
+    'swagger': 'SpectacularSwaggerView',
+    'redoc': 'SpectacularRedocView',
+}
+_ui_views = {}
+
+
+def ui_view(kind):
+    """
+    Swagger UI ('swagger') or ReDoc ('redoc') view
+
+    drf_spectacular.views pulls in the schema generator and every contrib
+    extension, which only these pages need. It is imported on the first docs
+    request rather than with the URLconf in every worker.
+    """
+    def view(request, *args, **kwargs):
+        if kind not in _ui_views:
+            from drf_spectacular import views
+
+            base = getattr(views, UI_BASE_VIEWS[kind])
+            _ui_views[kind] = type(kind.title() + 'View', (PrecomputedSchemaUIMixin, base), {}).as_view()
+        return _ui_views[kind](request, *args, **kwargs)
+    return view
@@ -0,0 +1,226 @@
+"""
+Request profiling - On-demand cProfile runs for staff
+
+A staff user adds ?_profile=1 to any URL (or sends an "X-Profile: 1" header)
+and the request is run under cProfile. Two files are written to
+PROFILE_STORE_DIR:
+- <id>.pstats: the raw profile, for snakeviz / pstats / gprof2dot
+- <id>.json: a summary with time per layer (serializers, ORM compile, DB
+  execute, rendering) and the hottest functions by cumulative time
+
+The store keeps the newest PROFILE_STORE_MAX profiles and deletes older ones.
+Staff can list, read and download them at /admin/profiles/.
+
+The middleware is only installed when PROFILING_ENABLED is True. Otherwise
+Django drops it at startup (MiddlewareNotUsed), so normal requests pay nothing.
+Only one request per process is profiled at a time; cProfile cannot run two
+profilers at once.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+PROFILE_STORE_DIR = getattr(settings, 'PROFILE_STORE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+PROFILE_STORE_MAX = getattr(settings, 'PROFILE_STORE_MAX', 50)
+PROFILE_QUERY_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TOP_FUNCTIONS = 40
+
+PROFILE_ID = re.compile(r'^\d{8}T\d{6}-[0-9a-f]{8}$')
+
+# (layer, predicate on (filename, function name)); first match wins, the rest is "app"
+LAYERS = [
+    ('db_execute', lambda path, name: (
+        '/django/db/backends/' in path or 'sqlite3' in name or 'psycopg' in path or 'psycopg' in name
+    )),
+    ('orm_compile', lambda path, name: '/django/db/models/' in path),
+    ('serializers', lambda path, name: (
+        '/rest_framework/serializers.py' in path or '/rest_framework/fields.py' in path
+        or '/rest_framework/relations.py' in path or path.endswith('serializers.py')
+    )),
+    ('rendering', lambda path, name: (
+        '/rest_framework/renderers.py' in path or '/django/template/' in path or '/json/' in path
+        or '/django/core/serializers/json.py' in path
+    )),
+    ('framework', lambda path, name: '/django/' in path or '/rest_framework/' in path),
+]
+
+_profiling = threading.Lock()
+
+
+def wants_profile(request):
+    return request.GET.get(PROFILE_QUERY_PARAM) == '1' or request.META.get(PROFILE_HEADER) == '1'
+
+
+def is_staff_request(request):
+    """Session users are resolved by AuthenticationMiddleware; API clients send a JWT"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    from accounts.authentication import CachedJWTAuthentication
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    return bool(result) and result[0].is_staff
+
+
+def layer_of(path, name):
+    for layer, matches in LAYERS:
+        if matches(path, name):
+            return layer
+    return 'app'
+
+
+def function_label(path, line, name):
+    if path == '~':
+        return name
+    for marker in ('site-packages/', 'dist-packages/', str(settings.BASE_DIR) + os.sep):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    return f'{path}:{line}({name})'
+
+
+def summarize(profiler):
+    """
+    Flatten a profile into per-layer totals and the hottest functions
+
+    Layer totals add up own time (tottime), so every profiled second is counted
+    exactly once. Functions are ranked by cumulative time, which is what you
+    read top-down as a call tree.
+    """
+    import pstats
+
+    stats = pstats.Stats(profiler).stats
+    layers = {}
+    functions = []
+    for (path, line, name), (_, calls, own, cumulative, _) in stats.items():
+        layer = layer_of(path, name)
+        layers[layer] = layers.get(layer, 0.0) + own
+        functions.append({
+            'function': function_label(path, line, name),
+            'layer': layer,
+            'calls': calls,
+            'own_ms': round(own * 1000, 2),
+            'cumulative_ms': round(cumulative * 1000, 2),
+        })
+    functions.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    by_layer = {}
+    for row in functions:
+        rows = by_layer.setdefault(row['layer'], [])
+        if len(rows) < 10:
+            rows.append(row)
+    return {
+        'layers_ms': {layer: round(seconds * 1000, 2) for layer, seconds in sorted(layers.items(), key=lambda item: -item[1])},
+        'top_functions': functions[:TOP_FUNCTIONS],
+        'top_by_layer': by_layer,
+    }
+
+
+# --------------------------------------------------------------------------
+# On-disk store
+# --------------------------------------------------------------------------
+
+def profile_path(profile_id, extension):
+    if not PROFILE_ID.match(profile_id):
+        raise ValueError(f'Invalid profile id: {profile_id!r}')
+    return os.path.join(PROFILE_STORE_DIR, f'{profile_id}.{extension}')
+
+
+def save_profile(profiler, summary):
+    os.makedirs(PROFILE_STORE_DIR, exist_ok=True)
+    profile_id = f'{time.strftime("%Y%m%dT%H%M%S", time.gmtime())}-{uuid.uuid4().hex[:8]}'
+    profiler.dump_stats(profile_path(profile_id, 'pstats'))
+    summary['id'] = profile_id
+    with open(profile_path(profile_id, 'json'), 'w') as f:
+        json.dump(summary, f)
+    prune_profiles()
+    return profile_id
+
+
+def list_profiles():
+    """Stored profile summaries, newest first"""
+    try:
+        names = sorted((name for name in os.listdir(PROFILE_STORE_DIR) if name.endswith('.json')), reverse=True)
+    except FileNotFoundError:
+        return []
+    summaries = []
+    for name in names:
+        try:
+            with open(os.path.join(PROFILE_STORE_DIR, name)) as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+
+def load_profile(profile_id):
+    with open(profile_path(profile_id, 'json')) as f:
+        return json.load(f)
+
+
+def prune_profiles():
+    """Keep the newest PROFILE_STORE_MAX profiles; ids sort by creation time"""
+    ids = sorted({name.rsplit('.', 1)[0] for name in os.listdir(PROFILE_STORE_DIR) if PROFILE_ID.match(name.rsplit('.', 1)[0])})
+    for profile_id in ids[:max(len(ids) - PROFILE_STORE_MAX, 0)]:
+        for extension in ('json', 'pstats'):
+            try:
+                os.remove(profile_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+# --------------------------------------------------------------------------
+# Middleware
+# --------------------------------------------------------------------------
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request) or not is_staff_request(request):
+            return self.get_response(request)
+        if not _profiling.acquire(blocking=False):
+            # Another request in this process is already being profiled
+            return self.get_response(request)
+
+        import cProfile
+
+        try:
+            profiler = cProfile.Profile()
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            total = time.perf_counter() - started
+        finally:
+            _profiling.release()
+
+        summary = summarize(profiler)
+        summary.update({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'at': time.time(),
+        })
+        try:
+            response['X-Profile-Id'] = save_profile(profiler, summary)
+        except OSError:
+            logger.exception('Could not store profile for %s', request.path)
+        return response
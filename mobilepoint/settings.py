@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 # SITE_URL = "http://127.0.0.1:8000" if DEBUG else "https://mobilepoint.sayathari.com"
+# Absolute public URL (https://host); newsletter unsubscribe links are built from it
 SITE_URL = os.getenv("SITE_URL")
 
 SPECTACULAR_SETTINGS = {
@@ -60,13 +61,16 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
 }
+# Committed output of "manage.py build_openapi_schema", served by /api/schema/ (mobilepoint/openapi.py)
+OPENAPI_SCHEMA_FILE = os.path.join(BASE_DIR, "openapi", f"schema-{SPECTACULAR_SETTINGS['VERSION']}.json")
+OPENAPI_SCHEMA_MAX_AGE = int(os.getenv("OPENAPI_SCHEMA_MAX_AGE", 300))
 
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
@@ -80,8 +84,8 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "mobilepoint.throttling.SharedAnonRateThrottle",
+        "mobilepoint.throttling.SharedUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/hour",  # Anonymous users: 100 requests per hour
@@ -91,6 +95,10 @@ REST_FRAMEWORK = {
     },
 }
 
+# Throttle counters shared by all worker processes (mobilepoint/throttling.py)
+THROTTLE_DB_PATH = os.getenv("THROTTLE_DB_PATH", os.path.join(BASE_DIR, "throttle.sqlite3"))
+THROTTLE_MAX_KEYS = int(os.getenv("THROTTLE_MAX_KEYS", 100000))
+
 # JWT Configuration
 from datetime import timedelta
 
@@ -132,8 +140,41 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "mobilepoint.sql_instrumentation.SQLInstrumentationMiddleware",
+    "mobilepoint.profiling.ProfilingMiddleware",
 ]
 
+# Per-request SQL instrumentation (mobilepoint/sql_instrumentation.py)
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "True") == "True"
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+SQL_WARN_QUERY_COUNT = int(os.getenv("SQL_WARN_QUERY_COUNT", 50))
+SQL_WARN_DB_MS = int(os.getenv("SQL_WARN_DB_MS", 500))
+
+# Staff-only ?_profile=1 cProfile runs (mobilepoint/profiling.py); off means the middleware is not loaded
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILE_STORE_DIR = os.getenv("PROFILE_STORE_DIR", os.path.join(BASE_DIR, "profiles"))
+PROFILE_STORE_MAX = int(os.getenv("PROFILE_STORE_MAX", 50))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "mobilepoint.sql": {
+            "handlers": ["console"],
+            "level": os.getenv("SQL_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "mobilepoint.startup": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 ROOT_URLCONF = "mobilepoint.urls"
 
 TEMPLATES = [
@@ -180,6 +221,28 @@ else:
     }
     
 
+# Server mode: "wsgi" (gunicorn sync workers) or "asgi" (uvicorn, see serve.sh).
+# In ASGI mode the hot read endpoints are served by async views (mobilepoint/urls.py).
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", str(SERVER_MODE == "asgi")) == "True"
+# Warm each worker before its first request (mobilepoint/startup.py, gunicorn.conf.py)
+WARM_UP_WORKERS = os.getenv("WARM_UP_WORKERS", "True") == "True"
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared backend
+# (e.g. FileBasedCache or DatabaseCache) so gunicorn workers see the same invalidations.
+# Caches that must be invalidated across workers check mobilepoint/caching.py;
+# the JWT user cache keeps users for AUTH_USER_LOCAL_CACHE_TIMEOUT seconds on a
+# per-process backend (0 disables it there) and for 5 minutes on a shared one.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "mobilepoint"),
+        "TIMEOUT": 300,
+    }
+}
+AUTH_USER_LOCAL_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_LOCAL_CACHE_TIMEOUT", 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -216,14 +279,50 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 STATIC_URL = os.getenv("STATIC_URL")
 # STATIC_URL = "static/"
-STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
+STATIC_ROOT = os.getenv("STATIC_ROOT", os.path.join(BASE_DIR, "staticfiles"))
 STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
+# collectstatic writes content-hashed copies plus .gz/.br siblings (mobilepoint/storage.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "mobilepoint.storage.CompressedManifestStaticFilesStorage"},
+}
 
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = os.getenv("MEDIA_URL")
 # MEDIA_URL = "/media/"
 
+# Responsive image renditions (product/images.py)
+IMAGE_RENDITION_WIDTHS = [320, 640, 1024, 1600]
+IMAGE_RENDITION_WORKERS = int(os.getenv("IMAGE_RENDITION_WORKERS", 2))
+
+# Email
+# Set EMAIL_BACKEND to django.core.mail.backends.filebased.EmailBackend (with EMAIL_FILE_PATH)
+# or locmem.EmailBackend to run the outbox worker locally without an SMTP server.
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", os.path.join(BASE_DIR, "sent_emails"))
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
+
+# Transactional email outbox (accounts/outbox.py)
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv("OUTBOX_RETRY_BASE_SECONDS", 60))
+# Sent and failed emails are deleted after this many days (bodies of sent ones are blanked at once)
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", 7))
+
+# Newsletter campaigns (website/newsletter.py)
+NEWSLETTER_WORKERS = int(os.getenv("NEWSLETTER_WORKERS", 4))
+NEWSLETTER_BATCH_SIZE = int(os.getenv("NEWSLETTER_BATCH_SIZE", 100))
+NEWSLETTER_RATE = float(os.getenv("NEWSLETTER_RATE", 0))
+
+# Back-in-stock alert rate limit (wishlist/notifications.py): emails per batch, seconds between batches
+BACK_IN_STOCK_BATCH_SIZE = int(os.getenv("BACK_IN_STOCK_BATCH_SIZE", 200))
+BACK_IN_STOCK_BATCH_INTERVAL = float(os.getenv("BACK_IN_STOCK_BATCH_INTERVAL", 30))
+
 # DASHUB_SETTINGS = {
 #     "site_logo": "/static/logo.png",
 #     "site_icon": "/static/favicon.ico",
@@ -0,0 +1,194 @@
+"""
+SQL instrumentation - Per-request query counts, DB time and N+1 suspects
+
+SQLInstrumentationMiddleware wraps every database connection for the length of
+the request. It records:
+- each query's SQL template (the parametrised SQL, with IN lists collapsed)
+- the time each query took
+
+From that it reports:
+- a Server-Timing header (for DEBUG responses or staff users) that shows up
+  in the browser devtools
+- one structured JSON log line per request on the "mobilepoint.sql" logger
+- N+1 suspects: any template executed SQL_N_PLUS_ONE_THRESHOLD or more times
+  in the same request
+
+Requests that look bad (N+1 suspects, too many queries, too much DB time) are
+kept in a per-process ring buffer, which staff can view at
+/admin/sql-profile/.
+
+The middleware works under WSGI and ASGI. The recorder is held in a context
+variable and every connection carries a wrapper that reports to it, so the
+queries of async views are counted too: sync_to_async (and run_sync in
+mobilepoint.async_api) copy the context into the thread that runs them. Plain
+thread pools do not (homepage sections in WSGI mode, renditions), so their
+queries are not counted.
+
+With SQL_INSTRUMENTATION = False Django drops the middleware at startup
+(MiddlewareNotUsed) and no wrapper is installed.
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .profiling import is_staff_request
+
+logger = logging.getLogger('mobilepoint.sql')
+
+SQL_N_PLUS_ONE_THRESHOLD = getattr(settings, 'SQL_N_PLUS_ONE_THRESHOLD', 5)
+SQL_WARN_QUERY_COUNT = getattr(settings, 'SQL_WARN_QUERY_COUNT', 50)
+SQL_WARN_DB_MS = getattr(settings, 'SQL_WARN_DB_MS', 500)
+SQL_PROFILE_BUFFER_SIZE = getattr(settings, 'SQL_PROFILE_BUFFER_SIZE', 100)
+
+# "IN (%s, %s, %s)" and multi-row VALUES differ only in length; count them as one template
+_PLACEHOLDER_LIST = re.compile(r'\((?:%s, )+%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+worst_requests = deque(maxlen=SQL_PROFILE_BUFFER_SIZE)
+
+_current_recorder = ContextVar('sql_recorder', default=None)
+
+
+def sql_template(sql):
+    return _PLACEHOLDER_LIST.sub('(%s, ...)', _WHITESPACE.sub(' ', sql).strip())
+
+
+class QueryRecorder:
+    """connection.execute_wrapper() callable that tallies queries per template"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.templates = {}
+        # Async views run queries from several threads at once
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            template = sql_template(sql)
+            with self._lock:
+                self.count += 1
+                self.duration += elapsed
+                stats = self.templates.setdefault(template, [0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+
+    def duplicates(self):
+        """[(template, count, seconds)] for templates run more than once, most frequent first"""
+        repeated = [(sql, count, seconds) for sql, (count, seconds) in self.templates.items() if count > 1]
+        return sorted(repeated, key=lambda row: (-row[1], -row[2]))
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper on every connection: reports to the current request's recorder, if any"""
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        # First, so that connection.execute_wrapper() blocks, which pop() the last
+        # wrapper on exit, never remove this one
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def build_report(request, response, recorder, total):
+    duplicates = recorder.duplicates()
+    suspects = [row for row in duplicates if row[1] >= SQL_N_PLUS_ONE_THRESHOLD]
+    return {
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'queries': recorder.count,
+        'unique_queries': len(recorder.templates),
+        'db_ms': round(recorder.duration * 1000, 2),
+        'total_ms': round(total * 1000, 2),
+        'n_plus_one': [
+            {'sql': sql[:500], 'count': count, 'ms': round(seconds * 1000, 2)}
+            for sql, count, seconds in suspects[:5]
+        ],
+        'duplicated': sum(count - 1 for _, count, _ in duplicates),
+        'at': time.time(),
+    }
+
+
+def is_worth_keeping(report):
+    return bool(report['n_plus_one']) or report['queries'] >= SQL_WARN_QUERY_COUNT or report['db_ms'] >= SQL_WARN_DB_MS
+
+
+class SQLInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened from now on, in any thread
+        connection_created.connect(install_wrapper)
+
+    def start(self):
+        # Connections this thread opened before the middleware was loaded
+        for connection in connections.all(initialized_only=True):
+            install_wrapper(connection)
+        recorder = QueryRecorder()
+        return recorder, _current_recorder.set(recorder), time.perf_counter()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        recorder, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        self.report(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        recorder, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        # is_staff_request() may authenticate a JWT against the database
+        await sync_to_async(self.report)(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    def report(self, request, response, recorder, total):
+        report = build_report(request, response, recorder, total)
+        if is_worth_keeping(report):
+            worst_requests.append(report)
+        if report['n_plus_one']:
+            logger.warning(json.dumps(report))
+        else:
+            logger.info(json.dumps(report))
+
+        # Session users, and API clients authenticated by their JWT
+        if settings.DEBUG or is_staff_request(request):
+            app_ms = max(report['total_ms'] - report['db_ms'], 0)
+            response['Server-Timing'] = (
+                f'db;dur={report["db_ms"]};desc="{report["queries"]} queries", '
+                f'dup;desc="{report["duplicated"]} duplicated, {len(report["n_plus_one"])} N+1 suspects", '
+                f'app;dur={app_ms:.2f}'
+            )
@@ -0,0 +1,144 @@
+"""
+Worker startup - Warm-up run once per worker process, before the first request
+
+A fresh worker otherwise pays, on its first requests:
+- compiling every URL pattern's regex
+- resolving DRF's settings (importing authentication, throttle and renderer classes)
+- building model metadata caches while serializer field maps are first built
+- compiling templates
+- loading the per-process reference caches (ContentTypes, the attribute index)
+
+warm_up() does all of that up front and logs how long each step took on the
+"mobilepoint.startup" logger. gunicorn calls it from post_worker_init
+(gunicorn.conf.py). Under uvicorn, asgi.py runs it in a separate thread,
+because the ASGI app is imported inside the event loop, and waits for it to
+finish before handing over the application.
+
+Every step is best effort: a failing step is logged and skipped, and never
+stops the worker from serving.
+"""
+import json
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, get_resolver, resolve, reverse
+
+logger = logging.getLogger('mobilepoint.startup')
+
+WARM_UP_TEMPLATES = [
+    'admin/base_site.html',
+    'admin/index.html',
+    'admin/change_list.html',
+    'admin/change_form.html',
+]
+
+
+def warm_urls():
+    """Populate the reverse lookup tables and compile every URL regex"""
+    from .urls import router
+
+    get_resolver().reverse_dict  # noqa: B018 - populates the resolver
+    for _prefix, _viewset, basename in router.registry:
+        resolve(reverse(f'{basename}-list'))
+    try:
+        # A path that matches nothing walks, and so compiles, every pattern
+        resolve('/__warm_up__/no-such-path/')
+    except Resolver404:
+        pass
+
+
+def warm_rest_framework():
+    """Resolve DRF and simplejwt settings, importing the classes they name"""
+    from rest_framework.settings import api_settings
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    for name in api_settings.defaults:
+        getattr(api_settings, name)
+    for name in jwt_settings.defaults:
+        getattr(jwt_settings, name)
+
+
+def warm_serializers():
+    """Build the field map of every project serializer, which fills the model metadata caches"""
+    from rest_framework import serializers
+
+    project_apps = {config.name for config in apps.get_app_configs() if config.path.startswith(str(settings.BASE_DIR))}
+    pending = [serializers.Serializer]
+    seen = set()
+    while pending:
+        cls = pending.pop()
+        for subclass in cls.__subclasses__():
+            if subclass in seen:
+                continue
+            seen.add(subclass)
+            pending.append(subclass)
+            if subclass.__module__.split('.')[0] not in project_apps:
+                continue
+            try:
+                subclass().fields
+            except Exception:
+                # Serializers that need context or arguments to build their fields
+                logger.debug('Skipped warming %s', subclass.__qualname__, exc_info=True)
+
+
+def warm_templates():
+    from django.template.loader import get_template
+
+    for name in WARM_UP_TEMPLATES:
+        get_template(name)
+
+
+def warm_reference_caches():
+    """Per-process caches that every worker would otherwise fill on its first requests"""
+    from django.contrib.contenttypes.models import ContentType
+    from product.attribute_index import attribute_index
+
+    ContentType.objects.get_for_models(*apps.get_models())
+    attribute_index.products()
+
+
+STEPS = [
+    ('urls', warm_urls),
+    ('rest_framework', warm_rest_framework),
+    ('serializers', warm_serializers),
+    ('templates', warm_templates),
+    ('reference_caches', warm_reference_caches),
+]
+
+
+def warm_up():
+    """
+    Run every warm-up step in this process
+
+    Returns:
+        dict of step name -> milliseconds (None for a step that failed)
+    """
+    if not getattr(settings, 'WARM_UP_WORKERS', True):
+        return {}
+
+    started = time.perf_counter()
+    timings = {}
+    try:
+        for name, step in STEPS:
+            step_started = time.perf_counter()
+            try:
+                step()
+                timings[name] = round((time.perf_counter() - step_started) * 1000, 1)
+            except Exception:
+                logger.exception('Worker warm-up step %s failed', name)
+                timings[name] = None
+    finally:
+        # The first request opens its own connection; don't hand it one opened here
+        connections.close_all()
+
+    logger.info(json.dumps({
+        'event': 'worker_warm_up',
+        'pid': os.getpid(),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1),
+        'steps': timings,
+    }))
+    return timings
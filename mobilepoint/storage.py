@@ -0,0 +1,122 @@
+"""
+Static storage - Content-hashed, precompressed files for nginx
+
+collectstatic with CompressedManifestStaticFilesStorage writes, for every
+static file:
+- the file itself, plus a copy named after its content hash
+  (css/admin.css -> css/admin.5f1c0e2d9a3b.css); {% static %} links to the
+  hashed copy, so it can be cached forever and changes name when it changes
+- a .gz sibling, and a .br sibling when the brotli package is installed,
+  for text-like files that actually get smaller
+
+nginx serves the siblings with gzip_static (and brotli_static where the
+module is available) instead of compressing on every request. See nginx.conf
+for the cache headers.
+"""
+import gzip
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.htm', '.txt', '.xml',
+    '.ico', '.ttf', '.otf', '.eot',
+}
+# Below this the compressed response is no smaller once headers are counted
+COMPRESS_MIN_SIZE = 256
+COMPRESS_WORKERS = getattr(settings, 'STATIC_COMPRESS_WORKERS', os.cpu_count() or 2)
+
+
+def brotli_compressor():
+    try:
+        import brotli
+    except ImportError:
+        logger.warning('brotli is not installed; writing .gz static siblings only')
+        return None
+    return lambda data: brotli.compress(data, quality=11)
+
+
+def compress_file(path, encoders):
+    """
+    Write the compressed siblings of one file
+
+    Args:
+        path: Absolute path of the collected file
+        encoders: List of (suffix, compress function)
+
+    Returns:
+        Number of siblings written
+    """
+    written = 0
+    modified = os.path.getmtime(path)
+    data = None
+    for suffix, compress in encoders:
+        target = path + suffix
+        if os.path.exists(target) and os.path.getmtime(target) >= modified:
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            # Not worth serving; drop any sibling left by an older version of the file
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        with open(target, 'wb') as f:
+            f.write(compressed)
+        written += 1
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # A template naming a file that is not collected (tests, a fresh checkout)
+    # links to the unhashed name instead of raising
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning('Static file %r is missing; linking to the unhashed name', name)
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        # A url() in collected CSS naming a file that does not exist (third-party
+        # app CSS does this) is left as written instead of failing collectstatic
+        convert = super().url_converter(name, hashed_files, template)
+
+        def converter(matchobj):
+            try:
+                return convert(matchobj)
+            except ValueError:
+                logger.warning('%s references missing static file %r; leaving it unhashed',
+                               name, matchobj.group('url'))
+                return matchobj.group('matched')
+
+        return converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        names = set(paths) | set(self.hashed_files.values())
+        files = [
+            self.path(name) for name in names
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+            and self.exists(name) and self.size(name) >= COMPRESS_MIN_SIZE
+        ]
+        encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        brotli = brotli_compressor()
+        if brotli is not None:
+            encoders.append(('.br', brotli))
+
+        with ThreadPoolExecutor(max_workers=COMPRESS_WORKERS) as executor:
+            written = sum(executor.map(lambda path: compress_file(path, encoders), files))
+        logger.info('Wrote %s compressed static files for %s files', written, len(files))
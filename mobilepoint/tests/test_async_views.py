@@ -0,0 +1,66 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test import TestCase
+from django.test.client import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from mobilepoint.throttling import SharedStoreThrottleMixin
+from product.async_views import deals_live, product_detail, product_list
+from product.models import Product
+
+
+class AsyncReadViewTests(TestCase):
+    """The ASGI views return what the DRF views do, with one connection per request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_scale', '--scale', 'small', '--products', '25', '--variants', '50', '--users', '2',
+                     '--orders', '2', '--reviews', '5', '--seed', '1', stdout=StringIO())
+
+    def setUp(self):
+        # Throttle counters live in a file outside the test database and would leak between runs
+        patcher = mock.patch.object(SharedStoreThrottleMixin, 'allow_request', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def call(self, view, path, data=None, **kwargs):
+        request = AsyncRequestFactory().get(path, data)
+        reset_queries()  # seeding filled the capped query log
+        with CaptureQueriesContext(connection) as queries:
+            response = async_to_sync(view)(request, **kwargs)
+        return response, queries
+
+    def test_product_list_matches_the_drf_view(self):
+        for params in ({}, {'page': 2}, {'page': 'last', 'ordering': 'price'}):
+            response, queries = self.call(product_list, '/api/products/', params)
+            self.assertEqual(response.status_code, 200)
+            # Every query, COUNT included, ran on the test's own connection
+            self.assertTrue(any('COUNT(' in query['sql'] for query in queries))
+            self.assertEqual(json.loads(response.content), self.client.get(reverse('product-list'), params).json())
+
+    def test_page_out_of_range_is_a_404(self):
+        response, _ = self.call(product_list, '/api/products/', {'page': 99})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(json.loads(response.content), {'detail': 'Invalid page.'})
+
+    def test_product_detail_and_live_deals(self):
+        slug = Product.objects.filter(is_active=True).values_list('slug', flat=True).first()
+        response, _ = self.call(product_detail, f'/api/products/{slug}/', slug=slug)
+        self.assertEqual(json.loads(response.content), self.client.get(reverse('product-detail', args=[slug])).json())
+        response, _ = self.call(product_detail, '/api/products/missing/', slug='missing')
+        self.assertEqual(response.status_code, 404)
+
+        response, _ = self.call(deals_live, '/api/deals/live/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), self.client.get(reverse('deal-live')).json())
+
+    def test_no_connection_is_closed_during_the_request(self):
+        with mock.patch('django.db.connections.close_all') as close_all:
+            self.call(product_list, '/api/products/')
+        close_all.assert_not_called()
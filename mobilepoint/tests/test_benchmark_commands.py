@@ -0,0 +1,39 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from product.management.commands import advise_indexes, benchmark_endpoints
+
+# The commands set up the test environment themselves, which the test runner already did
+TEST_ENVIRONMENT = [
+    mock.patch.object(module, name)
+    for module in (benchmark_endpoints, advise_indexes)
+    for name in ('setup_test_environment', 'teardown_test_environment')
+]
+
+
+class BenchmarkCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_scale', '--scale', 'small', '--products', '20', '--variants', '40', '--users', '5',
+                     '--orders', '5', '--reviews', '5', '--seed', '1', stdout=StringIO())
+
+    def setUp(self):
+        for patch in TEST_ENVIRONMENT:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_benchmark_runs_every_endpoint_on_a_seeded_database(self):
+        out = StringIO()
+        call_command('benchmark_endpoints', '--iterations', '1', '--warmup', '0', stdout=out)
+        report = out.getvalue()
+        for name in benchmark_endpoints.ENDPOINTS:
+            self.assertRegex(report, rf'\n{name} .* 0\n')
+
+    def test_advise_indexes_captures_the_benchmark_workload(self):
+        out = StringIO()
+        call_command('advise_indexes', '--iterations', '1', '--min-rows', '0', '--repeat', '1', stdout=out)
+        self.assertRegex(out.getvalue(), r'[1-9]\d* distinct SELECTs')
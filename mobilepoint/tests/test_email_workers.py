@@ -0,0 +1,47 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import OutboxEmail
+from accounts.outbox import queue_email
+from website.models import NewsletterCampaign, NewsletterSubscriber
+
+
+class OutboxWorkerTests(TestCase):
+
+    def test_sent_bodies_are_blanked_and_old_rows_pruned(self):
+        email = queue_email('Reset your password', 'https://example.com/reset/token', 'user@example.com')
+        old = queue_email('Verify', 'https://example.com/verify/token', 'old@example.com')
+        OutboxEmail.objects.filter(pk=old.pk).update(
+            status=OutboxEmail.STATUS_SENT, created_at=timezone.now() - timedelta(days=30)
+        )
+
+        call_command('send_outbox_emails', '--retention-days', '7', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('/reset/token', mail.outbox[0].body)
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.STATUS_SENT)
+        self.assertEqual((email.body, email.html_body), ('', ''))
+        self.assertFalse(OutboxEmail.objects.filter(pk=old.pk).exists())
+
+
+@override_settings(SITE_URL='https://shop.example.com')
+class ScheduledNewsletterTests(TestCase):
+
+    def test_queued_campaigns_are_sent(self):
+        NewsletterSubscriber.objects.create(email='reader@example.com')
+        queued = NewsletterCampaign.objects.create(subject='Queued', body_text='Hello', status='queued')
+        draft = NewsletterCampaign.objects.create(subject='Draft', body_text='Hello')
+
+        call_command('send_newsletter', '--queued', '--workers', '1', stdout=StringIO())
+
+        queued.refresh_from_db()
+        draft.refresh_from_db()
+        self.assertEqual((queued.status, queued.sent_count), ('sent', 1))
+        self.assertEqual(draft.status, 'draft')
+        self.assertEqual([message.subject for message in mail.outbox], ['Queued'])
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from product.models import Category
+
+User = get_user_model()
+
+
+class CachedJWTUserTests(TestCase):
+    """The default LocMemCache caches the user per process, for USER_LOCAL_CACHE_TIMEOUT"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='reader@example.com', password='pw', first_name='Reader',
+                                             last_name='One', is_active=True)
+        self.user.favorite_categories.add(Category.objects.create(name='Phones', slug='phones'))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def get_curated(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('product-curated'))
+        return response, [query['sql'] for query in queries]
+
+    def test_user_is_served_from_the_cache_until_it_changes(self):
+        response, first = self.get_curated()
+        self.assertEqual(response.status_code, 200)
+        response, second = self.get_curated()
+        self.assertEqual(response.status_code, 200)
+        # No user lookup, and favourites come from the cached prefetch
+        self.assertLess(len(second), len(first))
+        self.assertFalse(any('favorite_categories' in sql and 'product_product' not in sql for sql in second))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        response, _ = self.get_curated()
+        self.assertEqual(response.status_code, 401)
+
+    def test_curated_keeps_the_favourites_subquery_without_the_prefetch(self):
+        client = APIClient()
+        client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('product-curated'))
+        self.assertEqual(response.status_code, 200)
+        favourites = [query['sql'] for query in queries if 'favorite_categories' in query['sql']]
+        self.assertTrue(favourites)
+        self.assertTrue(all('product_product' in sql for sql in favourites))
@@ -0,0 +1,12 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+
+class OpenAPISchemaTests(TestCase):
+
+    def test_committed_schema_is_up_to_date(self):
+        try:
+            call_command('build_openapi_schema', '--check')
+        except CommandError as exc:
+            self.fail(str(exc))
@@ -0,0 +1,313 @@
+"""
+Query-count regression tests for the router-registered API
+
+Every GET action of every viewset in mobilepoint.urls.router is requested
+twice: once with SMALL rows of every kind and again after growing the data to
+LARGE rows. The number of SQL queries must be the same both times (a per-row
+query shows up as growth), and must stay within the endpoint's budget in
+query_budgets.json.
+
+A new endpoint fails until it has a budget entry. To record or refresh the
+budgets after an intentional change, run
+
+    UPDATE_QUERY_BUDGETS=1 python manage.py test mobilepoint.tests.test_query_budgets
+
+and commit the rewritten query_budgets.json. A budget of null means "not yet
+recorded": the growth check still applies, the ceiling does not.
+
+Endpoints in KNOWN_PER_ROW still run a query per row. They skip the growth
+check but not their budget, and fail once they stop growing so that the
+exemption is removed with the fix.
+"""
+import json
+import os
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from menu.models import Menu, MenuItem, Page
+from mobilepoint.urls import router
+from orders.models import Order, OrderItem, OrderStatusHistory
+from product.models import (
+    Brand, Category, Deal, Product, ProductCombo, ProductComboItem, ProductImage, ProductVariant,
+    Promotion, RecentlyViewedProduct, VariantAttribute, VariantAttributeValue
+)
+from reviews.models import ProductReview
+from website.models import (
+    Advertisement, Carousel, CarouselSlide, ContactMessage, CuratedItem, NewsletterSubscriber, SiteSettings
+)
+from wishlist.models import Wishlist, WishlistItem
+
+User = get_user_model()
+
+BUDGET_FILE = Path(__file__).with_name('query_budgets.json')
+UPDATE_BUDGETS = os.getenv('UPDATE_QUERY_BUDGETS') == '1'
+
+# Both sizes fit on the first page of every paginated endpoint
+SMALL = 2
+LARGE = 5
+
+# Endpoint name -> what still queries per row
+KNOWN_PER_ROW = {}
+
+ADDRESS = {
+    'shipping_name': 'Test Customer', 'shipping_email': 'customer@example.com', 'shipping_phone': '9800000000',
+    'shipping_address': 'Main Road', 'shipping_city': 'Kathmandu', 'shipping_state': 'Bagmati',
+    'shipping_zip': '44600', 'shipping_country': 'Nepal',
+    'billing_name': 'Test Customer', 'billing_address': 'Main Road', 'billing_city': 'Kathmandu',
+    'billing_state': 'Bagmati', 'billing_zip': '44600', 'billing_country': 'Nepal',
+}
+
+
+def get_endpoints():
+    """
+    Every GET route of the API router
+
+    Returns:
+        list of (url name, basename, viewset, is detail route)
+    """
+    endpoints = []
+    for _prefix, viewset, basename in router.registry:
+        for route in router.get_routes(viewset):
+            if 'get' not in route.mapping:
+                continue
+            name = route.name.format(basename=basename)
+            endpoints.append((name, basename, viewset, route.detail))
+    return sorted(endpoints)
+
+
+def load_budgets():
+    with open(BUDGET_FILE) as f:
+        return json.load(f)
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email='staff@example.com', password='password', first_name='Staff', last_name='User',
+            is_active=True, is_staff=True, is_superuser=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        # Throttle state lives outside the test database and would leak between runs
+        patcher = mock.patch.object(APIView, 'get_throttles', return_value=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        now = timezone.now()
+        self.root = Category.objects.create(name='Root', slug='root')
+        self.color = VariantAttribute.objects.create(name='Color', display_name='Choose Color')
+        self.storage = VariantAttribute.objects.create(name='Storage', display_name='Choose Storage')
+        self.order = Order.objects.create(user=self.staff, subtotal=0, total=0, **ADDRESS)
+        self.promotion = Promotion.objects.create(
+            promotion_type=Promotion.PromotionType.FREE_SHIPPING, title='Free shipping', description='<p>x</p>',
+            start_date=now - timedelta(days=1), end_date=now + timedelta(days=7),
+        )
+        self.menu = Menu.objects.create(name='Header', location='header')
+        self.carousel = Carousel.objects.create(title='Home')
+        # Created by wishlist.signals.create_user_wishlist
+        self.wishlist = Wishlist.objects.get(user=self.staff)
+        SiteSettings.objects.get_or_create(id=1)
+        self.combo = None
+        self.rows = 0
+
+    # ------------------------------------------------------------------
+    # Fixture data
+    # ------------------------------------------------------------------
+
+    def grow(self, size):
+        """Add rows of every kind until there are `size` of each"""
+        now = timezone.now()
+        for i in range(self.rows, size):
+            category = Category.objects.create(name=f'Category {i}', slug=f'category-{i}', parent=self.root)
+            brand = Brand.objects.create(name=f'Brand {i}', slug=f'brand-{i}')
+            brand.category.add(category)
+            product = Product.objects.create(
+                name=f'Product {i}', slug=f'product-{i}', description='<p>Product</p>',
+                category=category, brand=brand, base_price=Decimal('1000.00'), is_featured=True,
+            )
+            ProductImage.objects.create(product=product, image=f'products/product-{i}.jpg')
+            variants = []
+            for storage in ('128GB', '256GB'):
+                variant = ProductVariant.objects.create(product=product, price=Decimal('1000.00'), stock_quantity=10)
+                variant.variant_attributes.add(
+                    VariantAttributeValue.objects.get_or_create(attribute=self.color, value=f'Color {i}')[0],
+                    VariantAttributeValue.objects.get_or_create(attribute=self.storage, value=storage)[0],
+                )
+                variants.append(variant)
+
+            customer = User.objects.create_user(
+                email=f'customer-{i}@example.com', password='password', first_name='Customer', last_name=str(i),
+                is_active=True,
+            )
+            ProductReview.objects.create(product=product, user=customer, rating=4, title='Good', is_approved=True)
+            ProductReview.objects.create(product=product, user=self.staff, rating=5, title='Great', is_approved=True)
+            Deal.objects.create(
+                product=product, title=f'Deal {i}', deal_type='daily', discount_percent=10, total_quantity=100,
+                start_at=now - timedelta(hours=1), end_at=now + timedelta(days=1), is_featured=True,
+            )
+            if self.combo is None:
+                self.combo = ProductCombo.objects.create(name='Combo', slug='combo', main_product=product, is_featured=True)
+            ProductComboItem.objects.create(combo=self.combo, product=product)
+            combo = ProductCombo.objects.create(name=f'Combo {i}', slug=f'combo-{i}', main_product=product)
+            ProductComboItem.objects.create(combo=combo, product=product)
+            self.promotion.products.add(product)
+            promotion = Promotion.objects.create(
+                promotion_type=Promotion.PromotionType.FREE_GIFT, title=f'Gift {i}', description='<p>x</p>',
+                start_date=now - timedelta(days=1), end_date=now + timedelta(days=7),
+            )
+            promotion.products.add(product)
+            RecentlyViewedProduct.objects.create(user=self.staff, product=product)
+            WishlistItem.objects.create(
+                wishlist=self.wishlist, product_variant=variants[0], price_when_added=Decimal('1200.00'),
+            )
+
+            order = Order.objects.create(user=self.staff, subtotal=variants[0].price, total=variants[0].price, **ADDRESS)
+            for target in (order, self.order):
+                OrderItem.objects.create(
+                    order=target, product=product, product_variant=variants[0], product_name=product.name,
+                    quantity=1, price=variants[0].price,
+                )
+                OrderStatusHistory.objects.create(order=target, status='pending', created_by=self.staff)
+
+            parent = MenuItem.objects.create(menu=self.menu, label_en=f'Item {i}', url=f'/item-{i}/')
+            MenuItem.objects.create(menu=self.menu, parent=parent, label_en=f'Child {i}', url=f'/child-{i}/')
+            footer = Menu.objects.create(name=f'Footer {i}', location='footer')
+            MenuItem.objects.create(menu=footer, label_en=f'Footer item {i}', url=f'/footer-{i}/')
+            Page.objects.create(title=f'Page {i}', slug=f'page-{i}', status='published', published_at=now)
+
+            CarouselSlide.objects.create(carousel=self.carousel, title=f'Slide {i}', product=product)
+            carousel = Carousel.objects.create(title=f'Carousel {i}')
+            CarouselSlide.objects.create(carousel=carousel, title=f'Slide {i}')
+            Advertisement.objects.create(title=f'Ad {i}', ad_type='photo', position='home_top', image=f'ads/ad-{i}.jpg')
+            CuratedItem.objects.create(product=product, category=category, title=f'Curated {i}', image=f'curated/{i}.jpg')
+            NewsletterSubscriber.objects.create(email=f'subscriber-{i}@example.com')
+            ContactMessage.objects.create(name='Visitor', email=f'visitor-{i}@example.com', subject='Hi', message='Hello')
+        self.rows = size
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def detail_object(self, basename):
+        """The object each detail route is requested for: the one whose related rows grow"""
+        objects = {
+            'category': lambda: self.root,
+            'brand': lambda: Brand.objects.order_by('pk').first(),
+            'product': lambda: Product.objects.order_by('pk').first(),
+            'variant': lambda: ProductVariant.objects.order_by('pk').first(),
+            'deal': lambda: Deal.objects.order_by('pk').first(),
+            'recently-viewed': lambda: RecentlyViewedProduct.objects.order_by('pk').first(),
+            'combo': lambda: self.combo,
+            'promotion': lambda: self.promotion,
+            'order': lambda: self.order,
+            'orderitem': lambda: OrderItem.objects.order_by('pk').first(),
+            'orderhistory': lambda: OrderStatusHistory.objects.order_by('pk').first(),
+            'productreview': lambda: ProductReview.objects.order_by('pk').first(),
+            'menu': lambda: self.menu,
+            'menu-item': lambda: MenuItem.objects.filter(parent__isnull=True).order_by('pk').first(),
+            'page': lambda: Page.objects.order_by('pk').first(),
+            'carousel': lambda: self.carousel,
+            'advertisement': lambda: Advertisement.objects.order_by('pk').first(),
+            'newsletter': lambda: NewsletterSubscriber.objects.order_by('pk').first(),
+            'contact': lambda: ContactMessage.objects.order_by('pk').first(),
+            'site-settings': lambda: SiteSettings.objects.get(pk=1),
+            'curated': lambda: CuratedItem.objects.order_by('pk').first(),
+            'wishlist': lambda: self.wishlist,
+            'wishlistitem': lambda: WishlistItem.objects.order_by('pk').first(),
+        }
+        return objects[basename]()
+
+    def url_for(self, name, basename, viewset, detail):
+        kwargs = {}
+        if detail:
+            lookup = viewset.lookup_url_kwarg or viewset.lookup_field
+            kwargs[lookup] = getattr(self.detail_object(basename), viewset.lookup_field)
+        if name == 'product-by-category':
+            kwargs['category_slug'] = self.root.slug
+        elif name == 'product-by-brand':
+            kwargs['brand_slug'] = Brand.objects.order_by('pk').first().slug
+        url = reverse(name, kwargs=kwargs)
+
+        query = {
+            'menu-by-location': 'location=header',
+            'menu-item-by-menu': f'menu_id={self.menu.pk}',
+            'menu-item-top-level': f'menu_id={self.menu.pk}',
+            'carousel-by-position': 'position=home_main',
+            'advertisement-by-position': 'position=home_top',
+            'promotion-by-type': 'type=free_gift',
+            'productreview-list': f'product={Product.objects.order_by("pk").first().pk}',
+            'product-filters-metadata': f'category={self.root.slug}',
+        }.get(name)
+        return f'{url}?{query}' if query else url
+
+    def count_queries(self, endpoint):
+        """(url, status code, number of queries) for one request"""
+        url = self.url_for(*endpoint)
+        # Count the uncached path; cached responses would hide per-row queries
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, HTTP_ACCEPT='application/json')
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return url, response.status_code, len(captured)
+
+    def measure(self):
+        counts = {}
+        for endpoint in get_endpoints():
+            url, status, count = self.count_queries(endpoint)
+            with self.subTest(endpoint=endpoint[0]):
+                self.assertLess(status, 400, f'GET {url} returned {status}')
+            counts[endpoint[0]] = count
+        return counts
+
+    # ------------------------------------------------------------------
+    # Tests
+    # ------------------------------------------------------------------
+
+    def test_every_endpoint_has_a_budget(self):
+        if UPDATE_BUDGETS:
+            self.skipTest('Budgets are being rewritten')
+        names = {endpoint[0] for endpoint in get_endpoints()}
+        budgets = load_budgets()
+        self.assertEqual(sorted(names - set(budgets)), [], 'Endpoints without a query budget')
+        self.assertEqual(sorted(set(budgets) - names), [], 'Budgets for endpoints that no longer exist')
+
+    def test_query_counts_do_not_grow_with_result_size(self):
+        self.grow(SMALL)
+        small = self.measure()
+        self.grow(LARGE)
+        large = self.measure()
+
+        if UPDATE_BUDGETS:
+            with open(BUDGET_FILE, 'w') as f:
+                json.dump(large, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+        budgets = load_budgets()
+        for name, count in large.items():
+            with self.subTest(endpoint=name):
+                if name in KNOWN_PER_ROW:
+                    self.assertGreater(
+                        count, small[name],
+                        f'{name} no longer queries per row; remove it from KNOWN_PER_ROW',
+                    )
+                else:
+                    self.assertEqual(
+                        count, small[name],
+                        f'{name}: {small[name]} queries for {SMALL} rows but {count} for {LARGE} (per-row query)',
+                    )
+                if budgets.get(name) is not None:
+                    self.assertLessEqual(count, budgets[name], f'{name} exceeds its query budget')
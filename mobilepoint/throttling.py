@@ -0,0 +1,168 @@
+"""
+Shared throttle store - Sliding-window rate limits in a SQLite WAL file
+
+DRF's stock throttles keep their history in the default cache. With a
+per-process cache every gunicorn worker counts on its own, so a client gets
+(workers x rate) requests through. These throttles keep their counters in a
+single SQLite database file in WAL mode, which every worker process on the
+host opens. It needs no extra service.
+
+Each key is stored as one row: the current fixed window, its count, and the
+previous window's count. The request rate is estimated as a sliding window,
+
+    previous_count * (1 - elapsed fraction of current window) + current_count
+
+so a check is a single primary-key read plus an upsert, no matter how many
+requests were made. Expired rows are removed every THROTTLE_COMPACT_INTERVAL
+seconds, and the table is capped at THROTTLE_MAX_KEYS rows, so the file
+cannot grow without limit.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_DB_PATH = getattr(settings, 'THROTTLE_DB_PATH', os.path.join(settings.BASE_DIR, 'throttle.sqlite3'))
+THROTTLE_MAX_KEYS = getattr(settings, 'THROTTLE_MAX_KEYS', 100_000)
+THROTTLE_COMPACT_INTERVAL = getattr(settings, 'THROTTLE_COMPACT_INTERVAL', 60)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS throttle (
+    key TEXT PRIMARY KEY,
+    window INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    prev_count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS throttle_expires_at ON throttle (expires_at);
+'''
+
+
+class SQLiteThrottleStore:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._compact_lock = threading.Lock()
+        self._next_compaction = 0
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            connection = sqlite3.connect(self.path, timeout=2, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def hit(self, key, limit, duration, now=None):
+        """
+        Count a request against `key` if it is within `limit` per `duration` seconds
+
+        Returns:
+            tuple of (allowed, seconds to wait before the next request is allowed)
+        """
+        now = time.time() if now is None else now
+        window = int(now // duration)
+        elapsed = (now % duration) / duration
+
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT window, count, prev_count FROM throttle WHERE key = ?', (key,)
+            ).fetchone()
+            current = previous = 0
+            if row is not None:
+                if row[0] == window:
+                    current, previous = row[1], row[2]
+                elif row[0] == window - 1:
+                    previous = row[1]
+
+            if previous * (1 - elapsed) + current + 1 > limit:
+                connection.execute('COMMIT')
+                return False, self._wait(limit, duration, elapsed, current, previous)
+
+            connection.execute(
+                'INSERT INTO throttle (key, window, count, prev_count, expires_at) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET window = excluded.window, count = excluded.count, '
+                'prev_count = excluded.prev_count, expires_at = excluded.expires_at',
+                (key, window, current + 1, previous, (window + 2) * duration),
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+        if now >= self._next_compaction:
+            self.compact(now)
+        return True, None
+
+    @staticmethod
+    def _wait(limit, duration, elapsed, current, previous):
+        if current + 1 > limit or not previous:
+            # Blocked by this window alone: wait for it to roll over
+            return (1 - elapsed) * duration
+        # Wait until the previous window's weight has decayed enough
+        needed = 1 - (limit - 1 - current) / previous
+        return max(needed - elapsed, 0) * duration
+
+    def compact(self, now=None):
+        """Delete expired rows, then trim to THROTTLE_MAX_KEYS by earliest expiry"""
+        if not self._compact_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.time() if now is None else now
+            self._next_compaction = now + THROTTLE_COMPACT_INTERVAL
+            connection = self.connection()
+            connection.execute('DELETE FROM throttle WHERE expires_at < ?', (now,))
+            (count,) = connection.execute('SELECT COUNT(*) FROM throttle').fetchone()
+            if count > THROTTLE_MAX_KEYS:
+                connection.execute(
+                    'DELETE FROM throttle WHERE key IN '
+                    '(SELECT key FROM throttle ORDER BY expires_at LIMIT ?)',
+                    (count - THROTTLE_MAX_KEYS,),
+                )
+        finally:
+            self._compact_lock.release()
+
+
+throttle_store = SQLiteThrottleStore(THROTTLE_DB_PATH)
+
+
+class SharedStoreThrottleMixin:
+    """Replaces SimpleRateThrottle's cache-backed history with throttle_store"""
+
+    store = throttle_store
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        try:
+            allowed, self._wait = self.store.hit(self.key, self.num_requests, self.duration)
+        except sqlite3.Error:
+            # A throttle store problem should not take the API down
+            logger.exception('Throttle store unavailable; allowing request')
+            return True
+        return allowed
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class SharedAnonRateThrottle(SharedStoreThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SharedUserRateThrottle(SharedStoreThrottleMixin, UserRateThrottle):
+    pass
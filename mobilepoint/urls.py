@@ -14,25 +14,31 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path,include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
 from rest_framework.routers import DefaultRouter
-from product.api_views import ProductRelatedPublicView
+from product.api_views import ProductRelatedPublicView, ProductViewSet
+from product.async_views import deals_live, product_detail, product_list
+from website.api_views import HomeView
+from website.async_views import home
+from website.views import newsletter_unsubscribe
+from menu.async_views import menus_by_location
 from accounts.api_views import (
     HiddenTokenObtainPairView,
     HiddenTokenRefreshView,
     HiddenTokenVerifyView,
 )
-from .admin_views import filehub_embed, analytic_dashboard, custompage
-from .admin_site import secure_admin_site
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
+from .admin_views import (
+    filehub_embed, analytic_dashboard, custompage, sql_profile,
+    profile_list, profile_detail, profile_download,
 )
+from .admin_site import secure_admin_site
+from .openapi import schema_view, ui_view, versioned_schema_view
 router = DefaultRouter()
 # Copy all existing registered models
 secure_admin_site._registry = admin.site._registry
@@ -40,6 +46,10 @@ secure_admin_site._registry = admin.site._registry
 urlpatterns = [
     path('admin/', include('filehub.urls')),
     path('admin/custompage/', custompage, name='custom_page'),
+    path('admin/sql-profile/', sql_profile, name='sql_profile'),
+    path('admin/profiles/', profile_list, name='profile_list'),
+    path('admin/profiles/<str:profile_id>/', profile_detail, name='profile_detail'),
+    path('admin/profiles/<str:profile_id>.pstats', profile_download, name='profile_download'),
     path("filemanager/", filehub_embed, name="admin_filehub"),
     path('api/auth/', include('accounts.api_urls')),
     path("analytic_dashboard/", analytic_dashboard, name="analytic_dashboard"),
@@ -51,6 +61,8 @@ urlpatterns = [
     path('orders/', include('orders.api_urls')),
     path('wishlist/', include('wishlist.api_urls')),
     path('website/', include('website.api_urls')),
+    # Signed link in newsletter emails (website/newsletter.py)
+    path('newsletter/unsubscribe/<str:token>/', newsletter_unsubscribe, name='newsletter-unsubscribe'),
     path('reviews/', include('reviews.api_urls')),
     path('menu/', include('menu.api_urls')),
     
@@ -58,6 +70,7 @@ urlpatterns = [
     path('api/token/', HiddenTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', HiddenTokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', HiddenTokenVerifyView.as_view(), name='token_verify'),
+    path('api/home/', HomeView.as_view(), name='home'),
     path('api/', include(router.urls)),
     path('tinymce/', include('tinymce.urls')),
     # Optional: Django REST Framework browsable API authentication
@@ -65,17 +78,34 @@ urlpatterns = [
     path('tinymce/', include('tinymce.urls')),
     
     
-    # OpenAPI schema
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    # OpenAPI schema, precomputed by "manage.py build_openapi_schema" (mobilepoint/openapi.py)
+    path('api/schema/', schema_view, name='schema'),
+    path('api/schema/<str:etag>.json', versioned_schema_view, name='schema-versioned'),
 
     # Swagger UI
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/docs/', ui_view('swagger'), name='swagger-ui'),
 
     # ReDoc UI (optional)
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/redoc/', ui_view('redoc'), name='redoc'),
 ]
 
 # Serve media files in development
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+if settings.ASYNC_READ_VIEWS:
+    # ASGI mode: serve the hot read endpoints from async views. They are listed
+    # first so they take these URLs over from the DRF routes. The product detail
+    # pattern skips list actions such as products/featured/.
+    product_list_actions = '|'.join(sorted({
+        re.escape(extra_action.url_path.split('/')[0])
+        for extra_action in ProductViewSet.get_extra_actions() if not extra_action.detail
+    }))
+    urlpatterns = [
+        path('api/products/', product_list, name='product-list-async'),
+        re_path(rf'^api/products/(?!(?:{product_list_actions})/)(?P<slug>[^/.]+)/$', product_detail, name='product-detail-async'),
+        path('api/deals/live/', deals_live, name='deal-live-async'),
+        path('api/home/', home, name='home-async'),
+        path('api/menus/by_location/', menus_by_location, name='menu-by-location-async'),
+    ] + urlpatterns
@@ -3,6 +3,7 @@ from .models import Order, OrderItem, OrderStatusHistory
 from django import forms
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from .exports import streaming_export_response
 
 
 class OrderItemInline(admin.StackedInline):
@@ -67,6 +68,7 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ['order_number', 'user__email', 'shipping_email', 'payment_transaction_id']
     readonly_fields = ['order_number', 'created_at', 'updated_at', 'status_badge', 'payment_method_badge', 'applied_promotions_display']
     inlines = [OrderItemInline, OrderStatusHistoryInline]
+    actions = ['export_as_csv', 'export_as_ndjson']
     
     fieldsets = (
         ('Order Information', {
@@ -166,6 +168,16 @@ class OrderAdmin(admin.ModelAdmin):
                 )
         super().save_model(request, obj, form, change)
     
+    def export_as_csv(self, request, queryset):
+        """Stream selected orders with items and promotions as CSV"""
+        return streaming_export_response(queryset, 'csv')
+    export_as_csv.short_description = 'Export selected orders as CSV'
+
+    def export_as_ndjson(self, request, queryset):
+        """Stream selected orders with items and promotions as NDJSON"""
+        return streaming_export_response(queryset, 'ndjson')
+    export_as_ndjson.short_description = 'Export selected orders as NDJSON'
+
     def applied_promotions_display(self, obj):
         """Display all applied promotions from order items with descriptions and links. Hide free_shipping if shipping charge is applied."""
         from django.urls import reverse
@@ -13,6 +13,7 @@ Authentication: Required (IsAuthenticated)
 - Staff users can view all orders
 - Regular users can only view their own orders
 """
+from django.db.models import Prefetch
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -26,6 +27,13 @@ from .serializers import (
     OrderListSerializer, OrderDetailSerializer, OrderCreateSerializer,
     OrderItemSerializer, OrderStatusHistorySerializer
 )
+from .exports import EXPORT_FORMATS, filter_orders_for_export, streaming_export_response
+
+
+def order_items_for_serializer():
+    """OrderItems with the relations OrderItemSerializer reads, combo children included"""
+    children = OrderItem.objects.select_related('deal', 'combo').prefetch_related('promotions')
+    return children.prefetch_related(Prefetch('combo_items', queryset=children))
 
 
 @extend_schema_view(
@@ -104,6 +112,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     - cancel: Cancel an order
     - my_orders: Get current user's orders
     - statistics: Get order statistics
+    - export: Stream orders with items and promotions as CSV/NDJSON (staff only)
     """
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -120,9 +129,15 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not user or not user.is_authenticated:
             return Order.objects.none()
 
-        if user.is_staff:
-            return Order.objects.all().select_related('user').prefetch_related('items', 'status_history')
-        return Order.objects.filter(user=user).select_related('user').prefetch_related('items', 'status_history')
+        queryset = Order.objects.all() if user.is_staff else Order.objects.filter(user=user)
+        queryset = queryset.select_related('user')
+        if self.action in ['list', 'my_orders']:
+            # OrderListSerializer only counts the items
+            return queryset.prefetch_related('items')
+        return queryset.prefetch_related(
+            Prefetch('items', queryset=order_items_for_serializer()),
+            'status_history__created_by',
+        )
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -351,6 +366,64 @@ class OrderViewSet(viewsets.ModelViewSet):
         
         return Response(stats)
 
+    @extend_schema(
+        summary='Export orders',
+        description='Stream orders with their items and promotions as CSV or NDJSON. Staff only.',
+        parameters=[
+            OpenApiParameter(
+                name='export_format',
+                description='Output format',
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=list(EXPORT_FORMATS)
+            ),
+            OpenApiParameter(
+                name='date_from',
+                description='Only orders created on or after this date (YYYY-MM-DD)',
+                required=False,
+                type=OpenApiTypes.DATE
+            ),
+            OpenApiParameter(
+                name='date_to',
+                description='Only orders created on or before this date (YYYY-MM-DD)',
+                required=False,
+                type=OpenApiTypes.DATE
+            ),
+            OpenApiParameter(
+                name='order_status',
+                description='Comma separated order statuses',
+                required=False,
+                type=OpenApiTypes.STR
+            ),
+            OpenApiParameter(
+                name='payment_status',
+                description='Comma separated payment statuses',
+                required=False,
+                type=OpenApiTypes.STR
+            ),
+        ],
+        responses={200: OpenApiTypes.BINARY},
+        tags=['Orders']
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        """
+        Stream orders as CSV (one row per item) or NDJSON (one order per line).
+
+        Rows are read with a server-side cursor, so memory stays flat
+        regardless of how many orders match the filters.
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+
+        try:
+            queryset = filter_orders_for_export(Order.objects.all(), request.query_params)
+            return streaming_export_response(queryset, export_format)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -379,7 +452,7 @@ class OrderItemViewSet(viewsets.ReadOnlyModelViewSet):
     Read-only access to order items with filtering by order.
     Staff can see all items, users can only see items from their own orders.
     """
-    queryset = OrderItem.objects.all().select_related('order', 'product_variant', 'product')
+    queryset = order_items_for_serializer().select_related('order', 'product_variant', 'product')
     serializer_class = OrderItemSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -0,0 +1,179 @@
+"""
+Order exports - Streaming CSV/NDJSON export of orders, items and promotions
+"""
+import csv
+import json
+from decimal import Decimal
+
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Order, OrderItem
+
+
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+ORDER_FIELDS = [
+    'id', 'order_number', 'user_id', 'order_status', 'payment_status', 'payment_method',
+    'payment_transaction_id', 'subtotal', 'tax', 'shipping_cost', 'discount', 'total',
+    'shipping_name', 'shipping_email', 'shipping_phone', 'shipping_address', 'shipping_city',
+    'shipping_state', 'shipping_zip', 'shipping_country', 'tracking_number', 'created_at',
+]
+
+ITEM_FIELDS = [
+    'id', 'product_id', 'product_variant_id', 'product_name', 'variant_name', 'quantity',
+    'original_price', 'price', 'discount_percent', 'subtotal', 'deal_id', 'combo_id',
+    'combo_parent_id', 'is_combo_parent', 'free_gift_detail',
+]
+
+CSV_HEADER = (
+    [f'order_{field}' for field in ORDER_FIELDS]
+    + [f'item_{field}' for field in ITEM_FIELDS]
+    + ['item_promotions']
+)
+
+
+class Echo:
+    """File-like object that returns what is written, so csv.writer can feed a generator"""
+
+    def write(self, value):
+        return value
+
+
+def filter_orders_for_export(queryset, params):
+    """
+    Apply export filters to an order queryset
+
+    Args:
+        queryset: Order queryset
+        params: Mapping with optional date_from, date_to (YYYY-MM-DD),
+                order_status and payment_status (comma separated)
+
+    Returns:
+        Filtered queryset
+
+    Raises:
+        ValueError: If a date cannot be parsed
+    """
+    for param, lookup in (('date_from', 'created_at__date__gte'), ('date_to', 'created_at__date__lte')):
+        value = params.get(param)
+        if value:
+            parsed = parse_date(value)
+            if parsed is None:
+                raise ValueError(f"Invalid {param}, expected YYYY-MM-DD")
+            queryset = queryset.filter(**{lookup: parsed})
+
+    for param in ('order_status', 'payment_status'):
+        value = params.get(param)
+        if value:
+            values = [v.strip() for v in value.split(',') if v.strip()]
+            queryset = queryset.filter(**{f'{param}__in': values})
+
+    return queryset
+
+
+def _export_queryset(queryset):
+    """Only load the columns that are exported; items and promotions are prefetched per chunk"""
+    items = (
+        OrderItem.objects
+        .only(*ITEM_FIELDS, 'order_id')
+        .prefetch_related(Prefetch('promotions', to_attr='export_promotions'))
+        .order_by('id')
+    )
+    return (
+        queryset
+        .only(*ORDER_FIELDS)
+        .prefetch_related(Prefetch('items', queryset=items, to_attr='export_items'))
+        .order_by('id')
+    )
+
+
+def _serialize(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _order_dict(order):
+    return {field: _serialize(getattr(order, field)) for field in ORDER_FIELDS}
+
+
+def _item_dict(item):
+    data = {field: _serialize(getattr(item, field)) for field in ITEM_FIELDS}
+    data['promotions'] = [
+        {'id': promo.id, 'title': promo.title, 'type': promo.promotion_type}
+        for promo in item.export_promotions
+    ]
+    return data
+
+
+def iter_orders(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Iterate orders with their items and promotions using a server-side cursor
+
+    Items and promotions are prefetched once per chunk of orders, so memory
+    stays bounded by chunk_size regardless of the size of the export.
+    """
+    return _export_queryset(queryset).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield CSV lines, one row per order item (orders without items get one row)"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    empty_item = [''] * (len(ITEM_FIELDS) + 1)
+
+    for order in iter_orders(queryset, chunk_size):
+        order_row = [_serialize(getattr(order, field)) for field in ORDER_FIELDS]
+        if not order.export_items:
+            yield writer.writerow(order_row + empty_item)
+            continue
+        for item in order.export_items:
+            item_row = [_serialize(getattr(item, field)) for field in ITEM_FIELDS]
+            promotions = '|'.join(promo.title for promo in item.export_promotions)
+            yield writer.writerow(order_row + item_row + [promotions])
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one JSON document per order with its items nested"""
+    for order in iter_orders(queryset, chunk_size):
+        data = _order_dict(order)
+        data['items'] = [_item_dict(item) for item in order.export_items]
+        yield json.dumps(data) + '\n'
+
+
+def streaming_export_response(queryset, export_format='csv', chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Build a StreamingHttpResponse exporting the given orders
+
+    Args:
+        queryset: Order queryset (already filtered)
+        export_format: 'csv' or 'ndjson'
+        chunk_size: Number of orders fetched per database round trip
+
+    Returns:
+        StreamingHttpResponse
+
+    Raises:
+        ValueError: If export_format is not supported
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format. Choose from: {', '.join(EXPORT_FORMATS)}")
+
+    generator = iter_csv if export_format == 'csv' else iter_ndjson
+    response = StreamingHttpResponse(
+        generator(queryset, chunk_size),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    filename = f"orders-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -1,9 +1,12 @@
+from collections import defaultdict
+
 from rest_framework import viewsets, filters, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models.functions import Coalesce
-from django.db.models import Q, Min, Max, Sum, Avg, DecimalField, F, Prefetch
+from django.db.models import Q, Min, Max, Sum, Avg, Count, Case, When, IntegerField, DecimalField, F, Prefetch
 from .pagination import ProductPagination
 from django.utils import timezone
 from .models import (
@@ -20,11 +23,13 @@ from .models import (
     ProductComboItem,
     Promotion
 )
-from reviews.models import ProductReview
 from .serializers import (
     CategorySerializer,
     BrandSerializer,
     ProductListSerializer,
+    primary_image_prefetch,
+    product_detail_prefetches,
+    product_list_prefetches,
     ProductDetailSerializer,
     ProductImageSerializer,
     ProductVariantListSerializer,
@@ -37,6 +42,7 @@ from .serializers import (
     ProductComboDetailSerializer,
     ProductComboForProductDetailSerializer,
     ProductComboCreateUpdateSerializer,
+    ProductComboItemSerializer,
     PromotionListSerializer,
     PromotionDetailSerializer,
     PromotionCreateUpdateSerializer,
@@ -52,9 +58,6 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 
-from django.db.models import Count, Case, When, IntegerField
-
-
 @extend_schema(tags=["Product Categories"])
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -72,6 +75,9 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         queryset = Category.objects.filter(is_active=True)
+        if self.action != "list":
+            # The limits below slice the queryset, which get_object() cannot filter
+            return queryset
         limit = self.request.query_params.get("limit", 10)
 
         try:
@@ -150,23 +156,9 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
 
     queryset = (
         Product.objects.filter(is_active=True)
+        # ?ordering=price sorts on the indexed lowest active variant price
+        .alias(price=F("min_variant_price"))
         .select_related("category", "brand")
-        .prefetch_related(
-            "images",
-            "variants",
-            "variants__variant_attributes__attribute",
-            "variants__images",
-            "promotions",
-            Prefetch(
-                "combos",
-                queryset=ProductCombo.objects.filter(is_active=True).prefetch_related(
-                    "items__product__images",
-                    "items__product__variants",
-                    "items__product__promotions",
-                ),
-                to_attr="active_combos",
-            ),
-        )
     )
     lookup_field = "slug"
     filterset_class = ProductFilter
@@ -177,10 +169,17 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     ]
     filterset_fields = ["category", "brand", "is_featured"]
     search_fields = ["name", "description"]
-    ordering_fields = ["created_at", "name", "base_price"]
+    ordering_fields = ["created_at", "name", "base_price", "price"]
     ordering = ["-created_at"]
     pagination_class = ProductPagination
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            # ProductDetailSerializer also reads the images and combos
+            return queryset.prefetch_related(*product_detail_prefetches())
+        return queryset.prefetch_related(*product_list_prefetches())
+
     def get_serializer_class(self):
         if self.action == "retrieve":
             return ProductDetailSerializer
@@ -236,9 +235,13 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         user = request.user
         if user.is_authenticated:
             profile = user
+            favorites = profile.favorite_categories.all()
+            if 'favorite_categories' in getattr(profile, '_prefetched_objects_cache', {}):
+                # Already loaded by CachedJWTAuthentication; otherwise stay a subquery
+                favorites = [category.pk for category in favorites]
             qs = (
                 self.get_queryset()
-                .filter(category__in=profile.favorite_categories.all())
+                .filter(category__in=favorites)
                 .order_by("-is_featured", "-id")[:10]
             )
         else:
@@ -301,11 +304,6 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(new_products, many=True)
         return Response(serializer.data)
 
-    from django.db.models import Count, Q
-    from rest_framework.decorators import action
-    from rest_framework.response import Response
-
-
     @action(detail=False, methods=['get'], url_path='filters_metadata')
     def filters_metadata(self, request):
         queryset = self.get_queryset().filter(is_active=True)
@@ -314,6 +312,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         category_slugs = request.query_params.get("category")
         selected_category_ids = []
         all_category_ids = []
+        subcategory_ids = []
 
         if category_slugs:
             slugs = [slug.strip() for slug in category_slugs.split(",") if slug.strip()]
@@ -322,18 +321,13 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             selected_category_ids = list(categories.values_list('id', flat=True))
             all_category_ids.extend(selected_category_ids)
 
-            # Include all subcategories recursively
-            def get_subcategory_ids(cat_queryset):
-                sub_ids = []
-                for cat in cat_queryset:
-                    children = cat.children.filter(is_active=True)
-                    if children.exists():
-                        child_ids = list(children.values_list('id', flat=True))
-                        sub_ids.extend(child_ids)
-                        sub_ids.extend(get_subcategory_ids(children))
-                return sub_ids
-
-            subcategory_ids = get_subcategory_ids(categories)
+            # Include all subcategories, one query per level of the tree
+            level = selected_category_ids
+            while level:
+                level = list(
+                    Category.objects.filter(parent_id__in=level, is_active=True).values_list('id', flat=True)
+                )
+                subcategory_ids.extend(level)
             all_category_ids.extend(subcategory_ids)
 
             # Filter products by all category IDs (parent + children)
@@ -364,31 +358,33 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
 
 
         # --- Attributes + values metadata ---
-        attributes = VariantAttribute.objects.prefetch_related("values").all()
-        attribute_data = []
-        for attr in attributes:
-            values = (
-                attr.values.filter(
-                    product_variants__in=product_variant_ids
-                )
-                .annotate(count=Count("product_variants", distinct=True))
-                .values("value", "id", "count", "color_code")
-                .order_by("value")
+        # All attributes' values in one query, grouped here
+        values_by_attribute = defaultdict(list)
+        values = (
+            VariantAttributeValue.objects.filter(
+                product_variants__in=product_variant_ids
             )
+            .annotate(count=Count("product_variants", distinct=True))
+            .values("attribute_id", "value", "id", "count", "color_code")
+            .order_by("value")
+        )
+        for value in values:
+            values_by_attribute[value.pop("attribute_id")].append(value)
+
+        attribute_data = []
+        for attr in VariantAttribute.objects.all():
             attribute_data.append({
                 "name": attr.name,
                 "slug": attr.name.lower().replace(" ", "_"),
-                "values": list(values)
+                "values": values_by_attribute[attr.id]
             })
             
-        # --- Ratings metadata from ProductReview ---
-        ratings = []
-        for star in range(1, 6):
-            count = ProductReview.objects.filter(
-                product__in=queryset,
-                rating=star
-            ).count()
-            ratings.append({"rating": star, "count": count})
+        # --- Ratings metadata from the per-product review histogram ---
+        rating_totals = queryset.aggregate(**{field: Sum(field) for field in Product.RATING_FIELDS})
+        ratings = [
+            {"rating": star, "count": rating_totals[f"rating_{star}"] or 0}
+            for star in range(1, 6)
+        ]
 
         # --- Only return subcategories, not the parent/selected category ---
         subcategories = Category.objects.filter(id__in=subcategory_ids).values("name", "slug", "parent_id")
@@ -458,7 +454,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             Product.objects.filter(is_active=True)
             .exclude(pk=product.pk)
             .select_related("category", "brand")
-            .prefetch_related("images", "variants", "promotions")
+            .prefetch_related(*product_list_prefetches())
         )
 
         # related by same category or same brand
@@ -518,7 +514,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             .filter(is_active=True)
             .filter(category_q)
             .select_related("category", "brand")
-            .prefetch_related("images", "variants", "promotions")
+            .prefetch_related(*product_list_prefetches())
             .annotate(
                 min_price=Min("variants__price"),
                 total_sold=Sum("variants__sold_quantity"),
@@ -633,7 +629,7 @@ class ProductVariantViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = (
         ProductVariant.objects.filter(is_active=True)
         .select_related("product")
-        .prefetch_related("variant_attributes", "images")
+        .prefetch_related("variant_attributes__attribute", "images")
     )
     serializer_class = ProductVariantDetailSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
@@ -659,7 +655,7 @@ class DealViewSet(viewsets.ModelViewSet):
     """ViewSet for deals - simplified version"""
 
     queryset = Deal.objects.select_related("product").prefetch_related(
-        "product__brand", "product__category", "product__images"
+        "product__brand", "product__category", "product__images", primary_image_prefetch("product__")
     )
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = "id"
@@ -674,6 +670,14 @@ class DealViewSet(viewsets.ModelViewSet):
     ordering = ["-is_featured", "display_order", "-created_at"]
     pagination_class = ProductPagination
 
+    def get_queryset(self):
+        if self.action in ["retrieve", "deal_of_the_day"]:
+            # DealDetailSerializer nests the full ProductDetailSerializer
+            return Deal.objects.select_related("product__category", "product__brand").prefetch_related(
+                *product_detail_prefetches("product__")
+            )
+        return super().get_queryset()
+
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return DealCreateUpdateSerializer
@@ -781,7 +785,6 @@ class DealViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(deals, many=True)
         return Response(serializer.data)
 
-from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
@@ -815,11 +818,17 @@ class RecentlyViewedProductViewSet(viewsets.ReadOnlyModelViewSet):
         # optional safety cap
         limit = min(limit, 50)
 
-        return (
+        queryset = (
             RecentlyViewedProduct.objects
             .filter(user=user)
-            .order_by("-viewed_at")[:limit]
+            .select_related("product__category", "product__brand")
+            .prefetch_related(*product_list_prefetches("product__"))
+            .order_by("-viewed_at")
         )
+        if self.action == "retrieve":
+            # get_object() cannot filter a sliced queryset
+            return queryset
+        return queryset[:limit]
 
     @action(detail=False, methods=["get"])
     def list_recent(self, request):
@@ -830,7 +839,7 @@ class RecentlyViewedProductViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
 
-from rest_framework.decorators import api_view
+
 @api_view(['GET'])
 def get_categories_by_brand(request):
     brand_id = request.GET.get('brand_id')
@@ -852,8 +861,13 @@ class ProductComboViewSet(viewsets.ModelViewSet):
     queryset = (
         ProductCombo.objects
         .filter(is_active=True)
-        .select_related('main_product')
-        .prefetch_related('items__product__images', 'items__product__variants')
+        .select_related('main_product__category', 'main_product__brand')
+        .prefetch_related(
+            *product_list_prefetches('main_product__'),
+            'items__product__category',
+            'items__product__brand',
+            *product_list_prefetches('items__product__'),
+        )
     )
     lookup_field = 'slug'
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -894,15 +908,17 @@ class ProductComboViewSet(viewsets.ModelViewSet):
     def items(self, request, slug=None):
         """Get items in a specific combo"""
         combo = self.get_object()
-        items = combo.items.all().select_related('product').prefetch_related('product__images')
+        items = (
+            combo.items.all()
+            .select_related('product__category', 'product__brand')
+            .prefetch_related(*product_list_prefetches('product__'))
+        )
 
         page = self.paginate_queryset(items)
         if page is not None:
-            from .serializers import ProductComboItemSerializer
             serializer = ProductComboItemSerializer(page, many=True, context={'request': request})
             return self.get_paginated_response(serializer.data)
 
-        from .serializers import ProductComboItemSerializer
         serializer = ProductComboItemSerializer(items, many=True, context={'request': request})
         return Response(serializer.data)
 
@@ -958,6 +974,22 @@ class PromotionViewSet(viewsets.ModelViewSet):
     pagination_class = ProductPagination
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    def get_queryset(self):
+        """
+        Prefetch what the action's serializer reads.
+        
+        - Retrieve: the products with everything ProductListSerializer reads
+        - List/Other: the products, which product_count counts
+        """
+        if self.action == 'retrieve':
+            products = (
+                Product.objects
+                .select_related('category', 'brand')
+                .prefetch_related(*product_list_prefetches())
+            )
+            return Promotion.objects.prefetch_related(Prefetch('products', queryset=products))
+        return super().get_queryset()
+    
     def get_serializer_class(self):
         """
         Return appropriate serializer based on the action.
@@ -994,7 +1026,7 @@ class PromotionViewSet(viewsets.ModelViewSet):
         
         Returns: Paginated list of active PromotionListSerializer objects
         """
-        promotions = Promotion.active()
+        promotions = Promotion.active().prefetch_related('products')
         
         page = self.paginate_queryset(promotions)
         if page is not None:
@@ -1063,7 +1095,7 @@ class PromotionViewSet(viewsets.ModelViewSet):
         products = (
             promotion.products.filter(is_active=True)
             .select_related('category', 'brand')
-            .prefetch_related('images', 'variants', 'promotions')
+            .prefetch_related(*product_list_prefetches())
         )
         
         page = self.paginate_queryset(products)
@@ -0,0 +1,91 @@
+"""
+Async product views - ASGI versions of the product list/detail and live deals endpoints
+
+Served instead of the DRF routes when ASYNC_READ_VIEWS is on (see
+mobilepoint/urls.py). They reuse the viewsets' querysets, filters, pagination
+and serializers, so responses are identical. Each request's ORM and
+serializer work runs in a single run_sync() call, so the page COUNT and its
+rows are read on the same connection, as in the DRF view.
+"""
+from django.http import Http404
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+
+from mobilepoint.async_api import api_response, prepare_request, run_sync
+from .api_views import DealViewSet, ProductViewSet
+from .utils import add_recently_viewed
+
+
+def bind_viewset(viewset_class, action, request, **kwargs):
+    """A viewset instance bound to the request, used for its queryset, filters, paginator and serializers"""
+    view = viewset_class(action=action, args=(), kwargs=kwargs, format_kwarg=None)
+    view.request = Request(request, authenticators=())
+    view.request.user = request.user
+    view.headers = {}
+    return view
+
+
+def paginated_data(view, queryset):
+    """The body ListModelMixin.list would return for this queryset"""
+    page = view.paginate_queryset(queryset)
+    return view.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+
+async def paginated_response(view, get_queryset):
+    """
+    Run get_queryset() and paginate and serialize it in one run_sync() call
+
+    Returns:
+        JsonResponse; 400 for invalid filters, 404 for a page out of range like PageNumberPagination
+    """
+    try:
+        data = await run_sync(lambda: paginated_data(view, get_queryset()))
+    except ValidationError as exc:
+        return api_response(exc.detail, status=400)
+    except NotFound as exc:
+        return api_response({'detail': exc.detail}, status=404)
+    return api_response(data)
+
+
+async def product_list(request):
+    """GET /api/products/ - same filters, ordering and pagination as ProductViewSet.list"""
+    error = await prepare_request(request)
+    if error:
+        return error
+    view = bind_viewset(ProductViewSet, 'list', request)
+    return await paginated_response(view, lambda: view.filter_queryset(view.get_queryset()))
+
+
+async def product_detail(request, slug):
+    """GET /api/products/<slug>/ - same payload as ProductViewSet.retrieve"""
+    error = await prepare_request(request)
+    if error:
+        return error
+    view = bind_viewset(ProductViewSet, 'retrieve', request, slug=slug)
+
+    def retrieve():
+        product = view.get_object()
+        if request.user.is_authenticated:
+            add_recently_viewed(request.user, product)
+        return view.get_serializer(product).data
+
+    try:
+        data = await run_sync(retrieve)
+    except Http404:
+        return api_response({'detail': 'No Product matches the given query.'}, status=404)
+    return api_response(data)
+
+
+async def deals_live(request):
+    """GET /api/deals/live/ - same payload as DealViewSet.live"""
+    error = await prepare_request(request)
+    if error:
+        return error
+    view = bind_viewset(DealViewSet, 'live', request)
+
+    def live_deals():
+        now = timezone.now()
+        return view.get_queryset().filter(is_active=True, start_at__lte=now, end_at__gte=now)
+
+    return await paginated_response(view, live_deals)
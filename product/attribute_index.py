@@ -0,0 +1,130 @@
+"""
+Attribute index - In-memory product id sets per variant attribute value
+
+For every VariantAttributeValue the index keeps the set of product ids that have
+at least one active variant carrying that value. A query such as
+?color=red,blue&storage=256GB is resolved as
+
+    (products[color][red] | products[color][blue]) & products[storage][256gb]
+
+and applied as a single id__in filter, instead of joining variants and the
+variant_attributes M2M once per attribute and de-duplicating with DISTINCT.
+When the match is larger than MAX_ID_LIST, selection_filter() expresses the
+same selection as SQL subqueries, so no huge literal list is sent.
+
+Each worker process holds its own copy. Writes bump the AttributeIndexVersion
+row, and a worker rebuilds its copy the next time it notices the version has
+changed. The version lives in the database rather than the cache because the
+default cache is per process, where another worker's bump would never be seen.
+"""
+import threading
+
+from django.db.models import F, Q
+
+from .models import AttributeIndexVersion, ProductVariant, VariantAttributeValue
+
+
+# Longest id list passed as id__in; beyond it the selection is joined in SQL
+MAX_ID_LIST = 1000
+
+
+def attribute_slug(name):
+    """Query parameter name for an attribute, matching filters_metadata ("Screen Size" -> "screen_size")"""
+    return name.lower().replace(' ', '_')
+
+
+class AttributeIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._products = {}
+
+    def _current_version(self):
+        return AttributeIndexVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    def _build(self):
+        """Load every (attribute, value, product) triple for active variants in one query"""
+        products = {}
+        through = ProductVariant.variant_attributes.through
+        rows = through.objects.filter(productvariant__is_active=True).values_list(
+            'variantattributevalue__attribute__name',
+            'variantattributevalue__value',
+            'productvariant__product_id',
+        )
+        for attribute, value, product_id in rows.iterator(chunk_size=5000):
+            values = products.setdefault(attribute_slug(attribute), {})
+            values.setdefault(value.strip().lower(), set()).add(product_id)
+        return {
+            slug: {value: frozenset(ids) for value, ids in values.items()}
+            for slug, values in products.items()
+        }
+
+    def products(self):
+        """{attribute slug: {lower-cased value: frozenset(product ids)}}, rebuilt when stale"""
+        version = self._current_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._products = self._build()
+                    self._version = version
+        return self._products
+
+    def attribute_slugs(self):
+        return set(self.products())
+
+    def match(self, selections):
+        """
+        Resolve attribute selections to product ids
+
+        Args:
+            selections: {attribute slug: [values]} - values are OR-ed within an
+                        attribute, attributes are AND-ed together
+
+        Returns:
+            frozenset of product ids
+        """
+        products = self.products()
+        result = None
+        # Smallest unions first so the intersection shrinks as early as possible
+        unions = []
+        for slug, values in selections.items():
+            by_value = products.get(slug, {})
+            union = frozenset().union(*(by_value.get(v.strip().lower(), frozenset()) for v in values))
+            unions.append(union)
+        for union in sorted(unions, key=len):
+            result = union if result is None else result & union
+            if not result:
+                break
+        return result if result is not None else frozenset()
+
+
+attribute_index = AttributeIndex()
+
+
+def selection_filter(selections):
+    """
+    The selections of AttributeIndex.match() as a Q on Product, resolved in SQL
+
+    Args:
+        selections: {attribute slug: [values]}, as for AttributeIndex.match()
+
+    Returns:
+        Q with one product id subquery per attribute
+    """
+    value_ids = {}
+    for pk, attribute, value in VariantAttributeValue.objects.values_list('pk', 'attribute__name', 'value'):
+        value_ids.setdefault((attribute_slug(attribute), value.strip().lower()), []).append(pk)
+
+    condition = Q()
+    for slug, values in selections.items():
+        ids = [pk for v in values for pk in value_ids.get((slug, v.strip().lower()), [])]
+        condition &= Q(id__in=ProductVariant.objects.filter(
+            is_active=True, variant_attributes__in=ids,
+        ).values('product_id'))
+    return condition
+
+
+def invalidate_attribute_index():
+    """Mark every worker's index as stale; call after variant/attribute writes that bypass signals"""
+    if not AttributeIndexVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        AttributeIndexVersion.objects.get_or_create(pk=1, defaults={'version': 1})
@@ -36,8 +36,8 @@ class DealFilter(django_filters.FilterSet):
 
 from django_filters import rest_framework as filters
 from django.db.models import Q
+from .attribute_index import MAX_ID_LIST, attribute_index, selection_filter
 from .models import Product, ProductVariant, Brand, Category
-from reviews.models import ProductReview
 
 
 # class ProductFilter(filters.FilterSet):
@@ -387,8 +387,9 @@ class ProductFilter(filters.FilterSet):
     # Existing filters
     category = CharInFilter(field_name="category__slug", lookup_expr="in")
     brand = CharInFilter(field_name="brand__slug", lookup_expr="in")
-    min_price = filters.NumberFilter(field_name="variants__price", lookup_expr="gte")
-    max_price = filters.NumberFilter(field_name="variants__price", lookup_expr="lte")
+    # Some active variant priced >= min_price / <= max_price, via the indexed price range columns
+    min_price = filters.NumberFilter(field_name="max_variant_price", lookup_expr="gte")
+    max_price = filters.NumberFilter(field_name="min_variant_price", lookup_expr="lte")
     is_featured = filters.BooleanFilter(field_name="is_featured")
     search = filters.CharFilter(field_name="name", lookup_expr="icontains")
 
@@ -402,24 +403,45 @@ class ProductFilter(filters.FilterSet):
         model = Product
         fields = ["category", "brand", "min_price", "max_price", "is_featured", "search", "color", "storage", "rating"]
 
+    # Query parameters that are never attribute selections
+    RESERVED_PARAMS = {"page", "page_size", "ordering", "cursor", "limit"}
+
     def filter_attribute(self, queryset, name, value):
         """
         Filter products by variant attribute values.
-        Example: ?color=red,blue
+        Example: ?color=red,blue&storage=256GB
+
+        All attribute parameters are resolved together in filter_queryset().
         """
-        if not value:
-            return queryset
-        values = [v.strip() for v in value.split(",")]
+        return queryset
 
-        value_filters = Q()
-        for v in values:
-            value_filters |= Q(variants__attribute_values__attribute_value__value__iexact=v)
+    def get_attribute_selections(self):
+        """{attribute slug: [values]} for every attribute present in the query string"""
+        reserved = (set(self.filters) - {"color", "storage"}) | self.RESERVED_PARAMS
+        if not set(self.data) - reserved:
+            # Nothing that could be an attribute; skip the index's version check
+            return {}
+        slugs = (attribute_index.attribute_slugs() | {"color", "storage"}) - reserved
+        selections = {}
+        for slug in slugs:
+            value = self.data.get(slug)
+            if value:
+                values = [v.strip() for v in value.split(",") if v.strip()]
+                if values:
+                    selections[slug] = values
+        return selections
 
-        return queryset.filter(
-            Q(variants__attribute_values__attribute_value__attribute__name__iexact=name),
-            value_filters,
-            variants__is_active=True
-        ).distinct()
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selections = self.get_attribute_selections()
+        if selections:
+            # Union within an attribute, intersection across attributes, one id__in
+            ids = attribute_index.match(selections)
+            if len(ids) > MAX_ID_LIST:
+                queryset = queryset.filter(selection_filter(selections))
+            else:
+                queryset = queryset.filter(id__in=ids)
+        return queryset
 
     def filter_rating(self, queryset, name, value):
         """
@@ -433,10 +455,11 @@ class ProductFilter(filters.FilterSet):
         except ValueError:
             return queryset.none()  # invalid input
 
-        # Filter products with at least one review in the given ratings
-        product_ids = ProductReview.objects.filter(
-            product__in=queryset,
-            rating__in=ratings
-        ).values_list('product_id', flat=True).distinct()
-
-        return queryset.filter(id__in=product_ids)
\ No newline at end of file
+        # Products with at least one approved review in the given ratings
+        rating_filters = Q()
+        for rating in ratings:
+            if 1 <= rating <= 5:
+                rating_filters |= Q(**{f"rating_{rating}__gt": 0})
+        if not rating_filters:
+            return queryset.none()
+        return queryset.filter(rating_filters)
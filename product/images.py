@@ -0,0 +1,174 @@
+"""
+Responsive image renditions
+
+Generates resized WebP/JPEG copies of uploaded images at fixed widths, and
+records the original dimensions plus a dominant-colour placeholder on the
+model. Work is queued on a small thread pool after the upload transaction
+commits, so the request that saved the image never waits for Pillow.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = getattr(settings, 'IMAGE_RENDITION_WIDTHS', [320, 640, 1024, 1600])
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+RENDITION_DIR = 'renditions'
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_RENDITION_WORKERS', 2),
+            thread_name_prefix='image-renditions',
+        )
+    return _executor
+
+
+def needs_renditions(instance, field_name='image'):
+    """True when the image changed since renditions were last generated"""
+    image = getattr(instance, field_name)
+    return bool(image) and (instance.image_renditions or {}).get('source') != image.name
+
+
+def schedule_renditions(instance, field_name='image'):
+    """Queue rendition generation once the current transaction commits"""
+    if not needs_renditions(instance, field_name):
+        return
+    model, pk = type(instance), instance.pk
+    if getattr(settings, 'IMAGE_RENDITIONS_ASYNC', True):
+        transaction.on_commit(lambda: get_executor().submit(_run_in_worker, model, pk, field_name))
+    else:
+        transaction.on_commit(lambda: generate_renditions_for(model, pk, field_name))
+
+
+def _run_in_worker(model, pk, field_name):
+    try:
+        generate_renditions_for(model, pk, field_name)
+    except Exception:
+        logger.exception('Rendition generation failed for %s #%s', model.__name__, pk)
+    finally:
+        # Worker threads own their connections; don't leak them between jobs
+        connections.close_all()
+
+
+def generate_renditions_for(model, pk, field_name='image', force=False):
+    """Load the row, render its image and store the result with a single UPDATE"""
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not (force or needs_renditions(instance, field_name)):
+        return None
+
+    metadata = render_image(getattr(instance, field_name))
+    model.objects.filter(pk=pk).update(
+        image_width=metadata['width'],
+        image_height=metadata['height'],
+        image_placeholder=metadata['placeholder'],
+        image_renditions=metadata['renditions'],
+    )
+    return metadata
+
+
+def render_image(image_field):
+    """
+    Write every rendition of an image to storage
+
+    Args:
+        image_field: FieldFile of an ImageField
+
+    Returns:
+        dict with keys: width, height, placeholder, renditions
+    """
+    # Pillow is only needed by rendition workers; keep it out of web worker startup
+    from PIL import Image, ImageOps
+
+    image_field.open('rb')
+    try:
+        with Image.open(image_field) as source:
+            source = ImageOps.exif_transpose(source)
+            image = source.convert('RGB')
+    finally:
+        image_field.close()
+
+    width, height = image.size
+    stem = os.path.splitext(image_field.name)[0]
+    renditions = {'source': image_field.name}
+
+    # Never upscale: widths above the original collapse to the original width
+    widths = sorted({min(w, width) for w in RENDITION_WIDTHS})
+    for extension, (pil_format, options) in RENDITION_FORMATS.items():
+        renditions[extension] = {}
+        for target_width in widths:
+            target_height = max(1, round(height * target_width / width))
+            resized = image if target_width == width else image.resize(
+                (target_width, target_height), Image.Resampling.LANCZOS
+            )
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            path = f'{RENDITION_DIR}/{stem}-{target_width}.{extension}'
+            if default_storage.exists(path):
+                default_storage.delete(path)
+            renditions[extension][str(target_width)] = default_storage.save(path, ContentFile(buffer.getvalue()))
+
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': dominant_color(image),
+        'renditions': renditions,
+    }
+
+
+def dominant_color(image):
+    """Average colour of the image as a #rrggbb string, used as a loading placeholder"""
+    from PIL import Image
+
+    r, g, b = image.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def build_srcset(instance, request=None, field_name='image'):
+    """
+    Serializer helper returning the srcset map for an image
+
+    Example:
+        {
+            "width": 2400, "height": 1600, "placeholder": "#3a4b5c",
+            "webp": {"320w": "https://.../x-320.webp", ...},
+            "jpeg": {"320w": "https://.../x-320.jpeg", ...}
+        }
+    Returns None until renditions have been generated for the current image.
+    """
+    image = getattr(instance, field_name, None)
+    renditions = getattr(instance, 'image_renditions', None) or {}
+    if not image or renditions.get('source') != image.name:
+        return None
+
+    def absolute(path):
+        url = default_storage.url(path)
+        if request and not url.startswith('http'):
+            return request.build_absolute_uri(url)
+        return url
+
+    data = {
+        'width': instance.image_width,
+        'height': instance.image_height,
+        'placeholder': instance.image_placeholder,
+    }
+    for extension in RENDITION_FORMATS:
+        data[extension] = {
+            f'{width}w': absolute(path)
+            for width, path in renditions.get(extension, {}).items()
+        }
+    return data
@@ -0,0 +1,441 @@
+import json
+import re
+import statistics
+import time
+from itertools import count
+
+from django.apps import apps
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+from django.db.backends.utils import names_digest
+from django.db.migrations import AddIndex, Migration
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.writer import MigrationWriter
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from mobilepoint.sql_instrumentation import sql_template
+
+from .benchmark_endpoints import ENDPOINTS, Command as BenchmarkCommand, Rollback, benchmark_caches
+
+DEFAULT_MODELS = [
+    'product.Product',
+    'product.ProductVariant',
+    'product.Deal',
+    'reviews.ProductReview',
+    'product.RecentlyViewedProduct',
+    'orders.OrderItem',
+]
+MAX_INDEX_COLUMNS = 4
+
+# Django quotes tables and columns; subquery aliases (U0, T3) are left bare
+COLUMN = r'"?(\w+)"?\."(\w+)"'
+EQUALITY = re.compile(COLUMN + r"\s*(?:=\s*(?:%s|-?\d+|'[^']*'|true\b|false\b)|IN\s*\(|IS NULL\b)", re.I)
+RANGE = re.compile(COLUMN + r"\s*(?:<=|>=|<|>|BETWEEN)\s*(?:%s|-?\d|')", re.I)
+# A bare boolean column is how Django writes filter(is_active=True)
+TRUE = re.compile(r'(?:\bWHERE|\bAND|\bOR|\()\s*' + COLUMN + r'(?=\s*(?:\)|\bAND\b|\bOR\b|$))', re.I)
+NEGATED = re.compile(r'\bNOT\s+' + COLUMN + r'(?=\s*(?:\)|\bAND\b|\bOR\b|$))', re.I)
+ORDER_BY = re.compile(r'\bORDER BY\s+(.+?)(?=\s+LIMIT\b|\s+OFFSET\b|\)|$)', re.I | re.S)
+ORDER_ITEM = re.compile(r'^\s*' + COLUMN + r'(?:\s+(ASC|DESC))?(?:\s+NULLS\s+\w+)?\s*$', re.I)
+ALIAS = re.compile(
+    r'\b(?:FROM|JOIN)\s+"(\w+)"(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|INNER|LEFT|RIGHT|CROSS|GROUP|ORDER|LIMIT)\b)"?(\w+)"?)?', re.I
+)
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$')
+
+
+class WorkloadRecorder:
+    """connection.execute_wrapper() callable keeping one concrete example per SELECT template"""
+
+    def __init__(self):
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith('SELECT'):
+            self.add(sql, params)
+        return execute(sql, params, many, context)
+
+    def add(self, sql, params, executions=1):
+        entry = self.queries.setdefault(sql_template(sql), {'sql': sql, 'params': list(params or ()), 'executions': 0})
+        entry['executions'] += executions
+
+
+def table_aliases(sql):
+    aliases = {}
+    for table, alias in ALIAS.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+def table_access(sql):
+    """
+    Columns each table is filtered on, read from Django-generated SQL
+
+    Returns:
+        {table: {'eq': [columns], 'true': [columns], 'range': [columns]}}, in order of appearance
+    """
+    aliases = table_aliases(sql)
+    # Skip the select list, whose CASE expressions look like predicates
+    body = sql[sql.upper().find(' FROM '):]
+    access = {}
+
+    def add(kind, matches):
+        for alias, column in matches:
+            columns = access.setdefault(aliases.get(alias, alias), {'eq': [], 'true': [], 'range': []})[kind]
+            if column not in columns:
+                columns.append(column)
+
+    add('eq', EQUALITY.findall(body))
+    add('eq', NEGATED.findall(body))
+    add('true', TRUE.findall(body))
+    add('range', RANGE.findall(body))
+    return access
+
+
+def order_by(sql):
+    """(table, [(column, descending)]) of the outermost ORDER BY, or None if it is not on plain columns of one table"""
+    clauses = ORDER_BY.findall(sql)
+    if not clauses:
+        return None
+    aliases = table_aliases(sql)
+    tables, columns = set(), []
+    for item in clauses[-1].split(','):
+        match = ORDER_ITEM.match(item)
+        if match is None:
+            return None
+        alias, column, direction = match.groups()
+        tables.add(aliases.get(alias, alias))
+        columns.append((column, (direction or '').upper() == 'DESC'))
+    return (tables.pop(), columns) if len(tables) == 1 else None
+
+
+class Candidate:
+    def __init__(self, model, fields, condition):
+        self.model = model
+        self.fields = fields
+        self.condition = condition
+        self.queries = []
+        columns = [model._meta.get_field(field.lstrip('-')).column for field in fields]
+        self.columns = columns
+        suffix = names_digest(model._meta.db_table, *fields, str(condition or ''), length=6)
+        name = f'{model._meta.db_table[:11]}_{columns[0][:7]}_{suffix}_idx'
+        self.index = models.Index(fields=fields, condition=condition, name=name)
+        self.key = (model._meta.label, tuple(fields), str(condition))
+        self.result = None
+
+    def __str__(self):
+        return MigrationWriter.serialize(self.index)[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Capture a query workload (the benchmark_endpoints cases, or a saved workload file), EXPLAIN every '
+        'SELECT on SQLite or PostgreSQL, flag sequential scans and sorts on large tables, and propose composite '
+        'or partial indexes. Each proposal is tried inside a rolled-back transaction to estimate its gain; the '
+        'ones that help are written as migrations with --write.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workload', help='JSON lines file of {"sql", "params", "executions"} to analyse '
+                                               'instead of running the benchmark cases')
+        parser.add_argument('--save-workload', help='Write the captured workload to this file, e.g. to analyse '
+                                                    'it on another database')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', choices=ENDPOINTS,
+                            help='Benchmark case to capture (repeatable; default: all)')
+        parser.add_argument('--iterations', type=int, default=2, help='Requests per benchmark case (default: 2)')
+        parser.add_argument('--model', action='append', dest='models',
+                            help=f'Model label to advise on (repeatable; default: {", ".join(DEFAULT_MODELS)})')
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help='Ignore scans of tables with fewer rows (default: 1000; seed with seed_scale)')
+        parser.add_argument('--min-gain', type=float, default=20,
+                            help='Percent faster an index must make its queries to be proposed (default: 20)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default: 5)')
+        parser.add_argument('--write', action='store_true', help='Write the migrations (default: print them)')
+        parser.add_argument('--json', help='Write the report to this file')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'EXPLAIN parsing is only implemented for SQLite and PostgreSQL, not {connection.vendor}')
+        started = time.monotonic()
+
+        recorder = self.load_workload(options['workload']) if options['workload'] else self.capture_workload(options)
+        if options['save_workload']:
+            with open(options['save_workload'], 'w') as f:
+                for entry in recorder.queries.values():
+                    f.write(json.dumps(entry, cls=DjangoJSONEncoder) + '\n')
+            self.stdout.write(f"Saved {len(recorder.queries)} queries to {options['save_workload']}")
+
+        self.repeat = options['repeat']
+        self.baselines = {}
+        targets = self.target_models(options['models'] or DEFAULT_MODELS, options['min_rows'])
+        candidates = self.propose(recorder.queries.values(), targets)
+        self.stdout.write(
+            f'{len(recorder.queries)} distinct SELECTs, {len(candidates)} candidate indexes on '
+            f'{", ".join(model._meta.label for model in targets.values()) or "no large tables"}'
+        )
+
+        accepted = []
+        for candidate in candidates:
+            candidate.result = self.trial(candidate)
+            if candidate.result['resolved'] or candidate.result['gain_pct'] >= options['min_gain']:
+                accepted.append(candidate)
+        self.print_report(candidates, accepted)
+        if accepted:
+            self.write_migrations(accepted, options['write'])
+
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump([
+                    {'model': c.model._meta.label, 'index': str(c), 'accepted': c in accepted, **c.result}
+                    for c in candidates
+                ], f, indent=2, cls=DjangoJSONEncoder)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Proposed {len(accepted)} of {len(candidates)} candidate indexes in {time.monotonic() - started:.1f}s'
+        ))
+
+    # ------------------------------------------------------------------
+    # Workload
+    # ------------------------------------------------------------------
+
+    def capture_workload(self, options):
+        benchmark = BenchmarkCommand(stdout=self.stdout, stderr=self.stderr)
+        benchmark.addresses = count(1)
+        recorder = WorkloadRecorder()
+        setup_test_environment()
+        try:
+            # As in benchmark_endpoints: writes are rolled back, caches are thrown away
+            with override_settings(CACHES=benchmark_caches()):
+                try:
+                    with transaction.atomic():
+                        cases = benchmark.build_cases()
+                        with connection.execute_wrapper(recorder):
+                            for name in options['endpoints'] or ENDPOINTS:
+                                for _ in range(options['iterations']):
+                                    cases[name]()
+                        raise Rollback
+                except Rollback:
+                    pass
+                finally:
+                    for cache in caches.all():
+                        cache.clear()
+        finally:
+            teardown_test_environment()
+        return recorder
+
+    def load_workload(self, path):
+        recorder = WorkloadRecorder()
+        try:
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        recorder.add(entry['sql'], entry.get('params'), entry.get('executions', 1))
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Could not read workload {path}: {e}')
+        return recorder
+
+    # ------------------------------------------------------------------
+    # Analysis
+    # ------------------------------------------------------------------
+
+    def target_models(self, labels, min_rows):
+        """{table: model} for the requested models with at least min_rows rows"""
+        targets = {}
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                raise CommandError(f'Unknown model {label}')
+            if model._default_manager.count() >= min_rows:
+                targets[model._meta.db_table] = model
+        return targets
+
+    def explain(self, sql, params):
+        """
+        Plan problems and estimated cost of one query
+
+        Returns:
+            (set of ('seq_scan', table) / ('sort', None), planner cost or None on SQLite)
+        """
+        flags = set()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                aliases = table_aliases(sql)
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    match = SQLITE_SCAN.match(detail)
+                    if match and 'USING' not in match.group(3):
+                        flags.add(('seq_scan', aliases.get(match.group(2) or match.group(1), match.group(1))))
+                    elif 'TEMP B-TREE' in detail and 'ORDER BY' in detail:
+                        flags.add(('sort', None))
+                return flags, None
+
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if node['Node Type'] == 'Seq Scan':
+                flags.add(('seq_scan', node['Relation Name']))
+            elif node['Node Type'] in ('Sort', 'Incremental Sort'):
+                flags.add(('sort', None))
+            nodes.extend(node.get('Plans', []))
+        return flags, plan[0]['Plan']['Total Cost']
+
+    def measure(self, query):
+        flags, cost = self.explain(query['sql'], query['params'])
+        timings = []
+        with connection.cursor() as cursor:
+            for _ in range(self.repeat):
+                started = time.perf_counter()
+                cursor.execute(query['sql'], query['params'])
+                cursor.fetchall()
+                timings.append(time.perf_counter() - started)
+        return {'flags': flags, 'cost': cost, 'ms': statistics.median(timings) * 1000}
+
+    def baseline(self, query):
+        key = sql_template(query['sql'])
+        if key not in self.baselines:
+            self.baselines[key] = self.measure(query)
+        return self.baselines[key]
+
+    def propose(self, queries, targets):
+        existing = {}
+        with connection.cursor() as cursor:
+            for table in targets:
+                existing[table] = [
+                    constraint['columns'] for constraint in connection.introspection.get_constraints(cursor, table).values()
+                    if constraint['index'] or constraint['unique'] or constraint['primary_key']
+                ]
+
+        candidates = {}
+        for query in queries:
+            flags = self.baseline(query)['flags']
+            access = table_access(query['sql'])
+            ordering = order_by(query['sql'])
+            for table, model in targets.items():
+                sort = ordering if ordering and ordering[0] == table and ('sort', None) in flags else None
+                if ('seq_scan', table) not in flags and sort is None:
+                    continue
+                candidate = self.candidate_for(model, access.get(table, {'eq': [], 'true': [], 'range': []}), sort)
+                if candidate is None or self.covered(candidate, existing[table]):
+                    continue
+                candidate = candidates.setdefault(candidate.key, candidate)
+                candidate.queries.append(query)
+        return list(candidates.values())
+
+    def candidate_for(self, model, access, sort):
+        """Equality columns, then the sort, then one range column; filters on True become a partial index condition"""
+        # Lookups by primary key are already served by it
+        fields_by_column = {field.column: field for field in model._meta.concrete_fields if not field.primary_key}
+        by_column = {column: field.name for column, field in fields_by_column.items()}
+        equal = [by_column[column] for column in access['eq'] if column in by_column]
+        true = [
+            by_column[column] for column in access['true']
+            if isinstance(fields_by_column.get(column), models.BooleanField) and by_column[column] not in equal
+        ]
+        ranges = [by_column[column] for column in access['range'] if column in by_column]
+
+        fields = list(equal)
+        if sort:
+            fields += [('-' if descending else '') + by_column[column]
+                       for column, descending in sort[1] if column in by_column and by_column[column] not in equal]
+        fields += [name for name in ranges[:1] if name not in fields and f'-{name}' not in fields]
+        condition = None
+        if true and fields:
+            condition = models.Q(**{name: True for name in true})
+        else:
+            fields = true + fields
+        fields = fields[:MAX_INDEX_COLUMNS]
+        return Candidate(model, fields, condition) if fields else None
+
+    def covered(self, candidate, indexes):
+        return any(columns[:len(candidate.columns)] == candidate.columns for columns in indexes)
+
+    def trial(self, candidate):
+        """Create the index in a transaction that is rolled back, and compare its queries before and after"""
+        before = [self.baseline(query) for query in candidate.queries]
+        create = str(candidate.index.create_sql(candidate.model, connection.schema_editor()))
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(create)
+                after = [self.measure(query) for query in candidate.queries]
+                raise Rollback
+        except Rollback:
+            pass
+
+        table = candidate.model._meta.db_table
+        weights = [query['executions'] for query in candidate.queries]
+        before_ms = sum(run['ms'] * weight for run, weight in zip(before, weights))
+        after_ms = sum(run['ms'] * weight for run, weight in zip(after, weights))
+        relevant = {('seq_scan', table), ('sort', None)}
+        flags_before = set().union(*(run['flags'] & relevant for run in before))
+        flags_after = set().union(*(run['flags'] & relevant for run in after))
+        costs = [run['cost'] for run in before + after]
+        return {
+            'queries': len(candidate.queries),
+            'executions': sum(weights),
+            'flags_before': sorted(kind for kind, _ in flags_before),
+            'flags_after': sorted(kind for kind, _ in flags_after),
+            'resolved': bool(flags_before - flags_after),
+            'cost_before': round(sum(run['cost'] for run in before), 1) if None not in costs else None,
+            'cost_after': round(sum(run['cost'] for run in after), 1) if None not in costs else None,
+            'ms_before': round(before_ms, 2),
+            'ms_after': round(after_ms, 2),
+            'gain_pct': round((1 - after_ms / before_ms) * 100, 1) if before_ms else 0.0,
+            'example': candidate.queries[0]['sql'],
+        }
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def print_report(self, candidates, accepted):
+        for candidate in sorted(candidates, key=lambda c: -c.result['gain_pct']):
+            result = candidate.result
+            line = f"{candidate.model._meta.label}: {candidate}"
+            self.stdout.write(self.style.SUCCESS(line) if candidate in accepted else line)
+            cost = (f"; planner cost {result['cost_before']} -> {result['cost_after']}"
+                    if result['cost_before'] is not None else '')
+            self.stdout.write(
+                f"    {result['queries']} queries x {result['executions']} executions; "
+                f"{'/'.join(result['flags_before']) or 'no flags'} -> {'/'.join(result['flags_after']) or 'no flags'}"
+                f"{cost}; {result['ms_before']} -> {result['ms_after']} ms ({result['gain_pct']}% faster)"
+            )
+
+    def write_migrations(self, accepted, write):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        by_app = {}
+        for candidate in accepted:
+            by_app.setdefault(candidate.model._meta.app_label, []).append(candidate)
+
+        for app_label, candidates in by_app.items():
+            leaves = loader.graph.leaf_nodes(app_label)
+            if len(leaves) != 1:
+                raise CommandError(f'{app_label} has {len(leaves)} leaf migrations; run makemigrations --merge first')
+            number = (MigrationAutodetector.parse_number(leaves[0][1]) or 0) + 1
+            migration = Migration(f'{number:04d}_advised_indexes', app_label)
+            migration.dependencies = [leaves[0]]
+            migration.operations = [
+                AddIndex(model_name=candidate.model._meta.model_name, index=candidate.index) for candidate in candidates
+            ]
+            writer = MigrationWriter(migration)
+            if write:
+                with open(writer.path, 'w', encoding='utf-8') as f:
+                    f.write(writer.as_string())
+                self.stdout.write(self.style.SUCCESS(f'Wrote {writer.path}'))
+            else:
+                self.stdout.write(f'\n# {writer.path}\n{writer.as_string()}')
+
+            # Without the matching Meta entry, the next makemigrations would drop the index again
+            self.stdout.write(self.style.WARNING(f'Add to Meta.indexes in {app_label}/models.py:'))
+            for candidate in candidates:
+                self.stdout.write(f'    {candidate.model.__name__}: {candidate},')
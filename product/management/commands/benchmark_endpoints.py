@@ -0,0 +1,279 @@
+import json
+import statistics
+import subprocess
+import time
+from itertools import count
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from orders.models import Order
+from product.attribute_index import attribute_slug
+from product.models import Product, ProductVariant
+from reviews.models import ProductReview
+from website.models import SiteSettings
+
+User = get_user_model()
+
+ENDPOINTS = [
+    'product_list',
+    'product_list_filtered',
+    'product_list_attributes',
+    'product_search',
+    'filters_metadata',
+    'filters_metadata_category',
+    'product_detail',
+    'order_create',
+    'dashboard',
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def benchmark_caches():
+    """A private LocMemCache in place of every configured cache alias"""
+    return {
+        alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{alias}'}
+        for alias in settings.CACHES
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the key API endpoints in-process (product list and filters, filters_metadata, '
+        'product detail, order create, analytics dashboard) and report latency percentiles and '
+        'SQL query counts per endpoint as JSON. Every write is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint (default: 30)')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured requests per endpoint first (default: 2)')
+        parser.add_argument('--endpoint', action='append', dest='endpoints', choices=ENDPOINTS,
+                            help='Endpoint to run (repeatable; default: all)')
+        parser.add_argument('--label', default='run', help='Name for this run in the report')
+        parser.add_argument('--json', help='Write the report to this file')
+        parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                            help='Compare two --json reports and exit')
+
+    def handle(self, *args, **options):
+        if options['compare']:
+            self.compare(*options['compare'])
+            return
+
+        self.addresses = count(1)
+        setup_test_environment()  # allows the test client host and keeps mail in memory
+        try:
+            report = self.run(options)
+        finally:
+            teardown_test_environment()
+
+        self.print_report(report)
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json']}"))
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def run(self, options):
+        report = {
+            'label': options['label'],
+            'revision': git_revision(),
+            'started_at': timezone.now().isoformat(),
+            'iterations': options['iterations'],
+            'dataset': {
+                'products': Product.objects.count(),
+                'variants': ProductVariant.objects.count(),
+                'orders': Order.objects.count(),
+                'reviews': ProductReview.objects.count(),
+            },
+            'endpoints': {},
+        }
+        # Everything cached during the run describes rows that are rolled back,
+        # so it goes to throwaway in-process caches instead of the real ones
+        with override_settings(CACHES=benchmark_caches()):
+            try:
+                with transaction.atomic():
+                    cases = self.build_cases()
+                    for name in options['endpoints'] or ENDPOINTS:
+                        self.stdout.write(f'  {name} ...')
+                        report['endpoints'][name] = self.measure(cases[name], options['warmup'], options['iterations'])
+                    raise Rollback
+            except Rollback:
+                pass
+            finally:
+                for cache in caches.all():
+                    cache.clear()
+        return report
+
+    def build_cases(self):
+        """{endpoint name: callable returning a response}, using real rows from the current dataset"""
+        variant = (
+            ProductVariant.objects.filter(is_active=True, product__is_active=True, stock_quantity__gt=0)
+            .select_related('product__category', 'product__brand')
+            .order_by('-stock_quantity')
+            .first()
+        )
+        if variant is None:
+            raise CommandError('No in-stock product variant found; seed data first (manage.py seed_scale).')
+        product = variant.product
+        # Enough stock that every order_create iteration succeeds
+        ProductVariant.objects.filter(pk=variant.pk).update(stock_quantity=10 ** 6)
+        # Order creation reads tax and shipping from it; seed_scale does not create one
+        SiteSettings.objects.get_or_create(id=1)
+        attribute = variant.variant_attributes.select_related('attribute').filter(value__isnull=False).first()
+
+        password = 'benchmark-password'
+        tag = f'benchmark-{time.time_ns()}'
+        customer = User.objects.create_user(email=f'{tag}-customer@example.com', password=password,
+                                            first_name='Benchmark', last_name='Customer', is_active=True)
+        staff = User.objects.create_user(email=f'{tag}-staff@example.com', password=password,
+                                         first_name='Benchmark', last_name='Staff', is_active=True, is_staff=True)
+
+        anonymous = Client()
+        api = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(customer).access_token}')
+        admin = Client()
+        admin.force_login(staff)
+
+        price = int(variant.price)
+        filtered = f'?category={product.category.slug}&min_price={price // 2}&max_price={price * 2}&ordering=price'
+        if product.brand_id:
+            filtered += f'&brand={product.brand.slug}'
+        by_attribute = f'?{attribute_slug(attribute.attribute.name)}={attribute.value}' if attribute else ''
+        order = {
+            'items_input': [{'product_variant': variant.pk, 'quantity': 1}],
+            'payment_method': 'cod',
+            'shipping_name': 'Benchmark Customer',
+            'shipping_email': customer.email,
+            'shipping_phone': '9800000000',
+            'shipping_address': 'Ward 1, Main Road',
+            'shipping_city': 'Kathmandu',
+            'shipping_state': 'Bagmati',
+            'shipping_zip': '44600',
+            'shipping_country': 'Nepal',
+            'billing_name': 'Benchmark Customer',
+            'billing_address': 'Ward 1, Main Road',
+            'billing_city': 'Kathmandu',
+            'billing_state': 'Bagmati',
+            'billing_zip': '44600',
+            'billing_country': 'Nepal',
+        }
+        search = product.name.split()[0]
+
+        return {
+            'product_list': lambda: self.get(anonymous, '/api/products/'),
+            'product_list_filtered': lambda: self.get(anonymous, f'/api/products/{filtered}'),
+            'product_list_attributes': lambda: self.get(anonymous, f'/api/products/{by_attribute}'),
+            'product_search': lambda: self.get(anonymous, f'/api/products/?search={search}'),
+            'filters_metadata': lambda: self.get(anonymous, '/api/products/filters_metadata/'),
+            'filters_metadata_category': lambda: self.get(
+                anonymous, f'/api/products/filters_metadata/?category={product.category.slug}'
+            ),
+            'product_detail': lambda: self.get(anonymous, f'/api/products/{product.slug}/'),
+            'order_create': lambda: api.post(
+                '/api/orders/', data=order, content_type='application/json', REMOTE_ADDR=self.next_address()
+            ),
+            'dashboard': lambda: self.get(admin, '/analytic_dashboard/?days=30'),
+        }
+
+    def next_address(self):
+        # A fresh client address per request keeps the anonymous throttle out of the measurement
+        n = next(self.addresses)
+        return f'10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}'
+
+    def get(self, client, path):
+        return client.get(path, HTTP_ACCEPT='application/json', REMOTE_ADDR=self.next_address())
+
+    def measure(self, request, warmup, iterations):
+        for _ in range(warmup):
+            request()
+
+        latencies, queries, statuses = [], [], {}
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request()
+                latencies.append(time.perf_counter() - started)
+            queries.append(len(captured))
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+        return {
+            'requests': iterations,
+            'errors': sum(n for status, n in statuses.items() if int(status) >= 400),
+            'status_codes': statuses,
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'queries_min': min(queries, default=0),
+            'queries_median': statistics.median(queries) if queries else 0,
+            'queries_max': max(queries, default=0),
+        }
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def print_report(self, report):
+        dataset = ', '.join(f'{n:,} {name}' for name, n in report['dataset'].items())
+        self.stdout.write(f"[{report['label']}] revision {report['revision'] or 'unknown'}; {dataset}")
+        self.stdout.write(f"{'endpoint':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'errors':>8}")
+        for name, stats in report['endpoints'].items():
+            self.stdout.write(
+                f"{name:<28}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+                f"{stats['queries_max']:>10}{stats['errors']:>8}"
+            )
+
+    def compare(self, before_path, after_path):
+        with open(before_path) as f:
+            before = json.load(f)
+        with open(after_path) as f:
+            after = json.load(f)
+        if before['dataset'] != after['dataset']:
+            self.stdout.write(self.style.WARNING('Runs used different datasets; the comparison is not like for like'))
+
+        self.stdout.write(f"{before['label']} ({before['revision']}) -> {after['label']} ({after['revision']})")
+        self.stdout.write(f"{'endpoint':<28}{'p95 ms':>22}{'ratio':>8}{'queries':>14}")
+        for name, new in after['endpoints'].items():
+            old = before['endpoints'].get(name)
+            if old is None:
+                self.stdout.write(f'{name:<28}{"(new)":>22}')
+                continue
+            ratio = f"{new['p95_ms'] / old['p95_ms']:.2f}x" if old['p95_ms'] else 'n/a'
+            line = (
+                f"{name:<28}{old['p95_ms']:>10} -> {new['p95_ms']:<8}{ratio:>8}"
+                f"{old['queries_max']:>6} -> {new['queries_max']:<4}"
+            )
+            if new['queries_max'] > old['queries_max']:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
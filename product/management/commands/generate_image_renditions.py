@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from product.images import generate_renditions_for, needs_renditions
+from product.models import ProductImage, VariantAttributeValue
+from reviews.models import ProductReview
+
+
+MODELS = {
+    'product_images': ProductImage,
+    'variant_images': VariantAttributeValue,
+    'review_images': ProductReview,
+}
+
+
+class Command(BaseCommand):
+    help = 'Generate (or regenerate) responsive WebP/JPEG renditions for existing images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=list(MODELS),
+            default=list(MODELS),
+            help='Which image sets to process (default: all)',
+        )
+        parser.add_argument('--workers', type=int, default=4, help='Parallel worker threads (default: 4)')
+        parser.add_argument('--force', action='store_true', help='Regenerate even if renditions are up to date')
+
+    def handle(self, *args, **options):
+        force = options['force']
+        started = time.monotonic()
+        processed = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for key in options['models']:
+                model = MODELS[key]
+                queryset = (
+                    model.objects.exclude(image='').exclude(image__isnull=True)
+                    .only('pk', 'image', 'image_renditions')
+                )
+                pks = [
+                    obj.pk for obj in queryset.iterator(chunk_size=2000)
+                    if force or needs_renditions(obj)
+                ]
+                self.stdout.write(f'{key}: {len(pks)} image(s) to process')
+
+                futures = {
+                    executor.submit(self._generate, model, pk, force): pk
+                    for pk in pks
+                }
+                for future in as_completed(futures):
+                    pk = futures[future]
+                    try:
+                        if future.result():
+                            processed += 1
+                    except Exception as exc:
+                        failed += 1
+                        self.stderr.write(f'{model.__name__} #{pk}: {exc}')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated renditions for {processed} image(s) in {elapsed:.1f}s ({failed} failed)'
+        ))
+
+    def _generate(self, model, pk, force):
+        try:
+            return generate_renditions_for(model, pk, force=force)
+        finally:
+            connections.close_all()
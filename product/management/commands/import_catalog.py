@@ -0,0 +1,423 @@
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.text import slugify
+
+from product.attribute_index import invalidate_attribute_index
+from product.signals import variant_prices_changed, variants_restocked
+from product.models import (
+    Category, Brand, Product, VariantAttribute, VariantAttributeValue,
+    ProductVariant
+)
+
+
+PRODUCT_FIELDS = ['name', 'description', 'short_description', 'category_id', 'brand_id', 'base_price', 'is_active', 'is_featured']
+VARIANT_FIELDS = ['price', 'stock_quantity', 'is_active']
+ATTRIBUTE_PREFIX = 'attr:'
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+
+class RowError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk import products, variants and variant attribute links from a CSV or JSONL file. '
+        'One row per variant; CSV attribute columns are prefixed with "attr:" (e.g. attr:Color), '
+        'JSONL rows carry an "attributes" object.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .csv or .jsonl catalog file')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows validated and written per batch',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without writing anything',
+        )
+        parser.add_argument(
+            '--max-errors',
+            type=int,
+            default=50,
+            help='Number of row errors to print',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.show_diff = self.dry_run or options['verbosity'] > 1
+        self.max_errors = options['max_errors']
+
+        self.load_reference_maps()
+        self.stats = {
+            'rows': 0, 'errors': 0,
+            'products_created': 0, 'products_updated': 0,
+            'variants_created': 0, 'variants_updated': 0,
+        }
+
+        if self.dry_run:
+            self.stdout.write(self.style.WARNING('Dry run - no changes will be saved'))
+
+        started = time.monotonic()
+        try:
+            with open(path, newline='', encoding='utf-8') as handle:
+                rows = self.read_rows(handle, file_format)
+                # Dry runs execute the same writes inside one transaction that is
+                # rolled back, so the diff reflects exactly what a real run does.
+                with transaction.atomic():
+                    while True:
+                        chunk = list(islice(rows, batch_size))
+                        if not chunk:
+                            break
+                        self.import_chunk(chunk)
+                        elapsed = time.monotonic() - started
+                        self.stdout.write(
+                            f"  {self.stats['rows']} rows in {elapsed:.1f}s "
+                            f"({self.stats['rows'] / max(elapsed, 0.001):.0f} rows/s)"
+                        )
+                    if self.dry_run:
+                        transaction.set_rollback(True)
+                    else:
+                        # bulk_create/bulk_update bypass the signals that keep the filter index fresh
+                        transaction.on_commit(invalidate_attribute_index)
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        elapsed = time.monotonic() - started
+        style = self.style.WARNING if self.stats['errors'] else self.style.SUCCESS
+        self.stdout.write(style(f"✓ Imported {self.stats['rows']} rows in {elapsed:.1f}s"))
+        self.stdout.write(f"  - Products created: {self.stats['products_created']}")
+        self.stdout.write(f"  - Products updated: {self.stats['products_updated']}")
+        self.stdout.write(f"  - Variants created: {self.stats['variants_created']}")
+        self.stdout.write(f"  - Variants updated: {self.stats['variants_updated']}")
+        self.stdout.write(f"  - Rows skipped (errors): {self.stats['errors']}")
+        self.stdout.write(f"  - Throughput: {self.stats['rows'] / max(elapsed, 0.001):.0f} rows/s")
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read_rows(self, handle, file_format):
+        """Yield (line_number, row) pairs without loading the file into memory"""
+        if file_format == 'jsonl':
+            for line_number, line in enumerate(handle, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, RowError(f'Invalid JSON: {e}')
+            return
+
+        reader = csv.DictReader(handle)
+        for line_number, row in enumerate(reader, start=2):
+            attributes = {
+                key[len(ATTRIBUTE_PREFIX):]: value
+                for key, value in row.items()
+                if key and key.startswith(ATTRIBUTE_PREFIX) and value
+            }
+            row = {key: value for key, value in row.items() if key and not key.startswith(ATTRIBUTE_PREFIX)}
+            row['attributes'] = attributes
+            yield line_number, row
+
+    def load_reference_maps(self):
+        """Resolve categories, brands and attribute values once instead of per row"""
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.brands = dict(Brand.objects.values_list('slug', 'id'))
+
+        self.brand_categories = {}
+        for brand_id, category_id in Brand.category.through.objects.values_list('brand_id', 'category_id'):
+            self.brand_categories.setdefault(brand_id, set()).add(category_id)
+
+        attribute_names = dict(VariantAttribute.objects.values_list('id', 'name'))
+        self.attribute_values = {}
+        self.attribute_labels = {}
+        for value_id, attribute_id, value, color_code in VariantAttributeValue.objects.values_list(
+            'id', 'attribute_id', 'value', 'color_code'
+        ):
+            name = attribute_names[attribute_id]
+            for label in (value, color_code):
+                if label:
+                    self.attribute_values[(name.lower(), label.lower())] = value_id
+            self.attribute_labels[value_id] = f'{name}={value or color_code}'
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+
+    def parse_row(self, row):
+        if isinstance(row, RowError):
+            raise row
+
+        name = (row.get('name') or row.get('product_name') or '').strip()
+        slug = (row.get('slug') or row.get('product_slug') or '').strip() or slugify(name)
+        if not slug:
+            raise RowError('Either slug or name is required')
+
+        product = {'slug': slug}
+        if name:
+            product['name'] = name
+        for field in ('description', 'short_description'):
+            if row.get(field):
+                product[field] = row[field]
+
+        if row.get('category'):
+            if row['category'] not in self.categories:
+                raise RowError(f"Unknown category '{row['category']}'")
+            product['category_id'] = self.categories[row['category']]
+        if row.get('brand'):
+            if row['brand'] not in self.brands:
+                raise RowError(f"Unknown brand '{row['brand']}'")
+            product['brand_id'] = self.brands[row['brand']]
+        if 'category_id' in product and 'brand_id' in product:
+            # Same rule as Product.clean(), checked against the in-memory map
+            if product['category_id'] not in self.brand_categories.get(product['brand_id'], ()):
+                raise RowError('Selected brand does not belong to the selected category.')
+
+        if row.get('base_price') not in (None, ''):
+            product['base_price'] = self.parse_decimal(row['base_price'], 'base_price')
+        for field in ('is_active', 'is_featured'):
+            if row.get(field) not in (None, ''):
+                product[field] = self.parse_bool(row[field])
+
+        variant = {}
+        if row.get('price') not in (None, ''):
+            variant['price'] = self.parse_decimal(row['price'], 'price')
+        if row.get('stock_quantity') not in (None, ''):
+            try:
+                variant['stock_quantity'] = int(row['stock_quantity'])
+            except (TypeError, ValueError):
+                raise RowError(f"Invalid stock_quantity '{row['stock_quantity']}'")
+            if variant['stock_quantity'] < 0:
+                raise RowError('stock_quantity cannot be negative')
+        if row.get('variant_is_active') not in (None, ''):
+            variant['is_active'] = self.parse_bool(row['variant_is_active'])
+        if row.get('is_default') not in (None, ''):
+            variant['is_default'] = self.parse_bool(row['is_default'])
+
+        attribute_ids = set()
+        for attribute, value in (row.get('attributes') or {}).items():
+            key = (str(attribute).strip().lower(), str(value).strip().lower())
+            if key not in self.attribute_values:
+                raise RowError(f"Unknown attribute value {attribute}={value}")
+            attribute_ids.add(self.attribute_values[key])
+
+        if attribute_ids and 'price' not in variant:
+            raise RowError('price is required for variant rows')
+        variant['attribute_ids'] = frozenset(attribute_ids)
+
+        return product, variant
+
+    def parse_decimal(self, value, field):
+        try:
+            parsed = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise RowError(f"Invalid {field} '{value}'")
+        if parsed < 0:
+            raise RowError(f'{field} cannot be negative')
+        return parsed.quantize(Decimal('0.01'))
+
+    def parse_bool(self, value):
+        if isinstance(value, bool):
+            return value
+        return str(value).strip().lower() in TRUE_VALUES
+
+    def report_error(self, line_number, message):
+        self.stats['errors'] += 1
+        if self.stats['errors'] <= self.max_errors:
+            self.stderr.write(self.style.ERROR(f'  line {line_number}: {message}'))
+
+    def diff(self, line):
+        if self.show_diff:
+            self.stdout.write(line)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def import_chunk(self, chunk):
+        parsed = []
+        for line_number, row in chunk:
+            self.stats['rows'] += 1
+            try:
+                product, variant = self.parse_row(row)
+            except RowError as e:
+                self.report_error(line_number, e)
+                continue
+            parsed.append((line_number, product, variant))
+
+        if not parsed:
+            return
+
+        with transaction.atomic():
+            products = self.upsert_products(parsed)
+            self.upsert_variants(parsed, products)
+            # Bulk writes skip ProductVariant.save(), so refresh the price range columns here
+            Product.refresh_variant_prices(p.id for p in products.values())
+
+    def upsert_products(self, parsed):
+        """Create or update every product referenced by the chunk in two bulk queries"""
+        slugs = {product['slug'] for _, product, _ in parsed}
+        existing = {p.slug: p for p in Product.objects.filter(slug__in=slugs)}
+
+        # Several variant rows share one product; later rows may only carry variant data
+        merged = {}
+        first_line = {}
+        for line_number, product, _ in parsed:
+            merged.setdefault(product['slug'], {}).update(product)
+            first_line.setdefault(product['slug'], line_number)
+
+        to_create, to_update = [], []
+        now = timezone.now()
+        for slug, data in merged.items():
+            current = existing.get(slug)
+            if current is None:
+                missing = [f for f in ('name', 'description', 'category_id', 'brand_id', 'base_price') if f not in data]
+                if missing:
+                    self.report_error(first_line[slug], f"New product '{slug}' is missing: {', '.join(missing)}")
+                    continue
+                if data['category_id'] not in self.brand_categories.get(data['brand_id'], ()):
+                    self.report_error(first_line[slug], 'Selected brand does not belong to the selected category.')
+                    continue
+                to_create.append(Product(**data))
+                self.diff(self.style.SUCCESS(f"+ product {slug} ({data['name']})"))
+                continue
+
+            changes = []
+            for field in PRODUCT_FIELDS:
+                if field in data and getattr(current, field) != data[field]:
+                    changes.append(f'{field}: {getattr(current, field)} -> {data[field]}')
+                    setattr(current, field, data[field])
+            if changes:
+                if current.category_id not in self.brand_categories.get(current.brand_id, ()):
+                    self.report_error(first_line[slug], 'Selected brand does not belong to the selected category.')
+                    existing.pop(slug)
+                    continue
+                current.updated_at = now
+                to_update.append(current)
+                self.diff(self.style.WARNING(f"~ product {slug}: {'; '.join(changes)}"))
+
+        if to_create:
+            for product in Product.objects.bulk_create(to_create):
+                existing[product.slug] = product
+        if to_update:
+            Product.objects.bulk_update(to_update, PRODUCT_FIELDS + ['updated_at'])
+
+        self.stats['products_created'] += len(to_create)
+        self.stats['products_updated'] += len(to_update)
+        return existing
+
+    def upsert_variants(self, parsed, products):
+        """Match variants by (product, attribute set), then bulk write variants and through rows"""
+        product_ids = {p.id for p in products.values()}
+        through = ProductVariant.variant_attributes.through
+
+        attribute_sets = {}
+        for variant_id, value_id in through.objects.filter(
+            productvariant__product_id__in=product_ids
+        ).values_list('productvariant_id', 'variantattributevalue_id'):
+            attribute_sets.setdefault(variant_id, set()).add(value_id)
+
+        existing = {}
+        for variant in ProductVariant.objects.filter(product_id__in=product_ids):
+            existing[(variant.product_id, frozenset(attribute_sets.get(variant.id, ())))] = variant
+
+        to_create, to_update, defaults = {}, {}, {}
+        price_changes, restocked = [], []
+        now = timezone.now()
+        for line_number, product_data, data in parsed:
+            product = products.get(product_data['slug'])
+            if product is None or 'price' not in data:
+                continue  # product failed validation, or a product-only row
+
+            key = (product.id, data['attribute_ids'])
+            label = ', '.join(sorted(self.attribute_labels[i] for i in data['attribute_ids'])) or 'default'
+            variant = existing.get(key) or to_create.get(key)
+
+            if variant is None:
+                variant = ProductVariant(
+                    product_id=product.id,
+                    **{field: data[field] for field in VARIANT_FIELDS if field in data}
+                )
+                to_create[key] = variant
+                self.diff(self.style.SUCCESS(f'+ variant {product.slug} [{label}] price={data["price"]}'))
+            elif variant.pk:
+                old_price, old_stock = variant.price, variant.stock_quantity
+                changes = []
+                for field in VARIANT_FIELDS:
+                    if field in data and getattr(variant, field) != data[field]:
+                        changes.append(f'{field}: {getattr(variant, field)} -> {data[field]}')
+                        setattr(variant, field, data[field])
+                if changes:
+                    variant.updated_at = now
+                    to_update[key] = variant
+                    if variant.price != old_price:
+                        price_changes.append((variant.pk, old_price, variant.price))
+                    if old_stock <= 0 < variant.stock_quantity:
+                        restocked.append(variant.pk)
+                    self.diff(self.style.WARNING(f"~ variant {product.slug} [{label}]: {'; '.join(changes)}"))
+
+            if data.get('is_default'):
+                defaults[product.id] = key
+
+        created = ProductVariant.objects.bulk_create(list(to_create.values()))
+        through.objects.bulk_create(
+            [
+                through(productvariant_id=variant.id, variantattributevalue_id=value_id)
+                for (_, attribute_ids), variant in zip(to_create.keys(), created)
+                for value_id in attribute_ids
+            ],
+            ignore_conflicts=True,
+        )
+        if to_update:
+            ProductVariant.objects.bulk_update(list(to_update.values()), VARIANT_FIELDS + ['updated_at'])
+        if price_changes:
+            variant_prices_changed.send(sender=ProductVariant, changes=price_changes)
+        if restocked:
+            variants_restocked.send(sender=ProductVariant, variant_ids=restocked)
+
+        self.stats['variants_created'] += len(created)
+        self.stats['variants_updated'] += len(to_update)
+        self.fix_default_variants(product_ids, defaults, existing, to_create)
+
+    def fix_default_variants(self, product_ids, defaults, existing, created):
+        """Keep exactly one default variant per product, as ProductVariant.save() does"""
+        explicit_ids = [(existing.get(key) or created[key]).id for key in defaults.values()]
+        if explicit_ids:
+            ProductVariant.objects.filter(product_id__in=defaults.keys(), is_default=True).exclude(
+                id__in=explicit_ids
+            ).update(is_default=False)
+            ProductVariant.objects.filter(id__in=explicit_ids).update(is_default=True)
+
+        with_default = set(
+            ProductVariant.objects.filter(product_id__in=product_ids, is_default=True)
+            .values_list('product_id', flat=True)
+        )
+        first_variants = (
+            ProductVariant.objects.filter(product_id__in=product_ids - with_default)
+            .values('product_id')
+            .annotate(first_id=Min('id'))
+            .values_list('first_id', flat=True)
+        )
+        ProductVariant.objects.filter(id__in=list(first_variants)).update(is_default=True)
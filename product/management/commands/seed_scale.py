@@ -0,0 +1,431 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from orders.models import Order, OrderItem
+from product.attribute_index import invalidate_attribute_index
+from product.models import (
+    Brand, Category, Product, ProductVariant, VariantAttribute, VariantAttributeValue
+)
+from reviews.models import ProductReview
+
+User = get_user_model()
+
+# products, variants, users, orders, reviews
+SCALES = {
+    'small': (1_000, 5_000, 500, 10_000, 20_000),
+    'medium': (10_000, 50_000, 5_000, 100_000, 200_000),
+    'large': (50_000, 250_000, 20_000, 500_000, 1_000_000),
+    'xl': (100_000, 500_000, 50_000, 1_000_000, 2_000_000),
+}
+
+CATEGORY_TREE = {
+    'Phones': ['Smartphones', 'Feature Phones', 'Refurbished Phones'],
+    'Tablets': ['Android Tablets', 'iPads', 'E-Readers'],
+    'Laptops': ['Ultrabooks', 'Gaming Laptops', 'Chromebooks'],
+    'Audio': ['Earbuds', 'Headphones', 'Speakers'],
+    'Wearables': ['Smartwatches', 'Fitness Bands'],
+    'Accessories': ['Chargers', 'Cases', 'Power Banks', 'Cables'],
+}
+BRAND_NAMES = [
+    'Apple', 'Samsung', 'Xiaomi', 'OnePlus', 'Oppo', 'Vivo', 'Realme', 'Google', 'Motorola', 'Nokia',
+    'Sony', 'Huawei', 'Honor', 'Asus', 'Lenovo', 'Dell', 'HP', 'Acer', 'JBL', 'Anker',
+]
+ATTRIBUTES = {
+    'Color': ['Black', 'White', 'Blue', 'Green', 'Silver', 'Gold', 'Purple', 'Red'],
+    'Storage': ['64GB', '128GB', '256GB', '512GB', '1TB'],
+    'Memory': ['4GB', '6GB', '8GB', '12GB', '16GB'],
+}
+ORDER_STATUSES = ['delivered'] * 6 + ['shipped', 'processing', 'confirmed', 'pending', 'cancelled', 'refunded']
+PAYMENT_METHODS = ['cod', 'cod', 'khalti', 'esewa', 'bank_transfer']
+CITIES = [('Kathmandu', 'Bagmati', '44600'), ('Pokhara', 'Gandaki', '33700'), ('Lalitpur', 'Bagmati', '44700'),
+          ('Biratnagar', 'Koshi', '56613'), ('Butwal', 'Lumbini', '32907')]
+# Rating distribution skewed towards positive reviews, like a real storefront
+RATING_WEIGHTS = [4, 5, 11, 30, 50]
+HISTORY_DAYS = 365
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep the created_at/updated_at values we set instead of stamping "now" on every row"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def chunked(start, stop, size):
+    for lower in range(start, stop, size):
+        yield lower, min(lower + size, stop)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a large synthetic catalog (categories, brands, products, variants) plus traffic '
+        '(users, orders, reviews) with bulk inserts, for profiling and benchmarking at production scale.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES), default='small',
+                            help='Preset dataset size (xl = 100k products, 500k variants, 1M orders, 2M reviews)')
+        parser.add_argument('--products', type=int, help='Override the preset product count')
+        parser.add_argument('--variants', type=int, help='Override the preset variant count')
+        parser.add_argument('--users', type=int, help='Override the preset customer count')
+        parser.add_argument('--orders', type=int, help='Override the preset order count')
+        parser.add_argument('--reviews', type=int, help='Override the preset review count')
+        parser.add_argument('--chunk', type=int, default=5000, help='Rows written per transaction (default: 5000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for reproducible datasets')
+        parser.add_argument('--prefix', default='scale', help='Slug/email prefix that marks generated rows')
+
+    def handle(self, *args, **options):
+        products, variants, users, orders, reviews = SCALES[options['scale']]
+        self.counts = {
+            'products': options['products'] if options['products'] is not None else products,
+            'variants': options['variants'] if options['variants'] is not None else variants,
+            'users': options['users'] if options['users'] is not None else users,
+            'orders': options['orders'] if options['orders'] is not None else orders,
+            'reviews': options['reviews'] if options['reviews'] is not None else reviews,
+        }
+        if self.counts['products'] < 1 or self.counts['variants'] < self.counts['products']:
+            raise CommandError('Need at least one product and one variant per product.')
+        if (self.counts['orders'] or self.counts['reviews']) and self.counts['users'] < 1:
+            raise CommandError('Orders and reviews need at least one user.')
+        # Reviews are unique per (product, user)
+        self.counts['reviews'] = min(self.counts['reviews'], self.counts['products'] * self.counts['users'])
+
+        self.chunk = max(100, options['chunk'])
+        self.random = random.Random(options['seed'])
+        # Unique per run so repeated seeding never collides on slugs or emails
+        self.tag = f"{options['prefix']}-{uuid.uuid4().hex[:6]}"
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        self.stdout.write(
+            'Seeding ' + ', '.join(f'{count:,} {name}' for name, count in self.counts.items())
+            + f' (tag "{self.tag}")'
+        )
+        with explicit_timestamps(Category, Brand, Product, ProductVariant, Order, OrderItem, ProductReview):
+            leaves, brands_by_category = self.seed_taxonomy()
+            attribute_values = self.seed_attributes()
+            user_ids = self.seed_users()
+            product_names = self.seed_products(leaves, brands_by_category)
+            variant_rows = self.seed_variants(product_names, attribute_values)
+            self.seed_orders(user_ids, product_names, variant_rows)
+            self.seed_reviews(list(product_names), user_ids)
+
+        self.finalize(list(product_names))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Seeded dataset "{self.tag}" in {elapsed:.1f}s'))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def past(self):
+        """Random timestamp within the last HISTORY_DAYS days"""
+        return self.now - timedelta(seconds=self.random.randrange(HISTORY_DAYS * 24 * 3600))
+
+    def progress(self, label, done, total, started):
+        rate = done / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f'  {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)')
+
+    # ------------------------------------------------------------------
+    # Catalog
+    # ------------------------------------------------------------------
+
+    def seed_taxonomy(self):
+        leaves = []
+        brands_by_category = {}
+        with transaction.atomic():
+            for root_name, children in CATEGORY_TREE.items():
+                root = Category.objects.create(
+                    name=root_name, slug=f'{self.tag}-{root_name.lower()}',
+                    created_at=self.now, updated_at=self.now,
+                )
+                leaves += Category.objects.bulk_create([
+                    Category(
+                        name=name, slug=f"{self.tag}-{name.lower().replace(' ', '-')}", parent=root,
+                        is_featured=index == 0, created_at=self.now, updated_at=self.now,
+                    )
+                    for index, name in enumerate(children)
+                ])
+
+            brands = Brand.objects.bulk_create([
+                Brand(name=f'{name} {self.tag}', slug=f'{self.tag}-{name.lower()}', created_at=self.now)
+                for name in BRAND_NAMES
+            ])
+            links = []
+            for category in leaves:
+                picked = self.random.sample(brands, k=min(6, len(brands)))
+                brands_by_category[category.id] = picked
+                links += [
+                    Brand.category.through(brand_id=brand.id, category_id=category.id) for brand in picked
+                ]
+            Brand.category.through.objects.bulk_create(links)
+        self.stdout.write(f'  taxonomy: {len(leaves)} leaf categories, {len(brands)} brands')
+        return leaves, brands_by_category
+
+    def seed_attributes(self):
+        """Shared attribute values; reuses existing rows so filters_metadata stays realistic"""
+        values = {}
+        for name, options in ATTRIBUTES.items():
+            attribute, _ = VariantAttribute.objects.get_or_create(
+                name=name, defaults={'display_name': f'Choose {name}'}
+            )
+            values[name] = [
+                VariantAttributeValue.objects.get_or_create(attribute=attribute, value=value)[0].id
+                for value in options
+            ]
+        return values
+
+    def seed_products(self, leaves, brands_by_category):
+        """Returns {product id: name}"""
+        total = self.counts['products']
+        names = {}
+        self.base_prices = {}
+        started = time.monotonic()
+        for lower, upper in chunked(0, total, self.chunk):
+            rows = []
+            for index in range(lower, upper):
+                category = self.random.choice(leaves)
+                brand = self.random.choice(brands_by_category[category.id])
+                created = self.past()
+                name = f'{brand.name.split()[0]} {category.name} {index + 1}'
+                rows.append(Product(
+                    name=name,
+                    slug=f'{self.tag}-product-{index + 1}',
+                    description=f'<p>{name} with {self.random.choice(ATTRIBUTES["Storage"])} storage.</p>',
+                    category=category,
+                    brand=brand,
+                    base_price=Decimal(self.random.randrange(5_000, 250_000, 100)),
+                    is_featured=self.random.random() < 0.02,
+                    created_at=created,
+                    updated_at=created,
+                ))
+            with transaction.atomic():
+                for product in Product.objects.bulk_create(rows):
+                    names[product.id] = product.name
+                    self.base_prices[product.id] = product.base_price
+            self.progress('products', upper, total, started)
+        return names
+
+    def seed_variants(self, product_names, attribute_values):
+        """Returns a list of (variant id, product id, price) used to build order items"""
+        product_ids = list(product_names)
+        total = self.counts['variants']
+        per_product, extra = divmod(total, len(product_ids))
+        through = ProductVariant.variant_attributes.through
+        colors, storages, memories = attribute_values['Color'], attribute_values['Storage'], attribute_values['Memory']
+
+        variant_rows = []
+        started = time.monotonic()
+        done = 0
+        product_chunk = max(1, self.chunk // max(per_product, 1))
+        for lower, upper in chunked(0, len(product_ids), product_chunk):
+            variants, attribute_ids = [], []
+            for position in range(lower, upper):
+                product_id = product_ids[position]
+                base = self.base_prices[product_id]
+                for n in range(per_product + (position < extra)):
+                    # Walk storage first, then colour, so each product's variants stay distinct
+                    storage = storages[n % len(storages)]
+                    color = colors[(n // len(storages)) % len(colors)]
+                    memory = memories[min(n % len(storages), len(memories) - 1)]
+                    created = self.now - timedelta(days=self.random.randrange(HISTORY_DAYS))
+                    variants.append(ProductVariant(
+                        product_id=product_id,
+                        price=(base * Decimal(1 + 0.15 * (n % len(storages)))).quantize(Decimal('1.00')),
+                        stock_quantity=0 if self.random.random() < 0.08 else self.random.randrange(1, 200),
+                        sold_quantity=self.random.randrange(0, 500),
+                        is_default=n == 0,
+                        created_at=created,
+                        updated_at=created,
+                    ))
+                    attribute_ids.append((color, storage, memory))
+            with transaction.atomic():
+                created_variants = ProductVariant.objects.bulk_create(variants)
+                links = []
+                for variant, value_ids in zip(created_variants, attribute_ids):
+                    links += [
+                        through(productvariant_id=variant.id, variantattributevalue_id=value_id)
+                        for value_id in value_ids
+                    ]
+                    variant_rows.append((variant.id, variant.product_id, variant.price))
+                through.objects.bulk_create(links, batch_size=self.chunk)
+            done += len(variants)
+            self.progress('variants', done, total, started)
+        return variant_rows
+
+    # ------------------------------------------------------------------
+    # Traffic
+    # ------------------------------------------------------------------
+
+    def seed_users(self):
+        total = self.counts['users']
+        # Hashing is deliberately slow; every generated customer shares one password
+        password = make_password('benchmark-password')
+        user_ids = []
+        started = time.monotonic()
+        for lower, upper in chunked(0, total, self.chunk):
+            rows = [
+                User(
+                    email=f'{self.tag}-user-{index + 1}@example.com',
+                    first_name='Customer',
+                    last_name=str(index + 1),
+                    password=password,
+                    is_active=True,
+                    is_verified=True,
+                )
+                for index in range(lower, upper)
+            ]
+            with transaction.atomic():
+                user_ids += [user.id for user in User.objects.bulk_create(rows)]
+            self.progress('users', upper, total, started)
+        return user_ids
+
+    def seed_orders(self, user_ids, product_names, variant_rows):
+        total = self.counts['orders']
+        started = time.monotonic()
+        for lower, upper in chunked(0, total, self.chunk):
+            orders, lines = [], []
+            for _ in range(lower, upper):
+                city, state, zip_code = self.random.choice(CITIES)
+                status = self.random.choice(ORDER_STATUSES)
+                payment_method = self.random.choice(PAYMENT_METHODS)
+                created = self.past()
+                items = [
+                    (self.random.choice(variant_rows), self.random.choice((1, 1, 1, 2, 3)))
+                    for _ in range(self.random.choice((1, 1, 2, 3)))
+                ]
+                subtotal = sum(price * quantity for (_, _, price), quantity in items)
+                shipping_cost = Decimal('0.00') if subtotal > 5000 else Decimal('150.00')
+                paid = status in ('delivered', 'shipped') or (payment_method != 'cod' and status != 'pending')
+                orders.append(Order(
+                    user_id=self.random.choice(user_ids),
+                    order_number=f'ORD-{uuid.uuid4().hex[:12].upper()}',
+                    order_status=status,
+                    payment_status='refunded' if status == 'refunded' else ('paid' if paid else 'pending'),
+                    payment_method=payment_method,
+                    subtotal=subtotal,
+                    shipping_cost=shipping_cost,
+                    total=subtotal + shipping_cost,
+                    shipping_name='Benchmark Customer',
+                    shipping_email='customer@example.com',
+                    shipping_phone='9800000000',
+                    shipping_address='Ward 1, Main Road',
+                    shipping_city=city,
+                    shipping_state=state,
+                    shipping_zip=zip_code,
+                    shipping_country='Nepal',
+                    billing_name='Benchmark Customer',
+                    billing_address='Ward 1, Main Road',
+                    billing_city=city,
+                    billing_state=state,
+                    billing_zip=zip_code,
+                    billing_country='Nepal',
+                    created_at=created,
+                    updated_at=created,
+                ))
+                lines.append(items)
+
+            with transaction.atomic():
+                order_items = []
+                for order, items in zip(Order.objects.bulk_create(orders), lines):
+                    for (variant_id, product_id, price), quantity in items:
+                        order_items.append(OrderItem(
+                            order_id=order.id,
+                            product_id=product_id,
+                            product_variant_id=variant_id,
+                            product_name=product_names[product_id][:200],
+                            quantity=quantity,
+                            price=price,
+                            original_price=price,
+                            # bulk_create skips save(), which normally computes the subtotal
+                            subtotal=price * quantity,
+                            created_at=order.created_at,
+                            updated_at=order.created_at,
+                        ))
+                OrderItem.objects.bulk_create(order_items)
+            self.progress('orders', upper, total, started)
+
+    def seed_reviews(self, product_ids, user_ids):
+        total = self.counts['reviews']
+        started = time.monotonic()
+        ratings = range(1, 6)
+        for lower, upper in chunked(0, total, self.chunk):
+            rows = []
+            for index in range(lower, upper):
+                # index -> (product, user) is injective while total <= products * users
+                rating = self.random.choices(ratings, weights=RATING_WEIGHTS)[0]
+                created = self.past()
+                rows.append(ProductReview(
+                    product_id=product_ids[index % len(product_ids)],
+                    user_id=user_ids[(index // len(product_ids)) % len(user_ids)],
+                    rating=rating,
+                    title=f'{rating} stars',
+                    comment='Generated review.',
+                    is_approved=self.random.random() < 0.85,
+                    created_at=created,
+                    updated_at=created,
+                ))
+            with transaction.atomic():
+                ProductReview.objects.bulk_create(rows)
+            self.progress('reviews', upper, total, started)
+
+    # ------------------------------------------------------------------
+    # Denormalized columns
+    # ------------------------------------------------------------------
+
+    def finalize(self, product_ids):
+        """bulk_create skips the model hooks that keep price ranges and rating histograms in sync"""
+        started = time.monotonic()
+        for lower, upper in chunked(0, len(product_ids), self.chunk):
+            batch = product_ids[lower:upper]
+            with transaction.atomic():
+                Product.refresh_variant_prices(batch)
+                self.refresh_ratings(batch)
+        invalidate_attribute_index()
+        self.stdout.write(f'  denormalized price ranges and ratings in {time.monotonic() - started:.1f}s')
+
+    def refresh_ratings(self, product_ids):
+        """Rebuild the rating histograms of a batch of products with one grouped aggregate"""
+        rows = (
+            ProductReview.objects.filter(product_id__in=product_ids, is_approved=True)
+            .values('product_id')
+            .annotate(
+                count=Count('id'),
+                total=Sum('rating'),
+                **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+            )
+            .order_by()
+        )
+        products = []
+        for row in rows:
+            product = Product(pk=row.pop('product_id'))
+            product.review_count = row.pop('count')
+            product.rating_sum = row.pop('total')
+            for field, value in row.items():
+                setattr(product, field, value)
+            product.average_rating = round(product.rating_sum / product.review_count, 2)
+            products.append(product)
+        Product.objects.bulk_update(
+            products, ['review_count', 'rating_sum', 'average_rating', *Product.RATING_FIELDS]
+        )
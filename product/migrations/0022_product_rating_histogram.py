@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_histogram(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    ProductReview = apps.get_model('reviews', 'ProductReview')
+
+    rows = (
+        ProductReview.objects.filter(is_approved=True)
+        .values('product_id')
+        .annotate(
+            count=Count('id'),
+            total=Sum('rating'),
+            **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+        )
+    )
+    products = []
+    for row in rows.iterator():
+        product = Product(pk=row['product_id'])
+        product.review_count = row['count']
+        product.rating_sum = row['total']
+        product.average_rating = round(row['total'] / row['count'], 2)
+        for star in range(1, 6):
+            setattr(product, f'rating_{star}', row[f'rating_{star}'])
+        products.append(product)
+
+    Product.objects.exclude(pk__in=[p.pk for p in products]).update(review_count=0, average_rating=0)
+    Product.objects.bulk_update(
+        products,
+        ['review_count', 'rating_sum', 'average_rating', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0021_image_renditions'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_histogram, migrations.RunPython.noop),
+    ]
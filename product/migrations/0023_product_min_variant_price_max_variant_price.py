@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 11:48
+
+from django.db import migrations, models
+from django.db.models import Max, Min, OuterRef, Subquery
+
+
+def backfill_variant_prices(apps, schema_editor):
+    Product = apps.get_model('product', 'Product')
+    ProductVariant = apps.get_model('product', 'ProductVariant')
+
+    active = (
+        ProductVariant.objects
+        .filter(product=OuterRef('pk'), is_active=True)
+        .order_by()
+        .values('product')
+    )
+    Product.objects.update(
+        min_variant_price=Subquery(active.annotate(price_min=Min('price')).values('price_min')),
+        max_variant_price=Subquery(active.annotate(price_max=Max('price')).values('price_max')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0022_product_rating_histogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='min_variant_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='max_variant_price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_variant_prices, migrations.RunPython.noop),
+    ]
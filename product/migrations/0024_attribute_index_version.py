@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0023_product_min_variant_price_max_variant_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributeIndexVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Attribute Index Version',
+                'verbose_name_plural': 'Attribute Index Version',
+            },
+        ),
+    ]
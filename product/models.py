@@ -7,12 +7,24 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from datetime import timedelta
 import random
 import string
-from django.db.models import Avg, Count
+from django.db.models import Count, F, FloatField, Max, Min, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.core.exceptions import ValidationError
 from filehub.fields import ImagePickerField
 
 
 
+class ImageRenditionFields(models.Model):
+    """Metadata filled in by product.images once responsive renditions are generated"""
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_placeholder = models.CharField(max_length=7, blank=True, editable=False, help_text="Dominant colour (#rrggbb)")
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
 class Category(models.Model):
     """Product categories like Smartphones, Laptops, etc."""
     name = models.CharField(max_length=200)
@@ -102,14 +114,100 @@ class Product(models.Model):
     )
     review_count = models.PositiveIntegerField(default=0)
 
+    # Histogram of approved reviews, kept in sync by ProductReview via F() deltas
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    RATING_FIELDS = ['rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5']
+
+    # Price range of active variants, kept in sync by refresh_variant_prices()
+    min_variant_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False, db_index=True)
+    max_variant_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False, db_index=True)
+
+    @classmethod
+    def refresh_variant_prices(cls, product_ids):
+        """
+        Recompute min/max active variant price for the given products with one UPDATE
+
+        Args:
+            product_ids: Iterable of product IDs whose variants changed
+        """
+        product_ids = [pk for pk in set(product_ids) if pk]
+        if not product_ids:
+            return
+        active = (
+            ProductVariant.objects
+            .filter(product=OuterRef('pk'), is_active=True)
+            .order_by()
+            .values('product')
+        )
+        cls.objects.filter(pk__in=product_ids).update(
+            min_variant_price=Subquery(active.annotate(price_min=Min('price')).values('price_min')),
+            max_variant_price=Subquery(active.annotate(price_max=Max('price')).values('price_max')),
+        )
+
+    @property
+    def star_counts(self):
+        """Approved review count per star, e.g. {"1": 0, ..., "5": 12}"""
+        return {str(star): getattr(self, f'rating_{star}') for star in range(1, 6)}
+
+    @classmethod
+    def apply_rating_delta(cls, product_id, added=None, removed=None):
+        """
+        Move one review in or out of a product's rating histogram with a single UPDATE
+
+        Args:
+            product_id: Product to update
+            added: Rating (1-5) entering the approved set, or None
+            removed: Rating (1-5) leaving the approved set, or None
+        """
+        if added == removed:
+            return
+
+        count_delta = (added is not None) - (removed is not None)
+        sum_delta = (added or 0) - (removed or 0)
+        new_count = F('review_count') + count_delta
+        new_sum = F('rating_sum') + sum_delta
+
+        updates = {
+            'review_count': new_count,
+            'rating_sum': new_sum,
+            # All right-hand sides see the pre-update row, so derive the average from the new totals
+            'average_rating': Coalesce(Cast(new_sum, FloatField()) / NullIf(new_count, 0), Value(0.0)),
+        }
+        if added is not None:
+            updates[f'rating_{added}'] = F(f'rating_{added}') + 1
+        if removed is not None:
+            updates[f'rating_{removed}'] = F(f'rating_{removed}') - 1
+        cls.objects.filter(pk=product_id).update(**updates)
+
     def update_rating(self):
+        """
+        Rebuild the rating histogram from approved reviews
+
+        Normal review writes go through apply_rating_delta; this full re-aggregation
+        is only needed to repair drift (e.g. after raw SQL or queryset.update()).
+        """
         agg = self.reviews.filter(is_approved=True).aggregate(
-            average=Avg('rating'),
-            count=Count('id')
+            count=Count('id'),
+            total=Sum('rating'),
+            **{f'rating_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+        )
+        self.review_count = agg.pop('count') or 0
+        self.rating_sum = agg.pop('total') or 0
+        for field, value in agg.items():
+            setattr(self, field, value)
+        self.average_rating = round(self.rating_sum / self.review_count, 2) if self.review_count else 0.0
+        Product.objects.filter(pk=self.pk).update(
+            review_count=self.review_count,
+            rating_sum=self.rating_sum,
+            average_rating=self.average_rating,
+            **agg
         )
-        self.average_rating = agg['average'] or 0.0
-        self.review_count = agg['count'] or 0
-        self.save(update_fields=['average_rating', 'review_count'])
 
     class Meta:
         verbose_name = "Product"
@@ -153,7 +251,7 @@ class VariantAttribute(models.Model):
         return self.name
 
 
-class VariantAttributeValue(models.Model):
+class VariantAttributeValue(ImageRenditionFields):
     TYPE_CHOICES = [
         ("text", "Text"),
         ("color", "Color"),
@@ -236,6 +334,13 @@ class ProductVariant(models.Model):
         attributes = ", ".join([f"{va.attribute.name}: {va.value}" for va in self.variant_attributes.all()])
         return f"{self.product.name} - {attributes}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so post_save receivers can detect price and stock transitions
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     @property
     def is_in_stock(self) -> bool:
         return self.stock_quantity > 0
@@ -307,6 +412,13 @@ class ProductVariant(models.Model):
                 is_default=True
             ).exclude(pk=self.pk).update(is_default=False)
 
+        # Stock-only saves (orders) leave the product price range untouched
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'price', 'is_active', 'product'} & set(update_fields):
+            # A variant moved to another product also changes the range of the one it left
+            previous_product_id = getattr(self, '_loaded_values', {}).get('product_id')
+            Product.refresh_variant_prices([self.product_id, previous_product_id])
+
 
 
 # class ProductVariantAttributeValue(models.Model):
@@ -331,7 +443,7 @@ class ProductVariant(models.Model):
 #         return self.attribute_value.value
 
 
-class ProductImage(models.Model):
+class ProductImage(ImageRenditionFields):
     """Product images - can be linked to specific variants or to the product"""
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='images')
     variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, null=True, blank=True, related_name='images')
@@ -603,4 +715,19 @@ class RecentlyViewedProduct(models.Model):
         unique_together = ('user', 'product')  # ensures one entry per user-product
 
     def __str__(self):
-        return f"{self.user.username} viewed {self.product.name}"
\ No newline at end of file
+        return f"{self.user.username} viewed {self.product.name}"
+
+class AttributeIndexVersion(models.Model):
+    """
+    Single-row counter behind product.attribute_index. Every worker compares it
+    with the version of its in-memory index, so an invalidation made anywhere
+    (another worker, import_catalog) reaches all of them.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Attribute Index Version"
+        verbose_name_plural = "Attribute Index Version"
+
+    def __str__(self):
+        return f"Attribute index v{self.version}"
@@ -1,5 +1,7 @@
 from rest_framework import serializers
+from django.db.models import Count, Prefetch
 from django.utils import timezone
+from .images import build_srcset
 from .models import (
     Category, Brand, Product, VariantAttribute, VariantAttributeValue,
     ProductVariant,
@@ -33,23 +35,45 @@ class CategorySerializer(serializers.ModelSerializer):
         
 
     
+    def category_tree(self):
+        """
+        Product counts and active children of every category, loaded once per
+        serialization and shared through the context with nested and child
+        serializers, so a listed category costs no queries of its own
+
+        Returns:
+            (product count by category id, active children by parent id)
+        """
+        if 'category_tree' not in self.context:
+            counts = {}
+            rows = (
+                Product.objects.filter(is_active=True, category__is_active=True)
+                .values('category_id', 'category__parent_id')
+                .annotate(total=Count('id'))
+            )
+            for row in rows:
+                counts[row['category_id']] = counts.get(row['category_id'], 0) + row['total']
+                if row['category__parent_id'] is not None and row['category__parent_id'] != row['category_id']:
+                    parent_id = row['category__parent_id']
+                    counts[parent_id] = counts.get(parent_id, 0) + row['total']
+
+            children = {}
+            for category in Category.objects.filter(is_active=True, parent__isnull=False):
+                children.setdefault(category.parent_id, []).append(category)
+            self.context['category_tree'] = (counts, children)
+        return self.context['category_tree']
+
     def get_total_products(self, obj) -> int:
         """
         Count active products in this category and child categories
         """
-        from django.db.models import Q
-        
-        return Product.objects.filter(
-            is_active=True
-        ).filter(
-            Q(category=obj) | Q(category__parent=obj)
-        ).filter(
-            category__is_active=True
-        ).distinct().count()
+        counts, _ = self.category_tree()
+        return counts.get(obj.id, 0)
         
     def get_children(self, obj) -> list[dict]:
         # This returns the subcategories (Speaker, DSLR, etc.)
-        children = obj.children.filter(is_active=True)[:4] # Limit to 4 for UI consistency
+        _, children = self.category_tree()
+        children = children.get(obj.id, [])[:4] # Limit to 4 for UI consistency
         return CategorySerializer(children, many=True, context=self.context).data
 
     # def get_picture(self, obj):
@@ -72,19 +96,28 @@ class BrandSerializer(serializers.ModelSerializer):
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    renditions = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image', 'alt_text', 'is_primary', 'order']
+        fields = ['id', 'image', 'alt_text', 'is_primary', 'order', 'renditions']
+
+    def get_renditions(self, obj) -> dict | None:
+        return build_srcset(obj, self.context.get('request'))
         
     
 
 class VariantAttributeValueSerializer(serializers.ModelSerializer):
     attribute_name = serializers.CharField(source='attribute.name', read_only=True)
     attribute_display_name = serializers.CharField(source='attribute.display_name', read_only=True)
+    renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = VariantAttributeValue
-        fields = ['id', 'attribute_name', 'attribute_display_name', 'value', 'color_code', 'image']
+        fields = ['id', 'attribute_name', 'attribute_display_name', 'value', 'color_code', 'image', 'renditions']
+
+    def get_renditions(self, obj) -> dict | None:
+        return build_srcset(obj, self.context.get('request'))
 
 
 # class ProductVariantAttributeValueSerializer(serializers.ModelSerializer):
@@ -127,11 +160,57 @@ class ProductVariantDetailSerializer(serializers.ModelSerializer):
         ]
 
 
+def primary_image_prefetch(prefix=''):
+    """Prefetch the primary image into obj.primary_images, for ProductListSerializer"""
+    return Prefetch(f'{prefix}images', queryset=ProductImage.objects.filter(is_primary=True), to_attr='primary_images')
+
+
+def product_list_prefetches(prefix=''):
+    """
+    prefetch_related() lookups ProductListSerializer reads
+
+    Args:
+        prefix: Path to the product from the queryset's model, e.g. 'product__'
+
+    Returns:
+        list of lookups
+    """
+    return [
+        f'{prefix}variants__variant_attributes__attribute',
+        f'{prefix}variants__images',
+        f'{prefix}promotions',
+        primary_image_prefetch(prefix),
+    ]
+
+
+def product_detail_prefetches(prefix=''):
+    """
+    prefetch_related() lookups ProductDetailSerializer reads
+
+    Args:
+        prefix: Path to the product from the queryset's model, e.g. 'product__'
+
+    Returns:
+        list of lookups
+    """
+    combos = ProductCombo.objects.filter(is_active=True).prefetch_related(
+        'items__product__category',
+        'items__product__brand',
+        *product_list_prefetches('items__product__'),
+    )
+    return [
+        f'{prefix}images',
+        *product_list_prefetches(prefix),
+        Prefetch(f'{prefix}combos', queryset=combos, to_attr='active_combos'),
+    ]
+
+
 class ProductListSerializer(serializers.ModelSerializer):
     """Simplified product serializer for list view"""
     category = CategorySerializer(read_only=True)
     brand = BrandSerializer(read_only=True)
     primary_image = serializers.SerializerMethodField()
+    primary_image_renditions = serializers.SerializerMethodField()
     default_variant = serializers.SerializerMethodField()
     variants = ProductVariantListSerializer(many=True, read_only=True)
     price_range = serializers.SerializerMethodField()
@@ -150,7 +229,7 @@ class ProductListSerializer(serializers.ModelSerializer):
             'base_price', 'stock_quantity', 'sold_quantity', 'low_stock_threshold',
             'is_in_stock', 'is_low_stock',
             'is_active', 'is_featured', 
-            'primary_image', 'default_variant', 'variants', 'price_range',
+            'primary_image', 'primary_image_renditions', 'default_variant', 'variants', 'price_range',
             'free_shipping', 'free_gift', 'is_new', 'discount','available_attributes',
         ]
     
@@ -163,6 +242,12 @@ class ProductListSerializer(serializers.ModelSerializer):
     def get_is_new(self, obj) -> bool:
         return obj.is_new
     
+    # These read the relations loaded by product_list_prefetches() and filter
+    # them in Python, so a listed product costs no queries of its own
+
+    def active_variants(self, obj):
+        return [variant for variant in obj.variants.all() if variant.is_active]
+
     def get_available_attributes(self, obj) -> dict[str, list[str]]:
         """
         Returns a dictionary of available attributes and their values
@@ -174,7 +259,7 @@ class ProductListSerializer(serializers.ModelSerializer):
         }
         """
         attributes = {}
-        for variant in obj.variants.filter(is_active=True):
+        for variant in self.active_variants(obj):
             for attr_val in variant.variant_attributes.all():
                 attr_name = attr_val.attribute.name
                 if attr_name not in attributes:
@@ -190,7 +275,7 @@ class ProductListSerializer(serializers.ModelSerializer):
         - Compare variant price with product base_price
         - Returns dict: {'amount': ..., 'percentage': ...} or None
         """
-        variant = obj.variants.filter(is_default=True, is_active=True).first()
+        variant = next((variant for variant in self.active_variants(obj) if variant.is_default), None)
         if variant and obj.base_price and variant.price < obj.base_price:
             discount_amount = obj.base_price - variant.price
             discount_percentage = (discount_amount / obj.base_price) * 100
@@ -200,49 +285,52 @@ class ProductListSerializer(serializers.ModelSerializer):
             }
         return None
     
+    def resolve_primary_image(self, obj):
+        """Read from primary_image_prefetch() when the queryset used it, else one query"""
+        if hasattr(obj, 'primary_images'):
+            return obj.primary_images[0] if obj.primary_images else None
+        return obj.images.filter(is_primary=True).first()
+
     def get_primary_image(self, obj) -> str | None:
-        primary = obj.images.filter(is_primary=True).first()
+        primary = self.resolve_primary_image(obj)
         if primary:
             request = self.context.get('request')
             if request:
                 return request.build_absolute_uri(primary.image.url)
             return primary.image.url
         return None
+
+    def get_primary_image_renditions(self, obj) -> dict | None:
+        primary = self.resolve_primary_image(obj)
+        if primary:
+            return build_srcset(primary, self.context.get('request'))
+        return None
     
     def get_default_variant(self, obj) -> dict | None:
-        default = obj.variants.filter(is_default=True).first()
+        default = next((variant for variant in obj.variants.all() if variant.is_default), None)
         if default:
             return ProductVariantListSerializer(default, context=self.context).data
         return None
     
     def get_price_range(self, obj) -> dict | None:
-        variants = obj.variants.filter(is_active=True)
-        if variants.exists():
-            prices = variants.values_list('price', flat=True)
-            min_price = min(prices)
-            max_price = max(prices)
-            if min_price == max_price:
-                return {'min': float(min_price), 'max': float(max_price), 'same': True}
-            return {'min': float(min_price), 'max': float(max_price), 'same': False}
-        return None
+        min_price, max_price = obj.min_variant_price, obj.max_variant_price
+        if min_price is None:
+            return None
+        return {'min': float(min_price), 'max': float(max_price), 'same': min_price == max_price}
     
-    def get_free_shipping(self, obj) -> bool:
+    def has_live_promotion(self, obj, promotion_type):
         now = timezone.now()
-        return obj.promotions.filter(
-            promotion_type='free_shipping',
-            is_active=True,
-            start_date__lte=now,
-            end_date__gte=now
-        ).exists()
+        return any(
+            promotion.promotion_type == promotion_type and promotion.is_active
+            and promotion.start_date <= now <= promotion.end_date
+            for promotion in obj.promotions.all()
+        )
+
+    def get_free_shipping(self, obj) -> bool:
+        return self.has_live_promotion(obj, 'free_shipping')
     
     def get_free_gift(self, obj) -> bool:
-        now = timezone.now()
-        return obj.promotions.filter(
-            promotion_type='free_gift',
-            is_active=True,
-            start_date__lte=now,
-            end_date__gte=now
-        ).exists()
+        return self.has_live_promotion(obj, 'free_gift')
 
 
 class ProductDetailSerializer(serializers.ModelSerializer):
@@ -277,11 +365,25 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     def get_is_low_stock(self, obj) -> bool:
         return 0 < obj.stock_quantity <= obj.low_stock_threshold
     
+    # Like ProductListSerializer, these filter the relations loaded by
+    # product_detail_prefetches() in Python instead of querying again
+
+    def active_variants(self, obj):
+        return [variant for variant in obj.variants.all() if variant.is_active]
+
+    def live_promotions(self, obj, promotion_type):
+        now = timezone.now()
+        return [
+            promotion for promotion in obj.promotions.all()
+            if promotion.promotion_type == promotion_type and promotion.is_active
+            and promotion.start_date <= now <= promotion.end_date
+        ]
+
     def get_available_attributes(self, obj) -> list[dict]:
         """Get all unique attributes available for this product's variants"""
         attributes = {}
         
-        for variant in obj.variants.filter(is_active=True):
+        for variant in self.active_variants(obj):
             for attr_value in variant.variant_attributes.all():
                 attr_name = attr_value.attribute.name
                 
@@ -313,22 +415,10 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         return list(attributes.values())
 
     def get_free_shipping(self, obj) -> bool:
-        now = timezone.now()
-        return obj.promotions.filter(
-            promotion_type='free_shipping',
-            is_active=True,
-            start_date__lte=now,
-            end_date__gte=now
-        ).exists()
+        return bool(self.live_promotions(obj, 'free_shipping'))
     
     def get_free_gift(self, obj) -> bool:
-        now = timezone.now()
-        return obj.promotions.filter(
-            promotion_type='free_gift',
-            is_active=True,
-            start_date__lte=now,
-            end_date__gte=now
-        ).exists()
+        return bool(self.live_promotions(obj, 'free_gift'))
     
     def get_deals(self, obj) -> list[dict]:
         """Get active deals for this product"""
@@ -348,23 +438,10 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         return ProductComboForProductDetailSerializer(combos, many=True, context=self.context).data
         
     def _get_promotion_info(self, obj, promotion_type: str) -> dict | None:
-        from django.utils.timezone import now
-        from django.utils.timesince import timesince
-
-        current_time = now()
-        promo = (
-            obj.promotions
-            .filter(
-                promotion_type=promotion_type,
-                is_active=True,
-                start_date__lte=current_time,
-                end_date__gte=current_time
-            )
-            .order_by("end_date")
-            .first()
-        )
-        if not promo:
+        promotions = self.live_promotions(obj, promotion_type)
+        if not promotions:
             return None
+        promo = min(promotions, key=lambda promotion: promotion.end_date)
         return {
             "title": promo.title,
             "description": promo.description,
@@ -400,7 +477,11 @@ class DealListSerializer(serializers.ModelSerializer):
         ]
     
     def get_primary_image(self, obj) -> dict | None:
-        image = obj.product.images.filter(is_primary=True).first()
+        if hasattr(obj.product, 'primary_images'):
+            # Loaded by primary_image_prefetch('product__')
+            image = obj.product.primary_images[0] if obj.product.primary_images else None
+        else:
+            image = obj.product.images.filter(is_primary=True).first()
         
         if image:
             return ProductImageSerializer(image, context=self.context).data
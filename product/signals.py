@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import Signal, receiver
+from reviews.models import ProductReview
+from .attribute_index import invalidate_attribute_index
+from .images import schedule_renditions
+from .models import Product, ProductImage, ProductVariant, VariantAttribute, VariantAttributeValue
+
+
+# Sent with changes=[(variant_id, old_price, new_price), ...] after variant prices change.
+# Bulk writers that bypass ProductVariant.save() (e.g. import_catalog) send it themselves.
+variant_prices_changed = Signal()
+
+# Sent with variant_ids=[...] when variants go from out of stock to in stock.
+variants_restocked = Signal()
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=VariantAttributeValue)
+@receiver(post_save, sender=ProductReview)
+def queue_image_renditions(sender, instance, **kwargs):
+    """Generate responsive renditions off the request path when an image is uploaded or replaced"""
+    schedule_renditions(instance)
+
+
+@receiver(post_delete, sender=ProductVariant)
+@receiver(post_save, sender=VariantAttribute)
+@receiver(post_delete, sender=VariantAttribute)
+@receiver(post_save, sender=VariantAttributeValue)
+@receiver(post_delete, sender=VariantAttributeValue)
+@receiver(m2m_changed, sender=ProductVariant.variant_attributes.through)
+def refresh_attribute_index(sender, **kwargs):
+    """Any change to variants or their attribute values makes the filter index stale"""
+    if kwargs.get('action', 'post_').startswith('pre_'):
+        return
+    transaction.on_commit(invalidate_attribute_index)
+
+
+@receiver(post_save, sender=ProductVariant)
+def refresh_attribute_index_for_variant(sender, instance, created, update_fields=None, **kwargs):
+    # Stock-only saves (orders, imports) don't change which products carry a value
+    if created or update_fields is None or {'is_active', 'product'} & set(update_fields):
+        transaction.on_commit(invalidate_attribute_index)
+
+
+@receiver(post_delete, sender=ProductVariant)
+def refresh_price_range_on_variant_delete(sender, instance, **kwargs):
+    Product.refresh_variant_prices([instance.product_id])
+
+
+@receiver(post_save, sender=ProductVariant)
+def detect_variant_transitions(sender, instance, created, **kwargs):
+    """Send the batch signals for price changes and out-of-stock -> in-stock transitions"""
+    loaded = getattr(instance, '_loaded_values', {})
+    if not created:
+        old_price = loaded.get('price')
+        if old_price is not None and old_price != instance.price:
+            variant_prices_changed.send(sender=ProductVariant, changes=[(instance.pk, old_price, instance.price)])
+        old_stock = loaded.get('stock_quantity')
+        if old_stock is not None and old_stock <= 0 < instance.stock_quantity:
+            variants_restocked.send(sender=ProductVariant, variant_ids=[instance.pk])
+    # A second save() of the same instance compares against what was just written
+    instance._loaded_values = {**loaded, 'price': instance.price, 'stock_quantity': instance.stock_quantity}
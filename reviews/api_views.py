@@ -4,19 +4,33 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from product.models import Product
-from django.db.models import Avg, Count
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
 
 from .models import ProductReview
+from .pagination import DEFAULT_REVIEW_SORT, REVIEW_SORTS, ReviewCursorPagination, get_review_pagination_class
 from .serializers import ProductReviewSerializer
+from .services import build_review_summary, get_review_summary
 
 @extend_schema(tags=["Reviews"])
 class ProductReviewViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Product Reviews
+
+    The list accepts ?sort=newest|highest|lowest|with_images. It is cursor-paginated,
+    except highest/lowest, which page with ?page= (see reviews.pagination.RATING_SORTS).
+    The summary block (average, star counts, total) is cached per product.
     """
-    queryset = ProductReview.objects.all()
+    queryset = ProductReview.objects.select_related("user", "product")
     serializer_class = ProductReviewSerializer
+    pagination_class = ReviewCursorPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            sort = self.request.query_params.get("sort", DEFAULT_REVIEW_SORT)
+            self._paginator = get_review_pagination_class(sort)()
+        return self._paginator
 
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -29,40 +43,61 @@ class ProductReviewViewSet(viewsets.ModelViewSet):
         product_id = self.request.query_params.get('product')
         if product_id:
             queryset = queryset.filter(product_id=product_id, is_approved=True)
+        if self.action == 'list':
+            product_slug = self.request.query_params.get("product_slug")
+            if product_slug:
+                queryset = queryset.filter(product__slug=product_slug, is_approved=True)
+            if self.request.query_params.get("sort") == "with_images":
+                queryset = queryset.exclude(image="").exclude(image__isnull=True)
         return queryset
-    
-    def list(self, request, *args, **kwargs):
-        product_slug = request.query_params.get("product_slug")
 
-        queryset = self.get_queryset()
+    def get_summary(self):
+        """Cached summary for the requested product, or for all products when none is given"""
+        product_id = self.request.query_params.get("product")
+        product_slug = self.request.query_params.get("product_slug")
+        if not (product_id or product_slug):
+            return get_review_summary()
 
         if product_slug:
-            queryset = queryset.filter(product__slug=product_slug)
-
-        # ⭐ Average rating
-        average_rating = queryset.aggregate(
-            avg=Avg("rating")
-        )["avg"] or 0
-
-        # ⭐ Star counts (1–5)
-        star_counts_raw = (
-            queryset
-            .values("rating")
-            .annotate(count=Count("id"))
-        )
-
-        # Ensure all stars exist (1–5)
-        star_counts = {str(i): 0 for i in range(1, 6)}
-        for item in star_counts_raw:
-            star_counts[str(item["rating"])] = item["count"]
+            product_id = Product.objects.filter(slug=product_slug).values_list("id", flat=True).first()
+        elif not product_id.isdigit():
+            product_id = None
+
+        if product_id is None:
+            return build_review_summary(Product.objects.none())
+        return get_review_summary(int(product_id))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name="product", type=OpenApiTypes.INT, description="Product ID"),
+            OpenApiParameter(name="product_slug", type=OpenApiTypes.STR, description="Product slug"),
+            OpenApiParameter(
+                name="sort",
+                type=OpenApiTypes.STR,
+                enum=list(REVIEW_SORTS),
+                description="Sort mode (default: newest)",
+            ),
+            OpenApiParameter(name="cursor", type=OpenApiTypes.STR, description="Pagination cursor"),
+            OpenApiParameter(name="page", type=OpenApiTypes.INT, description="Page number (highest/lowest sorts)"),
+            OpenApiParameter(name="page_size", type=OpenApiTypes.INT, description="Reviews per page (max 50)"),
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        sort = request.query_params.get("sort", DEFAULT_REVIEW_SORT)
+        if sort not in REVIEW_SORTS:
+            return Response(
+                {"error": f"Invalid sort. Choose from: {', '.join(REVIEW_SORTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Serialize reviews
-        serializer = self.get_serializer(queryset, many=True)
+        summary = self.get_summary()
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(page, many=True)
 
         return Response({
-            "average_rating": round(average_rating, 1),
-            "total_reviews": queryset.count(),
-            "star_counts": star_counts,
+            **summary,
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
             "results": serializer.data,
         })
     
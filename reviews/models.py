@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from product.models import ImageRenditionFields, Product
+from .services import invalidate_review_summary
 
-class ProductReview(models.Model):
+class ProductReview(ImageRenditionFields):
     """Customer reviews for products"""
     product = models.ForeignKey(
         'product.product', 
@@ -32,19 +34,60 @@ class ProductReview(models.Model):
         ordering = ['-created_at']
         unique_together = ('product', 'user')
         
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update product rating whenever a review is created or updated
-        if self.product:
-            self.product.update_rating()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def stored_contribution(self):
+        """(product_id, rating) this review currently counts for in the database, or None"""
+        if self._state.adding:
+            return None
+        loaded = getattr(self, '_loaded_values', {})
+        if not {'product_id', 'rating', 'is_approved'} <= loaded.keys():
+            # Deferred fields or an unsaved copy: read the stored row
+            loaded = ProductReview.objects.filter(pk=self.pk).values(
+                'product_id', 'rating', 'is_approved'
+            ).first() or {}
+        if loaded.get('is_approved'):
+            return loaded['product_id'], loaded['rating']
+        return None
 
-    def delete(self, *args, **kwargs):
-        product = self.product
-        super().delete(*args, **kwargs)
-        if product:
-            product.update_rating()
+    def save(self, *args, **kwargs):
+        # Update the product's rating histogram by the difference only
+        with transaction.atomic():
+            before = self.stored_contribution()
+            super().save(*args, **kwargs)
+            after = (self.product_id, self.rating) if self.is_approved else None
+            apply_contribution_change(before, after)
+        self._loaded_values = {
+            'product_id': self.product_id,
+            'rating': self.rating,
+            'is_approved': self.is_approved,
+        }
 
     def __str__(self):
         if self.title:
             return f"{self.product.name} - {self.title}"
         return f"{self.product.name} - {self.rating} Stars"
+
+
+def apply_contribution_change(before, after):
+    """
+    Apply a review's change in histogram contribution to the affected product(s)
+
+    Args:
+        before: (product_id, rating) previously counted, or None
+        after: (product_id, rating) now counted, or None
+    """
+    if before == after:
+        return
+    invalidate_review_summary(*{contribution[0] for contribution in (before, after) if contribution})
+    if before and after and before[0] == after[0]:
+        Product.apply_rating_delta(after[0], added=after[1], removed=before[1])
+        return
+    if before:
+        Product.apply_rating_delta(before[0], removed=before[1])
+    if after:
+        Product.apply_rating_delta(after[0], added=after[1])
@@ -0,0 +1,45 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+# Sort modes accepted by ?sort= on the review list. The trailing id keeps the
+# ordering total, which cursor pagination needs to page without duplicates.
+REVIEW_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'highest': ('-rating', '-created_at', '-id'),
+    'lowest': ('rating', '-created_at', '-id'),
+    'with_images': ('-created_at', '-id'),
+}
+DEFAULT_REVIEW_SORT = 'newest'
+
+# CursorPagination positions on the first ordering field only and walks ties
+# by offset, which stops working past offset_cutoff. rating has five values
+# shared by every review, so these sorts page by page number instead.
+RATING_SORTS = {'highest', 'lowest'}
+
+
+def get_review_ordering(request):
+    return REVIEW_SORTS.get(request.query_params.get('sort', DEFAULT_REVIEW_SORT), REVIEW_SORTS[DEFAULT_REVIEW_SORT])
+
+
+class ReviewCursorPagination(CursorPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    ordering = REVIEW_SORTS[DEFAULT_REVIEW_SORT]
+
+    def get_ordering(self, request, queryset, view):
+        return get_review_ordering(request)
+
+
+class ReviewPageNumberPagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return super().paginate_queryset(queryset.order_by(*get_review_ordering(request)), request, view)
+
+
+def get_review_pagination_class(sort):
+    """Cursor pagination, except for the rating sorts (see RATING_SORTS)"""
+    return ReviewPageNumberPagination if sort in RATING_SORTS else ReviewCursorPagination
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from product.images import build_srcset
 from .models import ProductReview
 from django.contrib.auth import get_user_model
 
@@ -11,6 +12,7 @@ class ProductReviewSerializer(serializers.ModelSerializer):
         source="product.slug",
         read_only=True
     )
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductReview
@@ -23,6 +25,7 @@ class ProductReviewSerializer(serializers.ModelSerializer):
             "title",
             "comment",
             "image",
+            "renditions",
             "is_approved",
             "created_at",
             "updated_at",
@@ -37,6 +40,9 @@ class ProductReviewSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    def get_renditions(self, obj) -> dict | None:
+        return build_srcset(obj, self.context.get("request"))
+
     def create(self, validated_data):
         request = self.context.get("request")
         if request and request.user.is_authenticated:
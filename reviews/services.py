@@ -0,0 +1,68 @@
+"""
+Review services - Cached per-product review summary
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+
+from mobilepoint.caching import is_shared_cache
+from product.models import Product
+
+
+SUMMARY_CACHE_TIMEOUT = 60 * 60
+ALL_PRODUCTS = 'all'
+
+
+def summary_cache_key(product_id):
+    return f'reviews:summary:{product_id}'
+
+
+def build_review_summary(products):
+    """
+    Summarize approved reviews from the products' denormalized rating histogram
+
+    Args:
+        products: Product queryset (one product, or all of them)
+
+    Returns:
+        dict with average_rating, total_reviews and star_counts
+    """
+    totals = products.aggregate(
+        total=Sum('review_count'),
+        rating_sum=Sum('rating_sum'),
+        **{field: Sum(field) for field in Product.RATING_FIELDS}
+    )
+    total_reviews = totals.pop('total') or 0
+    rating_sum = totals.pop('rating_sum') or 0
+    return {
+        'average_rating': round(rating_sum / total_reviews, 1) if total_reviews else 0,
+        'total_reviews': total_reviews,
+        'star_counts': {field.split('_')[1]: count or 0 for field, count in totals.items()},
+    }
+
+
+def get_review_summary(product_id=None):
+    """
+    Cached review summary for one product, or for the whole catalog when product_id is None
+
+    Only cached on a cache shared by all workers (see mobilepoint.caching), since
+    invalidate_review_summary() runs in the worker that saved the review.
+    """
+    products = Product.objects.all()
+    if product_id:
+        products = products.filter(pk=product_id)
+    if not is_shared_cache():
+        return build_review_summary(products)
+
+    key = summary_cache_key(product_id or ALL_PRODUCTS)
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_review_summary(products)
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_review_summary(*product_ids):
+    """Drop cached summaries once the surrounding transaction commits"""
+    keys = [summary_cache_key(pk) for pk in product_ids if pk] + [summary_cache_key(ALL_PRODUCTS)]
+    transaction.on_commit(lambda: cache.delete_many(keys))
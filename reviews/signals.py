@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import ProductReview, apply_contribution_change
+
+
+@receiver(post_delete, sender=ProductReview)
+def remove_review_from_histogram(sender, instance, **kwargs):
+    """Runs for instance.delete() and queryset.delete() alike, so admin bulk deletes stay in sync"""
+    # The row is gone by now, so rely on the values it was loaded with
+    stored = getattr(instance, '_loaded_values', None) or {
+        'product_id': instance.product_id,
+        'rating': instance.rating,
+        'is_approved': instance.is_approved,
+    }
+    if stored.get('is_approved'):
+        apply_contribution_change((stored['product_id'], stored['rating']), None)
@@ -0,0 +1,23 @@
+#!/bin/bash
+# Run the periodic email jobs (the scheduler service in docker-compose.yml).
+# Jobs run one after another, so a slow pass never overlaps the next; a job
+# that fails is logged and tried again on the next pass.
+#   SCHEDULER_INTERVAL: seconds between passes (default: 300)
+
+INTERVAL=${SCHEDULER_INTERVAL:-300}
+JOBS=(
+    "send_price_drop_notifications"
+    "send_back_in_stock_alerts"
+    "send_newsletter --queued"
+)
+
+trap 'exit 0' TERM INT
+
+while true; do
+    for job in "${JOBS[@]}"; do
+        python manage.py $job || echo "Scheduled job failed: $job" >&2
+    done
+    # Waiting on a background sleep lets docker stop interrupt it
+    sleep "$INTERVAL" &
+    wait $!
+done
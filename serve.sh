@@ -0,0 +1,15 @@
+#!/bin/bash
+# Start the API server.
+#   SERVER_MODE=wsgi (default): gunicorn with sync workers
+#   SERVER_MODE=asgi: uvicorn workers; hot read endpoints use the async views
+set -e
+
+WORKERS=${WEB_CONCURRENCY:-2}
+BIND_PORT=${PORT:-8001}
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+    exec uvicorn mobilepoint.asgi:application --host 0.0.0.0 --port "$BIND_PORT" --workers "$WORKERS"
+else
+    # gunicorn.conf.py warms each worker up and logs its startup time
+    exec gunicorn mobilepoint.wsgi:application -c gunicorn.conf.py -w "$WORKERS" -b "0.0.0.0:$BIND_PORT"
+fi
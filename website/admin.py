@@ -136,7 +136,7 @@ class AdvertisementAdmin(admin.ModelAdmin):
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
-from .models import NewsletterSubscriber
+from .models import NewsletterCampaign, NewsletterSubscriber
 
 
 @admin.register(NewsletterSubscriber)
@@ -167,6 +167,25 @@ class NewsletterSubscriberAdmin(admin.ModelAdmin):
         )
 
 
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'sent_count', 'failed_count', 'last_subscriber_id', 'started_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject',)
+    readonly_fields = ('status', 'last_subscriber_id', 'sent_count', 'failed_count', 'created_at', 'started_at', 'finished_at')
+    actions = ['queue_campaigns', 'pause_campaigns']
+
+    @admin.action(description="Send (picked up by the scheduler's send_newsletter --queued)")
+    def queue_campaigns(self, request, queryset):
+        updated = queryset.filter(status__in=['draft', 'paused']).update(status='queued')
+        self.message_user(request, f'{updated} campaign(s) queued for sending.')
+
+    @admin.action(description="Pause sending (queue it again to resume)")
+    def pause_campaigns(self, request, queryset):
+        updated = queryset.filter(status__in=['queued', 'sending']).update(status='paused')
+        self.message_user(request, f'{updated} campaign(s) will pause at their next checkpoint.')
+
+
 from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
@@ -1,6 +1,7 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
@@ -13,6 +14,7 @@ from .models import (
     # Testimonial, FAQ, 
     NewsletterSubscriber, ContactMessage, SiteSettings , CuratedItem
 )
+from .home import SECTIONS, get_home_document
 from .serializers import (
     CarouselSerializer, AdvertisementSerializer,
     # BannerSerializer,
@@ -130,14 +132,6 @@ class AdvertisementViewSet(viewsets.ModelViewSet):
                 required=True,
                 description="Advertisement position key.",
             ),
-            OpenApiParameter(
-                name="device",
-                type=OpenApiTypes.STR,
-                location=OpenApiParameter.QUERY,
-                required=False,
-                enum=["desktop", "mobile"],
-                description="Target device filter.",
-            ),
         ],
         responses={200: AdvertisementSerializer(many=True)},
         tags=["Website"],
@@ -146,7 +140,6 @@ class AdvertisementViewSet(viewsets.ModelViewSet):
     def by_position(self, request):
         """Get ads by position"""
         position = request.query_params.get('position')
-        device = request.query_params.get('device', 'desktop')  # desktop or mobile
         
         if not position:
             return Response(
@@ -154,14 +147,9 @@ class AdvertisementViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # show_on_mobile / show_on_desktop were removed from the model; every ad shows on both
         ads = self.get_queryset().filter(position=position)
-        
-        # Filter by device
-        if device == 'mobile':
-            ads = ads.filter(show_on_mobile=True)
-        else:
-            ads = ads.filter(show_on_desktop=True)
-        
+
         # Only return valid ads
         valid_ads = [ad for ad in ads if ad.is_valid()]
         
@@ -486,5 +474,48 @@ class CuratedItemViewSet(viewsets.ReadOnlyModelViewSet):
         return (
             CuratedItem.objects
             .filter(is_active=True)
+            .select_related("product", "category")
             .order_by("position", "-created_at")
-        )
\ No newline at end of file
+        )
+
+
+class HomeView(APIView):
+    """
+    Homepage bundle: every storefront homepage section in one response
+
+    GET /api/home/
+    GET /api/home/?sections=carousels,featured_deals
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Homepage bundle",
+        description=(
+            "Carousels, advertisements, curated items, featured/popular categories, "
+            "featured deals, deal of the day, featured/new/best-selling products, "
+            "header/footer menus and site settings in one cached document."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="sections",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description=f"Comma-separated subset of sections: {', '.join(SECTIONS)}",
+            )
+        ],
+        responses={200: OpenApiTypes.OBJECT},
+        tags=["Website"],
+    )
+    def get(self, request):
+        names = None
+        sections = request.query_params.get('sections')
+        if sections:
+            names = [name.strip() for name in sections.split(',') if name.strip()]
+            unknown = [name for name in names if name not in SECTIONS]
+            if unknown:
+                return Response(
+                    {'error': f"Unknown sections: {', '.join(unknown)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        return Response(get_home_document(request, names))
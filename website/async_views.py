@@ -0,0 +1,20 @@
+"""
+Async website views - ASGI version of the homepage bundle
+"""
+from mobilepoint.async_api import api_response, prepare_request
+from .home import SECTIONS, aget_home_document
+
+
+async def home(request):
+    """GET /api/home/ - same payload and ?sections= handling as HomeView"""
+    error = await prepare_request(request)
+    if error:
+        return error
+    names = None
+    sections = request.GET.get('sections')
+    if sections:
+        names = [name.strip() for name in sections.split(',') if name.strip()]
+        unknown = [name for name in names if name not in SECTIONS]
+        if unknown:
+            return api_response({'error': f"Unknown sections: {', '.join(unknown)}"}, status=400)
+    return api_response(await aget_home_document(request, names))
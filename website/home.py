@@ -0,0 +1,248 @@
+"""
+Homepage bundle - Every storefront homepage section in one cached document
+
+Each section is cached on its own with its own TTL, so a busy section (deals)
+can expire quickly while slow-moving ones (site settings, categories) stay
+warm. On a request, all cached sections are read with a single get_many(),
+and any missing sections are built concurrently on a small thread pool.
+Model signals (website/signals.py) drop the affected sections on commit.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Sum
+from django.utils import timezone
+
+from menu.tree import get_location_menus
+from mobilepoint.async_api import run_sync
+from product.models import Category, Deal, Product
+from product.serializers import (
+    CategorySerializer, DealDetailSerializer, DealListSerializer, ProductListSerializer,
+    product_detail_prefetches, product_list_prefetches
+)
+from .models import Advertisement, Carousel, CuratedItem, SiteSettings
+from .serializers import (
+    AdvertisementSerializer, CarouselSerializer, CuratedItemSerializer, SiteSettingsSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+SECTION_LIMIT = 10
+NEW_PRODUCT_DAYS = 14
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'HOME_SECTION_WORKERS', 4),
+            thread_name_prefix='home-sections',
+        )
+    return _executor
+
+
+def _products():
+    # Same loading strategy as ProductViewSet.list, imported lazily to avoid a view import cycle
+    from product.api_views import ProductViewSet
+    return ProductViewSet.queryset.prefetch_related(*product_list_prefetches())
+
+
+def _live_deals():
+    now = timezone.now()
+    return Deal.objects.select_related('product').prefetch_related(
+        'product__brand', 'product__category', 'product__images'
+    ).filter(is_active=True, start_at__lte=now, end_at__gte=now)
+
+
+# --------------------------------------------------------------------------
+# Section builders - each returns JSON-ready data
+# --------------------------------------------------------------------------
+
+def build_carousels(context):
+    carousels = Carousel.objects.filter(is_active=True, position='home_main').prefetch_related('slides')
+    return CarouselSerializer(carousels, many=True, context=context).data
+
+
+def build_advertisements(context):
+    now = timezone.now()
+    ads = Advertisement.objects.filter(is_active=True, start_date__lte=now).exclude(end_date__lt=now)
+    grouped = {}
+    for ad in ads:
+        if ad.is_valid():
+            grouped.setdefault(ad.position, []).append(AdvertisementSerializer(ad, context=context).data)
+    return grouped
+
+
+def build_curated(context):
+    items = CuratedItem.objects.filter(is_active=True).order_by('position', '-created_at')
+    return CuratedItemSerializer(items, many=True, context=context).data
+
+
+def build_featured_categories(context):
+    categories = Category.objects.filter(is_active=True, is_featured=True)[:SECTION_LIMIT]
+    return CategorySerializer(categories, many=True, context=context).data
+
+
+def build_popular_categories(context):
+    categories = list(
+        Category.objects.filter(is_active=True)
+        .annotate(total_sold=Sum('products__variants__sold_quantity'))
+        .filter(total_sold__gt=0)
+        .order_by('-total_sold')[:SECTION_LIMIT]
+    )
+    if not categories:
+        # Same fallback as CategoryViewSet ?is_popular=true
+        categories = Category.objects.filter(is_active=True, is_featured=True)[:SECTION_LIMIT]
+    return CategorySerializer(categories, many=True, context=context).data
+
+
+def build_featured_deals(context):
+    deals = _live_deals().filter(is_featured=True).order_by('display_order', '-created_at')[:SECTION_LIMIT]
+    return DealListSerializer(deals, many=True, context=context).data
+
+
+def build_deal_of_the_day(context):
+    deals = _live_deals().prefetch_related(*product_detail_prefetches('product__'))
+    deal = deals.filter(deal_type='daily', is_featured=True).order_by('display_order', '-created_at').first()
+    return DealDetailSerializer(deal, context=context).data if deal else None
+
+
+def build_featured_products(context):
+    products = _products().filter(is_featured=True).order_by('-created_at')[:SECTION_LIMIT]
+    return ProductListSerializer(products, many=True, context=context).data
+
+
+def build_new_products(context):
+    since = timezone.now() - timedelta(days=NEW_PRODUCT_DAYS)
+    products = _products().filter(created_at__gte=since).order_by('-created_at')[:SECTION_LIMIT]
+    return ProductListSerializer(products, many=True, context=context).data
+
+
+def build_best_sellers(context):
+    products = (
+        _products()
+        .annotate(total_sold=Sum('variants__sold_quantity'))
+        .order_by('-total_sold')[:SECTION_LIMIT]
+    )
+    return ProductListSerializer(products, many=True, context=context).data
+
+
+def build_menus(context):
+    # Menu trees have their own per-location cache and invalidation
+    return {
+        'header': get_location_menus('header'),
+        'footer': get_location_menus('footer'),
+    }
+
+
+def build_site_settings(context):
+    site_settings, _ = SiteSettings.objects.get_or_create(id=1)
+    return SiteSettingsSerializer(site_settings, context=context).data
+
+
+# name: (builder, TTL in seconds)
+SECTIONS = {
+    'site_settings': (build_site_settings, 60 * 60),
+    'menus': (build_menus, 60 * 60),
+    'carousels': (build_carousels, 15 * 60),
+    'advertisements': (build_advertisements, 5 * 60),
+    'curated': (build_curated, 15 * 60),
+    'featured_categories': (build_featured_categories, 30 * 60),
+    'popular_categories': (build_popular_categories, 30 * 60),
+    'deal_of_the_day': (build_deal_of_the_day, 60),
+    'featured_deals': (build_featured_deals, 60),
+    'featured_products': (build_featured_products, 10 * 60),
+    'new_products': (build_new_products, 10 * 60),
+    'best_sellers': (build_best_sellers, 30 * 60),
+}
+
+
+def section_cache_key(name):
+    return f'home:section:{name}'
+
+
+def invalidate_sections(*names):
+    cache.delete_many([section_cache_key(name) for name in names])
+
+
+def _build_in_worker(name, context):
+    try:
+        return SECTIONS[name][0](context)
+    finally:
+        connections.close_all()
+
+
+def get_home_document(request, names=None):
+    """
+    Assemble the homepage document
+
+    Args:
+        request: Current request, used for absolute media URLs
+        names: Optional subset of section names (default: all)
+
+    Returns:
+        dict of section name -> data (None for a section that failed to build)
+    """
+    names = [name for name in (names or SECTIONS) if name in SECTIONS]
+    keys = {name: section_cache_key(name) for name in names}
+    cached = cache.get_many(keys.values())
+
+    document = {}
+    missing = []
+    for name in names:
+        if keys[name] in cached:
+            document[name] = cached[keys[name]]
+        else:
+            missing.append(name)
+
+    if missing:
+        document.update(build_sections(request, missing))
+
+    return {name: document[name] for name in names}
+
+
+def build_sections(request, names):
+    """
+    Build sections concurrently on the section pool and cache the ones that succeed
+
+    Returns:
+        dict of section name -> data (None for a section that failed to build)
+    """
+    context = {'request': request}
+    futures = {name: get_executor().submit(_build_in_worker, name, context) for name in names}
+    built = {}
+    for name, future in futures.items():
+        try:
+            built[name] = future.result()
+        except Exception:
+            # One broken section should not take the whole homepage down
+            logger.exception('Homepage section %s failed', name)
+            built[name] = None
+        else:
+            cache.set(section_cache_key(name), built[name], SECTIONS[name][1])
+    return built
+
+
+async def aget_home_document(request, names=None):
+    """
+    Async get_home_document() for the ASGI view
+
+    Cached sections are read with aget_many() without leaving the event loop;
+    missing ones are built by build_sections(), in one run_sync() call.
+    """
+    names = [name for name in (names or SECTIONS) if name in SECTIONS]
+    keys = {name: section_cache_key(name) for name in names}
+    cached = await cache.aget_many(keys.values())
+
+    document = {name: cached[keys[name]] for name in names if keys[name] in cached}
+    missing = [name for name in names if name not in document]
+    if missing:
+        document.update(await run_sync(build_sections, request, missing))
+
+    return {name: document[name] for name in names}
@@ -0,0 +1,42 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mobilepoint.openapi import OPENAPI_SCHEMA_FILE, generate_schema, read_schema_file
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI schema and write it to OPENAPI_SCHEMA_FILE, which /api/schema/ serves. '
+        'With --check, fail instead if the committed file is missing or out of date.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Exit with an error if the committed schema is stale')
+        parser.add_argument('--output', default=OPENAPI_SCHEMA_FILE, help='File to write (default: OPENAPI_SCHEMA_FILE)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        content = generate_schema()
+        elapsed = time.monotonic() - started
+
+        if options['check']:
+            try:
+                committed = read_schema_file()
+            except FileNotFoundError:
+                raise CommandError(f'{OPENAPI_SCHEMA_FILE} is missing; run "manage.py build_openapi_schema"')
+            if committed != content:
+                raise CommandError(
+                    f'{OPENAPI_SCHEMA_FILE} is out of date with the API code; '
+                    'run "manage.py build_openapi_schema" and commit the result'
+                )
+            self.stdout.write(self.style.SUCCESS(f'{OPENAPI_SCHEMA_FILE} is up to date'))
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(options['output'])), exist_ok=True)
+        with open(options['output'], 'wb') as f:
+            f.write(content)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {options['output']} ({len(content) / 1024:.0f} KiB, generated in {elapsed:.1f}s)"
+        ))
@@ -0,0 +1,68 @@
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from website.models import NewsletterCampaign
+from website.newsletter import CampaignPaused, send_campaign
+
+
+class Command(BaseCommand):
+    help = (
+        'Send a newsletter campaign to all active subscribers, resuming from its checkpoint if it was interrupted. '
+        'With --queued, send every campaign queued from the admin instead (run periodically by the scheduler).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int, nargs='?', help='NewsletterCampaign id')
+        parser.add_argument('--queued', action='store_true', help='Send every queued campaign, oldest first')
+        parser.add_argument('--workers', type=int, default=None, help='Parallel sender threads, one connection each (default: NEWSLETTER_WORKERS)')
+        parser.add_argument('--batch-size', type=int, default=None, help='Subscribers per batch / checkpoint (default: NEWSLETTER_BATCH_SIZE)')
+        parser.add_argument('--rate', type=float, default=None, help='Max messages per second across all workers, 0 = unlimited (default: NEWSLETTER_RATE)')
+        parser.add_argument('--restart', action='store_true', help='Discard the checkpoint and send to everyone again')
+
+    def handle(self, *args, **options):
+        if options['queued'] == (options['campaign_id'] is not None):
+            raise CommandError('Pass either a campaign id or --queued')
+        if options['queued'] and options['restart']:
+            raise CommandError('--restart needs a campaign id')
+        if options['queued']:
+            for campaign in NewsletterCampaign.objects.filter(status='queued').order_by('created_at'):
+                self.send(campaign, options)
+            return
+
+        try:
+            campaign = NewsletterCampaign.objects.get(pk=options['campaign_id'])
+        except NewsletterCampaign.DoesNotExist:
+            raise CommandError(f"Campaign {options['campaign_id']} does not exist")
+        self.send(campaign, options)
+
+    def send(self, campaign, options):
+        if options['restart']:
+            campaign.last_subscriber_id = campaign.sent_count = campaign.failed_count = 0
+            campaign.started_at = campaign.finished_at = None
+            campaign.save(update_fields=['last_subscriber_id', 'sent_count', 'failed_count', 'started_at', 'finished_at'])
+        elif campaign.status == 'sent':
+            raise CommandError(f'Campaign {campaign.pk} was already sent; use --restart to send it again')
+        elif campaign.last_subscriber_id:
+            self.stdout.write(f'Resuming after subscriber #{campaign.last_subscriber_id}')
+
+        started = time.monotonic()
+        try:
+            campaign = send_campaign(
+                campaign,
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                rate=options['rate'],
+                stdout=self.stdout.write,
+            )
+        except CampaignPaused:
+            self.stdout.write(self.style.WARNING(f'Campaign {campaign.pk} was paused; run again to resume'))
+            return
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Campaign {campaign.pk}: {campaign.sent_count} sent, {campaign.failed_count} failed in {elapsed:.1f}s'
+        ))
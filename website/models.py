@@ -165,6 +165,38 @@ class NewsletterSubscriber(models.Model):
         return self.email
 
 
+class NewsletterCampaign(models.Model):
+    STATUS_CHOICES = [
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('sending', 'Sending'),
+        ('paused', 'Paused'),
+        ('sent', 'Sent'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body_text = models.TextField(help_text='Django template. Context: campaign, segment ("customers" or "subscribers"), site_settings, name, email, unsubscribe_url')
+    body_html = models.TextField(blank=True, help_text='Optional HTML version, same context as the text body')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
+
+    # Checkpoint: every active subscriber with id <= last_subscriber_id has been handled
+    last_subscriber_id = models.PositiveBigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Newsletter Campaign"
+        verbose_name_plural = "Newsletter Campaigns"
+
+    def __str__(self):
+        return self.subject
+
+
 class ContactMessage(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField()
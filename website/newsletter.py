@@ -0,0 +1,301 @@
+"""
+Newsletter campaigns - Bulk send to active NewsletterSubscriber rows
+
+Subscribers are streamed in id order with .iterator(), so memory stays flat no
+matter how large the list is. Each subscriber falls into a segment
+("customers" if the email belongs to a registered user, otherwise
+"subscribers"). The campaign template is rendered once per segment, and the
+per-recipient values (name, email, unsubscribe link) are filled in with plain
+string replacement. The unsubscribe link carries the email signed with
+django.core.signing and points at website.views.newsletter_unsubscribe, so it
+needs an absolute SITE_URL.
+
+Batches are sent from a thread pool. Each worker thread keeps one open
+connection from the configured EMAIL_BACKEND and reuses it for every batch it
+handles. An optional shared rate limit caps messages per second across all
+workers.
+
+Progress is checkpointed in NewsletterCampaign.last_subscriber_id. The
+checkpoint only moves past a batch once that batch and every batch before it
+has finished, so resuming an interrupted or paused campaign skips everyone
+already handled. Only batches that were still in flight can be sent twice.
+
+Campaigns queued from the admin are picked up by `send_newsletter --queued`,
+which the scheduler service runs periodically.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Exists, F, OuterRef
+from django.template import Context, Template
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import NewsletterCampaign, NewsletterSubscriber, SiteSettings
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_WORKERS = getattr(settings, 'NEWSLETTER_WORKERS', 4)
+NEWSLETTER_BATCH_SIZE = getattr(settings, 'NEWSLETTER_BATCH_SIZE', 100)
+# Messages per second across all workers; 0 disables throttling
+NEWSLETTER_RATE = getattr(settings, 'NEWSLETTER_RATE', 0)
+
+# Rendered into the template once per segment, then replaced per recipient
+NAME_MARKER = '\x00name\x00'
+EMAIL_MARKER = '\x00email\x00'
+UNSUBSCRIBE_MARKER = '\x00unsubscribe\x00'
+UNSUBSCRIBE_SALT = 'website.newsletter.unsubscribe'
+
+
+class CampaignPaused(Exception):
+    pass
+
+
+class RateLimiter:
+    """Spaces out acquire() calls so no more than `rate` happen per second, across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class ConnectionPool:
+    """One email backend connection per worker thread, kept open for the whole send"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def get(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = get_connection()
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def discard(self):
+        """Drop the current thread's connection after an error; the next get() reconnects"""
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def close_all(self):
+        with self._lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+            self._connections = []
+
+
+def subscriber_rows(after_id=0):
+    """(id, email, name, is_customer) for active subscribers after the checkpoint, streamed in id order"""
+    from accounts.models import User
+
+    return (
+        NewsletterSubscriber.objects
+        .filter(is_active=True, id__gt=after_id)
+        .annotate(is_customer=Exists(User.objects.filter(email__iexact=OuterRef('email'))))
+        .order_by('id')
+        .values_list('id', 'email', 'name', 'is_customer')
+        .iterator(chunk_size=2000)
+    )
+
+
+def site_url():
+    """SITE_URL without its trailing slash; links in emails must be absolute"""
+    url = getattr(settings, 'SITE_URL', None) or ''
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise ImproperlyConfigured(f'SITE_URL must be an absolute http(s) URL to send newsletters, not {url!r}')
+    return url.rstrip('/')
+
+
+def unsubscribe_token(email):
+    return signing.dumps(email, salt=UNSUBSCRIBE_SALT)
+
+
+def unsubscribe_email(token):
+    """The email a token was issued for; raises signing.BadSignature if it was tampered with"""
+    return signing.loads(token, salt=UNSUBSCRIBE_SALT)
+
+
+def unsubscribe_url(email):
+    return site_url() + reverse('newsletter-unsubscribe', kwargs={'token': unsubscribe_token(email)})
+
+
+class CampaignRenderer:
+    """Renders the campaign once per segment and personalises the result per recipient"""
+
+    def __init__(self, campaign):
+        self.campaign = campaign
+        self.text_template = Template(campaign.body_text)
+        self.html_template = Template(campaign.body_html) if campaign.body_html else None
+        self.site_settings = SiteSettings.objects.filter(id=1).first()
+        self._rendered = {}
+
+    def render(self, segment):
+        if segment not in self._rendered:
+            values = {
+                'campaign': self.campaign,
+                'segment': segment,
+                'site_settings': self.site_settings,
+                'name': NAME_MARKER,
+                'email': EMAIL_MARKER,
+                'unsubscribe_url': UNSUBSCRIBE_MARKER,
+            }
+            self._rendered[segment] = (
+                self.text_template.render(Context(values, autoescape=False)),
+                self.html_template.render(Context(values)) if self.html_template else '',
+            )
+        return self._rendered[segment]
+
+    def message(self, email, name, segment, from_email):
+        text, html = self.render(segment)
+        values = {NAME_MARKER: name or '', EMAIL_MARKER: email, UNSUBSCRIBE_MARKER: unsubscribe_url(email)}
+        for marker, value in values.items():
+            text = text.replace(marker, value)
+            html = html.replace(marker, value)
+        message = EmailMultiAlternatives(
+            self.campaign.subject, text, from_email, [email],
+            headers={'List-Unsubscribe': f'<{values[UNSUBSCRIBE_MARKER]}>'},
+        )
+        if html:
+            message.attach_alternative(html, 'text/html')
+        return message
+
+
+def _send_batch(batch, renderer, pool, limiter, from_email):
+    """Worker task: send one batch over the thread's pooled connection; returns (sent, failed)"""
+    sent = failed = 0
+    for _, email, name, is_customer in batch:
+        limiter.acquire()
+        message = renderer.message(email, name, 'customers' if is_customer else 'subscribers', from_email)
+        message.connection = pool.get()
+        try:
+            message.send()
+        except Exception:
+            logger.exception('Newsletter delivery to %s failed', email)
+            pool.discard()
+            failed += 1
+        else:
+            sent += 1
+    return sent, failed
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def send_campaign(campaign, workers=None, batch_size=None, rate=None, stdout=None):
+    """
+    Send (or resume) a campaign to every active subscriber past its checkpoint
+
+    Args:
+        campaign: NewsletterCampaign instance
+        workers: Parallel sender threads, each with its own connection
+        batch_size: Subscribers per task / checkpoint step
+        rate: Messages per second across all workers (0 = unlimited)
+        stdout: Optional callable for progress lines
+
+    Returns:
+        NewsletterCampaign (refreshed)
+
+    Raises:
+        CampaignPaused: The campaign was paused (e.g. from the admin) while sending
+        ImproperlyConfigured: SITE_URL is not an absolute URL
+    """
+    site_url()  # fail before anything is sent
+    workers = workers or NEWSLETTER_WORKERS
+    batch_size = batch_size or NEWSLETTER_BATCH_SIZE
+    rate = NEWSLETTER_RATE if rate is None else rate
+    from_email = settings.EMAIL_HOST_USER or None
+
+    NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+        status='sending', started_at=campaign.started_at or timezone.now()
+    )
+    campaign.refresh_from_db()
+
+    renderer = CampaignRenderer(campaign)
+    limiter = RateLimiter(rate)
+    pool = ConnectionPool()
+    in_flight = deque()
+
+    def checkpoint(done_only):
+        """Fold finished batches at the head of the queue into the campaign checkpoint"""
+        last_id, sent, failed = None, 0, 0
+        while in_flight and (in_flight[0][1].done() or not done_only):
+            batch_last_id, future = in_flight.popleft()
+            batch_sent, batch_failed = future.result()
+            last_id, sent, failed = batch_last_id, sent + batch_sent, failed + batch_failed
+        if last_id is None:
+            return
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+            last_subscriber_id=last_id,
+            sent_count=F('sent_count') + sent,
+            failed_count=F('failed_count') + failed,
+        )
+        if stdout:
+            stdout(f'checkpoint: subscriber #{last_id} (+{sent} sent, +{failed} failed)')
+        if NewsletterCampaign.objects.filter(pk=campaign.pk, status='paused').exists():
+            raise CampaignPaused(campaign.pk)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='newsletter')
+    try:
+        for batch in _batches(subscriber_rows(campaign.last_subscriber_id), batch_size):
+            # Bounded queue: never more than two batches per worker waiting in memory
+            while len(in_flight) >= workers * 2:
+                # Only the oldest batch can move the checkpoint; later ones finishing first don't free a slot
+                wait([in_flight[0][1]])
+                checkpoint(done_only=True)
+            future = executor.submit(_send_batch, batch, renderer, pool, limiter, from_email)
+            in_flight.append((batch[-1][0], future))
+        checkpoint(done_only=False)
+    except CampaignPaused:
+        raise
+    except Exception:
+        # e.g. the mail server is unreachable; leave the campaign resumable from its checkpoint
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(status='paused')
+        raise
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        pool.close_all()
+
+    NewsletterCampaign.objects.filter(pk=campaign.pk).update(status='sent', finished_at=timezone.now())
+    campaign.refresh_from_db()
+    return campaign
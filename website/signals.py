@@ -0,0 +1,43 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from product.models import Category, Deal, Product, ProductImage, ProductVariant
+from .home import invalidate_sections
+from .models import Advertisement, Carousel, CarouselSlide, CuratedItem, SiteSettings
+
+
+PRODUCT_SECTIONS = ('featured_products', 'new_products', 'best_sellers', 'featured_deals', 'deal_of_the_day')
+
+# Model -> homepage sections that render it
+HOME_SECTIONS = {
+    SiteSettings: ('site_settings',),
+    Carousel: ('carousels',),
+    CarouselSlide: ('carousels',),
+    Advertisement: ('advertisements',),
+    CuratedItem: ('curated',),
+    Category: ('featured_categories', 'popular_categories', 'curated'),
+    Deal: ('featured_deals', 'deal_of_the_day'),
+    Product: PRODUCT_SECTIONS + ('curated',),
+    ProductVariant: PRODUCT_SECTIONS + ('popular_categories',),
+    ProductImage: PRODUCT_SECTIONS,
+}
+
+# Counter-only saves that don't change what the homepage shows
+IGNORED_UPDATE_FIELDS = {
+    Advertisement: {'current_impressions', 'click_count'},
+    Deal: {'views'},
+}
+
+
+def home_content_changed(sender, update_fields=None, **kwargs):
+    ignored = IGNORED_UPDATE_FIELDS.get(sender)
+    if ignored and update_fields and set(update_fields) <= ignored:
+        return
+    transaction.on_commit(partial(invalidate_sections, *HOME_SECTIONS[sender]))
+
+
+for model in HOME_SECTIONS:
+    post_save.connect(home_content_changed, sender=model, dispatch_uid=f'home_sections_save_{model.__name__}')
+    post_delete.connect(home_content_changed, sender=model, dispatch_uid=f'home_sections_delete_{model.__name__}')
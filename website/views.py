@@ -1,3 +1,21 @@
-from django.shortcuts import render
+from django.core import signing
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from .models import NewsletterSubscriber
+from .newsletter import unsubscribe_email
+
+
+@require_GET
+def newsletter_unsubscribe(request, token):
+    """Target of the unsubscribe link in newsletter emails; the token is the signed subscriber email"""
+    try:
+        email = unsubscribe_email(token)
+    except signing.BadSignature:
+        return HttpResponseBadRequest('This unsubscribe link is invalid.', content_type='text/plain')
+
+    NewsletterSubscriber.objects.filter(email=email, is_active=True).update(
+        is_active=False, unsubscribed_at=timezone.now()
+    )
+    return HttpResponse('You have been unsubscribed from our newsletter.', content_type='text/plain')
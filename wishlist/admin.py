@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Wishlist, WishlistItem
+from .models import (
+    BackInStockAlert, PriceDropNotification, VariantPriceChange, VariantRestock, Wishlist, WishlistItem
+)
 
 
 class WishlistItemInline(admin.TabularInline):
@@ -25,7 +27,7 @@ class WishlistAdmin(admin.ModelAdmin):
 class WishlistItemAdmin(admin.ModelAdmin):
     list_display = ['wishlist', 'product_variant', 'price_when_added', 'is_price_dropped', 'is_in_stock', 'added_at']
     list_filter = ['notify_on_price_drop', 'notify_on_stock', 'added_at']
-    search_fields = ['wishlist__user__username', 'product_variant__name']
+    search_fields = ['wishlist__user__username', 'product_variant__product__name']
     readonly_fields = ['added_at', 'price_when_added']
     
     def is_price_dropped(self, obj):
@@ -36,4 +38,49 @@ class WishlistItemAdmin(admin.ModelAdmin):
     def is_in_stock(self, obj):
         return obj.is_in_stock()
     is_in_stock.boolean = True
-    is_in_stock.short_description = 'In Stock'
\ No newline at end of file
+    is_in_stock.short_description = 'In Stock'
+
+
+@admin.register(VariantPriceChange)
+class VariantPriceChangeAdmin(admin.ModelAdmin):
+    list_display = ['product_variant', 'old_price', 'new_price', 'created_at', 'is_processed']
+    list_filter = ['processed_at', 'created_at']
+    search_fields = ['product_variant__product__name']
+    raw_id_fields = ['product_variant']
+    readonly_fields = ['created_at', 'processed_at']
+
+    def is_processed(self, obj):
+        return obj.processed_at is not None
+    is_processed.boolean = True
+    is_processed.short_description = 'Processed'
+
+
+@admin.register(PriceDropNotification)
+class PriceDropNotificationAdmin(admin.ModelAdmin):
+    list_display = ['wishlist_item', 'price', 'sent_at']
+    search_fields = ['wishlist_item__wishlist__user__username', 'wishlist_item__product_variant__product__name']
+    raw_id_fields = ['wishlist_item']
+    readonly_fields = ['sent_at']
+
+
+@admin.register(VariantRestock)
+class VariantRestockAdmin(admin.ModelAdmin):
+    list_display = ['product_variant', 'created_at', 'is_processed']
+    list_filter = ['processed_at', 'created_at']
+    search_fields = ['product_variant__product__name']
+    raw_id_fields = ['product_variant']
+    readonly_fields = ['created_at', 'processed_at']
+
+    def is_processed(self, obj):
+        return obj.processed_at is not None
+    is_processed.boolean = True
+    is_processed.short_description = 'Processed'
+
+
+@admin.register(BackInStockAlert)
+class BackInStockAlertAdmin(admin.ModelAdmin):
+    list_display = ['wishlist_item', 'restock', 'created_at', 'sent_at', 'attempts']
+    list_filter = ['sent_at', 'created_at']
+    search_fields = ['wishlist_item__wishlist__user__username', 'wishlist_item__product_variant__product__name']
+    raw_id_fields = ['wishlist_item', 'restock']
+    readonly_fields = ['created_at', 'sent_at', 'attempts']
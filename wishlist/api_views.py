@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from .models import Wishlist, WishlistItem
 from .serializers import (
@@ -13,6 +14,14 @@ from .serializers import (
 from drf_spectacular.utils import extend_schema
 
 
+def wishlist_items(wishlist):
+    """Items of a wishlist with price delta and stock status annotated in SQL"""
+    return (
+        WishlistItem.objects.filter(wishlist=wishlist)
+        .with_status()
+        .prefetch_related('product_variant__images')
+    )
+
 
 @extend_schema(tags=["Wishlist"])
 class WishlistViewSet(viewsets.ModelViewSet):
@@ -28,13 +37,16 @@ class WishlistViewSet(viewsets.ModelViewSet):
             return Wishlist.objects.none()
 
         return Wishlist.objects.filter(user=self.request.user).prefetch_related(
-            'items__product_variant__product'
+            Prefetch(
+                'items',
+                queryset=WishlistItem.objects.with_status().prefetch_related('product_variant__images'),
+            )
         )
     
     def get_object(self):
         """Get or create wishlist for current user"""
-        wishlist, created = Wishlist.objects.get_or_create(user=self.request.user)
-        return wishlist
+        Wishlist.objects.get_or_create(user=self.request.user)
+        return self.get_queryset().get()
     
     def list(self, request, *args, **kwargs):
         """Get current user's wishlist"""
@@ -69,28 +81,35 @@ class WishlistViewSet(viewsets.ModelViewSet):
             'count': wishlist.items.count()
         })
     
+    def get_items_response(self, items):
+        page = self.paginate_queryset(items)
+        if page is not None:
+            serializer = WishlistItemSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = WishlistItemSerializer(items, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(responses={200: WishlistItemSerializer(many=True)})
     @action(detail=False, methods=['get'])
     def price_drops(self, request):
         """Get items with price drops"""
-        wishlist = self.get_object()
-        items = [item for item in wishlist.items.all() if item.is_price_dropped()]
-        serializer = WishlistItemSerializer(items, many=True)
-        return Response(serializer.data)
+        wishlist, created = Wishlist.objects.get_or_create(user=request.user)
+        return self.get_items_response(wishlist_items(wishlist).price_drops())
     
+    @extend_schema(responses={200: WishlistItemSerializer(many=True)})
     @action(detail=False, methods=['get'])
     def out_of_stock(self, request):
         """Get out of stock items"""
-        wishlist = self.get_object()
-        items = [item for item in wishlist.items.all() if not item.is_in_stock()]
-        serializer = WishlistItemSerializer(items, many=True)
-        return Response(serializer.data)
+        wishlist, created = Wishlist.objects.get_or_create(user=request.user)
+        return self.get_items_response(wishlist_items(wishlist).out_of_stock())
 
 
 @extend_schema(tags=["Wishlist Items"])
 class WishlistItemViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    search_fields = ['product_variant__name', 'product_variant__product__name', 'notes']
+    search_fields = ['product_variant__product__name', 'notes']
     ordering_fields = ['added_at', 'price_when_added']
     ordering = ['-added_at']
     
@@ -103,9 +122,7 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
             return WishlistItem.objects.none()
 
         wishlist = Wishlist.objects.get_or_create(user=user)[0]
-        return WishlistItem.objects.filter(wishlist=wishlist).select_related(
-            'product_variant__product'
-        )
+        return wishlist_items(wishlist)
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -133,13 +150,13 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
         
         wishlist_item = serializer.save(wishlist=wishlist)
         
-        output_serializer = WishlistItemSerializer(wishlist_item)
+        output_serializer = WishlistItemSerializer(wishlist_items(wishlist).get(pk=wishlist_item.pk))
         return Response(output_serializer.data, status=status.HTTP_201_CREATED)
     
     def destroy(self, request, *args, **kwargs):
         """Remove item from wishlist"""
         instance = self.get_object()
-        product_name = instance.product_variant.name
+        product_name = instance.product_variant.product.name
         self.perform_destroy(instance)
         
         return Response({
@@ -156,7 +173,7 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
         # You can integrate with your cart system
         
         return Response({
-            'message': f'Added {item.product_variant.name} to cart',
+            'message': f'Added {item.product_variant.product.name} to cart',
             'product_variant_id': item.product_variant.id
         })
     
@@ -199,8 +216,8 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
         
         for variant_id in product_variant_ids:
             try:
-                from products.models import ProductVariant
-                variant = ProductVariant.objects.get(id=variant_id)
+                from product.models import ProductVariant
+                variant = ProductVariant.objects.select_related('product').get(id=variant_id)
                 
                 item, created = WishlistItem.objects.get_or_create(
                     wishlist=wishlist,
@@ -208,9 +225,9 @@ class WishlistItemViewSet(viewsets.ModelViewSet):
                 )
                 
                 if created:
-                    added_items.append(variant.name)
+                    added_items.append(variant.product.name)
                 else:
-                    skipped_items.append(variant.name)
+                    skipped_items.append(variant.product.name)
             except:
                 pass
         
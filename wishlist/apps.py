@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class WishlistConfig(AppConfig):
     name = 'wishlist'
+
+    def ready(self):
+        import wishlist.signals  # noqa
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wishlist.notifications import resolve_restocks, send_back_in_stock_alerts
+
+
+class Command(BaseCommand):
+    help = 'Resolve queued variant restocks into back-in-stock alerts and send them in rate-limited batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails per batch (default: BACK_IN_STOCK_BATCH_SIZE)')
+        parser.add_argument('--interval', type=float, default=None, help='Seconds between batches (default: BACK_IN_STOCK_BATCH_INTERVAL)')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches (default: drain the queue)')
+        parser.add_argument('--resolve-only', action='store_true', help='Create alerts for pending restocks without sending anything')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        restocks, created = resolve_restocks()
+        self.stdout.write(f'{restocks} restock(s) resolved into {created} alert(s)')
+        if options['resolve_only']:
+            return
+
+        stats = send_back_in_stock_alerts(
+            batch_size=options['batch_size'],
+            interval=options['interval'],
+            max_batches=options['max_batches'],
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {stats['sent']} alert(s) in {stats['batches']} batch(es) in {elapsed:.1f}s "
+            f"({stats['failed']} failed, {stats['dropped']} dropped)"
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wishlist.notifications import send_price_drop_digests
+
+
+class Command(BaseCommand):
+    help = 'Send one price-drop digest per user for all pending variant price changes. Run periodically (e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Maximum pending price changes to process in this run')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be sent without sending or recording anything')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = send_price_drop_digests(limit=options['limit'], dry_run=options['dry_run'])
+        elapsed = time.monotonic() - started
+
+        summary = (
+            f"{stats['changes']} price change(s), {stats['items']} item(s) for {stats['users']} user(s)"
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: {summary}'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary}: sent {stats['sent']} digest(s) in {elapsed:.1f}s ({stats['failed']} failed)"
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0023_product_min_variant_price_max_variant_price'),
+        ('wishlist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VariantPriceChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('new_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('product_variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_changes', to='product.productvariant')),
+            ],
+            options={
+                'verbose_name': 'Variant Price Change',
+                'verbose_name_plural': 'Variant Price Changes',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['processed_at', 'created_at'], name='wishlist_vpc_pending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceDropNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('wishlist_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_drop_notifications', to='wishlist.wishlistitem')),
+            ],
+            options={
+                'verbose_name': 'Price Drop Notification',
+                'verbose_name_plural': 'Price Drop Notifications',
+                'ordering': ['-sent_at'],
+                'constraints': [models.UniqueConstraint(fields=('wishlist_item', 'price'), name='unique_price_drop_notification')],
+            },
+        ),
+    ]
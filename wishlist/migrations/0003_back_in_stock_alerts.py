@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0023_product_min_variant_price_max_variant_price'),
+        ('wishlist', '0002_price_drop_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VariantRestock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('product_variant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='restocks', to='product.productvariant')),
+            ],
+            options={
+                'verbose_name': 'Variant Restock',
+                'verbose_name_plural': 'Variant Restocks',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['processed_at', 'created_at'], name='wishlist_restock_pending_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BackInStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('restock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='wishlist.variantrestock')),
+                ('wishlist_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='back_in_stock_alerts', to='wishlist.wishlistitem')),
+            ],
+            options={
+                'verbose_name': 'Back In Stock Alert',
+                'verbose_name_plural': 'Back In Stock Alerts',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['sent_at', 'created_at'], name='wishlist_bisa_pending_idx')],
+                'constraints': [models.UniqueConstraint(fields=('wishlist_item', 'restock'), name='unique_back_in_stock_alert')],
+            },
+        ),
+    ]
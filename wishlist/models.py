@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import BooleanField, DecimalField, ExpressionWrapper, F, Q
 
 User = get_user_model()
 
@@ -21,6 +22,40 @@ class Wishlist(models.Model):
         return self.items.count()
 
 
+class WishlistItemQuerySet(models.QuerySet):
+    def with_status(self):
+        """
+        Annotate current price, price delta and stock status in SQL
+
+        Annotations:
+            current_price: product_variant.price
+            price_delta: current price minus price_when_added (negative = dropped)
+            price_dropped: current price below price_when_added
+            in_stock: product_variant.stock_quantity > 0
+        """
+        return self.select_related('product_variant__product').annotate(
+            current_price=F('product_variant__price'),
+            price_delta=ExpressionWrapper(
+                F('product_variant__price') - F('price_when_added'),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ),
+            price_dropped=ExpressionWrapper(
+                Q(product_variant__price__lt=F('price_when_added')),
+                output_field=BooleanField(),
+            ),
+            in_stock=ExpressionWrapper(
+                Q(product_variant__stock_quantity__gt=0),
+                output_field=BooleanField(),
+            ),
+        )
+
+    def price_drops(self):
+        return self.filter(product_variant__price__lt=F('price_when_added'))
+
+    def out_of_stock(self):
+        return self.filter(product_variant__stock_quantity=0)
+
+
 class WishlistItem(models.Model):
     wishlist = models.ForeignKey(Wishlist, on_delete=models.CASCADE, related_name='items')
     product_variant = models.ForeignKey('product.ProductVariant', on_delete=models.CASCADE)
@@ -32,6 +67,8 @@ class WishlistItem(models.Model):
     notify_on_price_drop = models.BooleanField(default=False)
     notify_on_stock = models.BooleanField(default=True)
 
+    objects = WishlistItemQuerySet.as_manager()
+
     class Meta:
         unique_together = ('wishlist', 'product_variant')
         ordering = ['-added_at']
@@ -59,12 +96,99 @@ class WishlistItem(models.Model):
             self.price_when_added = self.product_variant.price
         super().save(*args, **kwargs)
 
+    # The helpers below prefer the with_status() annotations when present
+
     def get_price_difference(self):
+        if hasattr(self, 'price_delta'):
+            return self.price_delta
         current_price = self.product_variant.price
         return current_price - self.price_when_added
 
     def is_price_dropped(self):
+        if hasattr(self, 'price_dropped'):
+            return self.price_dropped
         return self.get_price_difference() < 0
 
     def is_in_stock(self):
-        return self.product_variant.stock > 0
+        if hasattr(self, 'in_stock'):
+            return self.in_stock
+        return self.product_variant.stock_quantity > 0
+
+
+class VariantPriceChange(models.Model):
+    """Variant price changes waiting to be matched against wishlists"""
+    product_variant = models.ForeignKey('product.ProductVariant', on_delete=models.CASCADE, related_name='price_changes')
+    old_price = models.DecimalField(max_digits=10, decimal_places=2)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['processed_at', 'created_at'], name='wishlist_vpc_pending_idx'),
+        ]
+        verbose_name = "Variant Price Change"
+        verbose_name_plural = "Variant Price Changes"
+
+    def __str__(self):
+        return f"{self.product_variant_id}: {self.old_price} -> {self.new_price}"
+
+
+class PriceDropNotification(models.Model):
+    """A price drop already reported to the wishlist owner; one row per item and price"""
+    wishlist_item = models.ForeignKey(WishlistItem, on_delete=models.CASCADE, related_name='price_drop_notifications')
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['wishlist_item', 'price'], name='unique_price_drop_notification'),
+        ]
+        ordering = ['-sent_at']
+        verbose_name = "Price Drop Notification"
+        verbose_name_plural = "Price Drop Notifications"
+
+    def __str__(self):
+        return f"{self.wishlist_item} @ {self.price}"
+
+
+class VariantRestock(models.Model):
+    """A variant that came back in stock, waiting to be resolved into BackInStockAlert rows"""
+    product_variant = models.ForeignKey('product.ProductVariant', on_delete=models.CASCADE, related_name='restocks')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['processed_at', 'created_at'], name='wishlist_restock_pending_idx'),
+        ]
+        verbose_name = "Variant Restock"
+        verbose_name_plural = "Variant Restocks"
+
+    def __str__(self):
+        return f"{self.product_variant_id} restocked at {self.created_at}"
+
+
+class BackInStockAlert(models.Model):
+    """One back-in-stock email owed to a wishlist owner for a restock"""
+    wishlist_item = models.ForeignKey(WishlistItem, on_delete=models.CASCADE, related_name='back_in_stock_alerts')
+    restock = models.ForeignKey(VariantRestock, on_delete=models.CASCADE, related_name='alerts')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['wishlist_item', 'restock'], name='unique_back_in_stock_alert'),
+        ]
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['sent_at', 'created_at'], name='wishlist_bisa_pending_idx'),
+        ]
+        verbose_name = "Back In Stock Alert"
+        verbose_name_plural = "Back In Stock Alerts"
+
+    def __str__(self):
+        return f"{self.wishlist_item} (restock #{self.restock_id})"
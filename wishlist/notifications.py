@@ -0,0 +1,255 @@
+"""
+Wishlist notifications - Batched price-drop digests and back-in-stock alerts
+
+Price decreases are queued as VariantPriceChange rows (wishlist/signals.py).
+A periodic run (send_price_drop_notifications) takes every pending change,
+joins the changed variants against WishlistItem in one query, and sends each
+affected user a single digest email. All digests in a run share one SMTP
+connection. Every (item, price) that was reported is recorded in
+PriceDropNotification, so an item is only mentioned again if its price drops
+further. Changes on variants whose digest failed to send stay pending, so the
+next run retries them.
+
+Back-in-stock alerts work in two steps. Restocks are queued as VariantRestock
+rows and resolved in bulk into one BackInStockAlert per subscribed wishlist
+item. The alerts are then sent in fixed-size batches with a pause between
+batches, so restocking a popular variant spreads its emails over time
+instead of sending them all at once.
+"""
+import logging
+import time
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import (
+    BackInStockAlert, PriceDropNotification, VariantPriceChange, VariantRestock, WishlistItem
+)
+
+logger = logging.getLogger(__name__)
+
+DIGEST_TEMPLATE = 'wishlist/price_drop_digest.txt'
+BACK_IN_STOCK_TEMPLATE = 'wishlist/back_in_stock.txt'
+
+BACK_IN_STOCK_BATCH_SIZE = getattr(settings, 'BACK_IN_STOCK_BATCH_SIZE', 200)
+BACK_IN_STOCK_BATCH_INTERVAL = getattr(settings, 'BACK_IN_STOCK_BATCH_INTERVAL', 30)
+BACK_IN_STOCK_MAX_ATTEMPTS = 3
+
+
+def pending_price_drop_items(variant_ids):
+    """
+    Wishlist items to report for the given changed variants
+
+    Items qualify when notify_on_price_drop is set, the variant now costs less
+    than price_when_added, and no notification was sent yet at this price or lower.
+
+    Returns:
+        WishlistItem queryset ordered by user, annotated by with_status()
+    """
+    already_sent = PriceDropNotification.objects.filter(
+        wishlist_item=OuterRef('pk'),
+        price__lte=OuterRef('product_variant__price'),
+    )
+    return (
+        WishlistItem.objects.with_status()
+        .select_related('wishlist__user')
+        .filter(product_variant_id__in=variant_ids, notify_on_price_drop=True)
+        .price_drops()
+        .filter(~Exists(already_sent))
+        .order_by('wishlist__user_id', 'product_variant_id')
+    )
+
+
+def build_digest(user, items):
+    subject = 'Price drop on an item in your wishlist' if len(items) == 1 else \
+        f'Price drops on {len(items)} items in your wishlist'
+    body = render_to_string(DIGEST_TEMPLATE, {'user': user, 'items': items})
+    return EmailMessage(subject, body, settings.EMAIL_HOST_USER or None, [user.email])
+
+
+def send_price_drop_digests(limit=None, dry_run=False):
+    """
+    Process pending price changes and send one digest per user
+
+    Args:
+        limit: Maximum number of pending changes to take in this run
+        dry_run: Build digests without sending or recording anything
+
+    Returns:
+        dict with keys: changes, users, items, sent, failed
+    """
+    changes = VariantPriceChange.objects.filter(processed_at__isnull=True).order_by('created_at')
+    if limit:
+        changes = changes[:limit]
+    change_rows = list(changes.values_list('id', 'product_variant_id'))
+    variant_ids = {variant_id for _, variant_id in change_rows}
+
+    stats = {'changes': len(change_rows), 'users': 0, 'items': 0, 'sent': 0, 'failed': 0}
+    if not change_rows:
+        return stats
+
+    digests = []
+    items = pending_price_drop_items(variant_ids)
+    for _, user_items in groupby(items, key=lambda item: item.wishlist.user_id):
+        user_items = list(user_items)
+        user = user_items[0].wishlist.user
+        if user.email:
+            digests.append((build_digest(user, user_items), user_items))
+    stats['users'] = len(digests)
+    stats['items'] = sum(len(user_items) for _, user_items in digests)
+    if dry_run:
+        return stats
+
+    notified, failed_variant_ids = [], set()
+    connection = get_connection()
+    try:
+        connection.open()
+        for message, user_items in digests:
+            message.connection = connection
+            try:
+                message.send()
+            except Exception:
+                # Left unrecorded, and its variants' changes left pending, so the next run retries it
+                logger.exception('Price drop digest to %s failed', message.to[0])
+                stats['failed'] += 1
+                failed_variant_ids.update(item.product_variant_id for item in user_items)
+                continue
+            stats['sent'] += 1
+            notified.extend(
+                PriceDropNotification(wishlist_item=item, price=item.current_price)
+                for item in user_items
+            )
+    finally:
+        connection.close()
+
+    processed_ids = [
+        change_id for change_id, variant_id in change_rows if variant_id not in failed_variant_ids
+    ]
+    with transaction.atomic():
+        PriceDropNotification.objects.bulk_create(notified, ignore_conflicts=True)
+        VariantPriceChange.objects.filter(id__in=processed_ids).update(processed_at=timezone.now())
+    return stats
+
+
+def resolve_restocks(limit=None):
+    """
+    Turn pending VariantRestock rows into BackInStockAlert rows
+
+    Subscribed items (notify_on_stock) of all restocked variants are loaded
+    with one query on the product_variant index. Items that still have an
+    unsent alert from an earlier restock are skipped.
+
+    Returns:
+        tuple of (restocks processed, alerts created)
+    """
+    restocks = VariantRestock.objects.filter(processed_at__isnull=True).order_by('created_at')
+    if limit:
+        restocks = restocks[:limit]
+    # Several restocks of the same variant collapse into the latest one
+    latest, restock_ids = {}, []
+    for restock_id, variant_id in restocks.values_list('id', 'product_variant_id'):
+        restock_ids.append(restock_id)
+        latest[variant_id] = restock_id
+    if not restock_ids:
+        return 0, 0
+
+    unsent = BackInStockAlert.objects.filter(wishlist_item=OuterRef('pk'), sent_at__isnull=True)
+    items = (
+        WishlistItem.objects
+        .filter(product_variant_id__in=latest, notify_on_stock=True)
+        .filter(~Exists(unsent))
+        .values_list('id', 'product_variant_id')
+    )
+    alerts = [
+        BackInStockAlert(wishlist_item_id=item_id, restock_id=latest[variant_id])
+        for item_id, variant_id in items.iterator(chunk_size=5000)
+    ]
+    with transaction.atomic():
+        BackInStockAlert.objects.bulk_create(alerts, batch_size=1000, ignore_conflicts=True)
+        VariantRestock.objects.filter(id__in=restock_ids).update(processed_at=timezone.now())
+    return len(restock_ids), len(alerts)
+
+
+def _send_alert_batch(alerts):
+    """Send one batch over a single connection; returns (sent ids, failed ids)"""
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+        for alert in alerts:
+            item = alert.wishlist_item
+            user = item.wishlist.user
+            message = EmailMessage(
+                f'Back in stock: {item.product_variant}',
+                render_to_string(BACK_IN_STOCK_TEMPLATE, {'user': user, 'item': item}),
+                settings.EMAIL_HOST_USER or None,
+                [user.email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception:
+                logger.exception('Back-in-stock alert #%s to %s failed', alert.pk, user.email)
+                failed.append(alert.pk)
+            else:
+                sent.append(alert.pk)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def send_back_in_stock_alerts(batch_size=None, interval=None, max_batches=None):
+    """
+    Send pending back-in-stock alerts in rate-limited batches
+
+    Alerts whose variant sold out (or was deactivated) again before its turn,
+    or whose user has no email address, are dropped without sending.
+
+    Args:
+        batch_size: Emails per batch (default: BACK_IN_STOCK_BATCH_SIZE)
+        interval: Seconds to wait between batches (default: BACK_IN_STOCK_BATCH_INTERVAL)
+        max_batches: Stop after this many batches (default: until the queue is empty)
+
+    Returns:
+        dict with keys: batches, sent, failed, dropped
+    """
+    batch_size = batch_size or BACK_IN_STOCK_BATCH_SIZE
+    interval = BACK_IN_STOCK_BATCH_INTERVAL if interval is None else interval
+    stats = {'batches': 0, 'sent': 0, 'failed': 0, 'dropped': 0}
+
+    pending = (
+        BackInStockAlert.objects
+        .filter(sent_at__isnull=True, attempts__lt=BACK_IN_STOCK_MAX_ATTEMPTS)
+        .select_related('wishlist_item__wishlist__user', 'wishlist_item__product_variant__product')
+        .order_by('created_at', 'id')
+    )
+    while max_batches is None or stats['batches'] < max_batches:
+        if stats['batches']:
+            time.sleep(interval)
+        alerts = list(pending[:batch_size])
+        if not alerts:
+            break
+
+        deliverable, dropped = [], []
+        for alert in alerts:
+            variant = alert.wishlist_item.product_variant
+            if variant.is_active and variant.stock_quantity > 0 and alert.wishlist_item.wishlist.user.email:
+                deliverable.append(alert)
+            else:
+                dropped.append(alert.pk)
+
+        sent, failed = _send_alert_batch(deliverable) if deliverable else ([], [])
+        BackInStockAlert.objects.filter(id__in=dropped).delete()
+        BackInStockAlert.objects.filter(id__in=sent).update(sent_at=timezone.now(), attempts=F('attempts') + 1)
+        BackInStockAlert.objects.filter(id__in=failed).update(attempts=F('attempts') + 1)
+
+        stats['batches'] += 1
+        stats['sent'] += len(sent)
+        stats['failed'] += len(failed)
+        stats['dropped'] += len(dropped)
+    return stats
@@ -6,20 +6,18 @@ from django.contrib.auth.models import User
 class ProductVariantMinimalSerializer(serializers.Serializer):
     """Minimal serializer for product variant in wishlist"""
     id = serializers.IntegerField()
-    name = serializers.CharField()
-    sku = serializers.CharField()
+    name = serializers.CharField(source='product.name')
     price = serializers.DecimalField(max_digits=10, decimal_places=2)
-    stock = serializers.IntegerField()
+    stock = serializers.IntegerField(source='stock_quantity')
     product_name = serializers.CharField(source='product.name')
     product_id = serializers.IntegerField(source='product.id')
     image = serializers.SerializerMethodField()
     
     def get_image(self, obj) -> str | None:
-        # Assuming your ProductVariant has an image field or related images
-        if hasattr(obj, 'image') and obj.image:
-            return obj.image.url
-        elif hasattr(obj, 'images') and obj.images.exists():
-            return obj.images.first().image.url
+        # Uses the prefetched variant images, so no query per item
+        images = obj.images.all()
+        if images:
+            return images[0].image.url
         return None
 
 
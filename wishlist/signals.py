@@ -1,23 +1,32 @@
+from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.contrib.auth.models import User
-from .models import Wishlist
 
+from product.models import ProductVariant
+from product.signals import variant_prices_changed, variants_restocked
+from .models import Wishlist, VariantPriceChange, VariantRestock
 
-@receiver(post_save, sender=User)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_user_wishlist(sender, instance, created, **kwargs):
     """Automatically create wishlist when user is created"""
     if created:
         Wishlist.objects.create(user=instance)
 
 
-# wishlist/apps.py
-from django.apps import AppConfig
+@receiver(variant_prices_changed, sender=ProductVariant)
+def record_price_changes(sender, changes, **kwargs):
+    """Queue price decreases for the next send_price_drop_notifications run"""
+    VariantPriceChange.objects.bulk_create([
+        VariantPriceChange(product_variant_id=variant_id, old_price=old_price, new_price=new_price)
+        for variant_id, old_price, new_price in changes
+        if new_price < old_price
+    ])
 
 
-class WishlistConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'wishlist'
-    
-    def ready(self):
-        import wishlist.signals
\ No newline at end of file
+@receiver(variants_restocked, sender=ProductVariant)
+def record_restocks(sender, variant_ids, **kwargs):
+    """Queue restocks for the next send_back_in_stock_alerts run"""
+    VariantRestock.objects.bulk_create([
+        VariantRestock(product_variant_id=variant_id) for variant_id in variant_ids
+    ])